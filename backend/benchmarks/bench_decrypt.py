@@ -0,0 +1,44 @@
+"""
+Microbenchmark: per-subscriber decrypt_email() vs batched decrypt_emails().
+
+Usage (from backend/):
+    python -m benchmarks.bench_decrypt            # 1k, 100k, 1M
+    python -m benchmarks.bench_decrypt 1000 50000
+"""
+import sys
+import os
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.crypto_service import decrypt_email, decrypt_emails, encrypt_email
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(size):
+    print(f"\n--- {size:,} subscribers ---")
+    encrypted, elapsed = timed(lambda: [encrypt_email(f"subscriber{i}@example.com") for i in range(size)])
+    print(f"  setup (encrypt)         {elapsed:8.2f}s")
+
+    baseline, elapsed_single = timed(lambda: [decrypt_email(e) for e in encrypted])
+    print(f"  decrypt_email loop      {elapsed_single:8.2f}s  ({size / elapsed_single:,.0f}/s)")
+
+    batched, elapsed = timed(lambda: list(decrypt_emails(encrypted, processes=1)))
+    assert batched == baseline
+    print(f"  decrypt_emails (1 proc) {elapsed:8.2f}s  ({size / elapsed:,.0f}/s, x{elapsed_single / elapsed:.1f})")
+
+    processes = os.cpu_count() or 1
+    if processes > 1:
+        batched, elapsed = timed(lambda: list(decrypt_emails(encrypted, processes=processes)))
+        assert batched == baseline
+        print(f"  decrypt_emails ({processes} proc) {elapsed:8.2f}s  ({size / elapsed:,.0f}/s, x{elapsed_single / elapsed:.1f})")
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for size in sizes:
+        run(size)
@@ -0,0 +1,189 @@
+"""
+Offline end-to-end benchmark of run_crawlers() and run_newsletter_job().
+
+Firestore, the YouTube Data API, the Translation API and SMTP are replaced
+by the in-memory fakes in testing/fakes.py (with configurable latency),
+so nothing touches Google services or sends mail. Stages:
+
+    crawl (cold)   first crawl into an empty datastore
+    crawl (warm)   next day's crawl: one new upload per channel, caches warm
+    newsletter     send to every seeded subscriber
+
+For each stage it reports wall time, peak Python memory (tracemalloc),
+YouTube calls / quota units, translate requests, Firestore reads / writes /
+commits and emails sent.
+
+Usage (from backend/):
+    python -m benchmarks.bench_e2e                          # small preset
+    python -m benchmarks.bench_e2e --preset large
+    python -m benchmarks.bench_e2e --channels 500 --subscribers 20000 --json out.json
+    python -m benchmarks.bench_e2e --incremental --youtube-latency 0.05
+
+Presets: small (40 channels / 100 subscribers), medium (500 / 10k),
+large (5,000 / 100k), xl (5,000 / 1M).
+"""
+import sys
+import os
+import io
+import json
+import time
+import random
+import argparse
+import tracemalloc
+import contextlib
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+os.environ.setdefault('EMAIL_USER', 'benchmark')
+os.environ.setdefault('EMAIL_PASSWORD', 'benchmark')
+os.environ.setdefault('EMAIL_STARTTLS', '0')
+os.environ.setdefault('EMAIL_RATE_PER_SECOND', '0')
+for name in ('CLOUD_RUN_TASK_COUNT', 'CLOUD_RUN_TASK_INDEX'):
+    os.environ.pop(name, None)
+
+import utils.db
+import run_crawler
+import run_newsletter
+from testing.fakes import FakeFirestore, FakeYouTubeAPI, FakeTranslateClient, RecordingSMTP
+from crawler.sources.youtube import YouTubeCrawler
+from crawler.sources.youtube_rss import YouTubeRSSFeed
+from services.email_service import EmailService
+from services.translation_service import TranslationService, TranslationCache
+from services.crypto_service import encrypt_email
+
+PRESETS = {
+    'small': (40, 100),
+    'medium': (500, 10_000),
+    'large': (5_000, 100_000),
+    'xl': (5_000, 1_000_000),
+}
+CATEGORIES = ['정치', '경제', '사회', '부동산', 'IT', '과학', '문화', '지식']
+
+class Harness:
+    """Wires the fakes into the job modules and reads their counters."""
+
+    def __init__(self, args):
+        self.db = FakeFirestore(latency=args.firestore_latency)
+        self.youtube = FakeYouTubeAPI(channels=args.channels, latency=args.youtube_latency)
+        self.translate = FakeTranslateClient(latency=args.translate_latency)
+        RecordingSMTP.latency = args.smtp_latency
+
+        utils.db._db_client = self.db
+        run_crawler._translation_service = TranslationService(
+            client=self.translate, cache=TranslationCache(':memory:')
+        )
+        run_crawler.CRAWLER_INCREMENTAL = args.incremental
+        run_crawler.CRAWLER_RSS_PREFILTER = args.rss_prefilter
+
+        youtube = self.youtube
+        YouTubeCrawler._get = lambda crawler, endpoint, params, etag=None: youtube.get(endpoint, params, etag)
+        YouTubeRSSFeed.fetch_video_ids = lambda feed, channel_id: youtube.feed_video_ids(channel_id)
+
+        create_engine = EmailService.create_delivery_engine
+
+        def create_recording_engine(service):
+            engine = create_engine(service)
+            engine.smtp_factory = RecordingSMTP
+            return engine
+
+        EmailService.create_delivery_engine = create_recording_engine
+
+    def counters(self):
+        return {
+            'youtube_calls': sum(self.youtube.calls.values()),
+            'youtube_quota': self.youtube.quota_units(),
+            'translate_calls': self.translate.calls,
+            'translate_chars': self.translate.characters,
+            'reads': self.db.reads,
+            'writes': self.db.writes,
+            'commits': self.db.commits,
+            'emails': RecordingSMTP.sent,
+            'smtp_connections': RecordingSMTP.connections,
+        }
+
+    def seed_subscribers(self, count, rng):
+        for i in range(count):
+            data = {'email': encrypt_email(f"reader{i}@example.com"), 'status': 'active', 'is_test': False}
+            if rng.random() < 0.3:
+                data['preferences'] = {'categories': rng.sample(CATEGORIES, 2), 'channels': []}
+            self.db.seed(f"subscribers/{i:08d}", data)
+
+def run_stage(harness, name, fn, track_memory, verbose):
+    before = harness.counters()
+    if track_memory:
+        tracemalloc.start()
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    start = time.perf_counter()
+    with output:
+        fn()
+    wall = time.perf_counter() - start
+    peak = 0
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    after = harness.counters()
+    result = {'stage': name, 'wall_s': round(wall, 3), 'peak_mb': round(peak / 2**20, 1)}
+    result.update({key: after[key] - before[key] for key in after})
+    return result
+
+def print_table(results):
+    columns = [
+        ('stage', 'stage', 14), ('wall_s', 'wall s', 8), ('peak_mb', 'peak MB', 8),
+        ('youtube_calls', 'yt calls', 9), ('youtube_quota', 'quota', 7),
+        ('translate_calls', 'tr calls', 9), ('reads', 'reads', 9), ('writes', 'writes', 9),
+        ('commits', 'commits', 8), ('emails', 'emails', 9),
+    ]
+    print(' '.join(f"{title:>{width}}" for _, title, width in columns))
+    for row in results:
+        print(' '.join(f"{row[key]:>{width}}" for key, _, width in columns))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--channels', type=int)
+    parser.add_argument('--subscribers', type=int)
+    parser.add_argument('--incremental', action='store_true', help='crawl with CRAWLER_INCREMENTAL')
+    parser.add_argument('--rss-prefilter', action='store_true', help='crawl with CRAWLER_RSS_PREFILTER')
+    parser.add_argument('--firestore-latency', type=float, default=0.005)
+    parser.add_argument('--youtube-latency', type=float, default=0.03)
+    parser.add_argument('--translate-latency', type=float, default=0.1)
+    parser.add_argument('--smtp-latency', type=float, default=0.0)
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc (it slows allocation-heavy stages)')
+    parser.add_argument('--verbose', action='store_true', help='show job output')
+    parser.add_argument('--json', help='write results to this file')
+    args = parser.parse_args()
+
+    preset_channels, preset_subscribers = PRESETS[args.preset]
+    args.channels = args.channels or preset_channels
+    args.subscribers = args.subscribers or preset_subscribers
+    track_memory = not args.no_memory
+
+    print(f"📊 {args.channels:,} channels, {args.subscribers:,} subscribers "
+          f"(latency: firestore {args.firestore_latency}s, youtube {args.youtube_latency}s, "
+          f"translate {args.translate_latency}s, smtp {args.smtp_latency}s)")
+
+    harness = Harness(args)
+    sources = harness.youtube.sources(CATEGORIES)
+    results = [run_stage(harness, 'crawl (cold)', lambda: run_crawler.run_crawlers(sources), track_memory, args.verbose)]
+
+    harness.youtube.advance_day()
+    results.append(run_stage(harness, 'crawl (warm)', lambda: run_crawler.run_crawlers(sources), track_memory, args.verbose))
+
+    start = time.perf_counter()
+    harness.seed_subscribers(args.subscribers, random.Random(7))
+    print(f"   (seeded {args.subscribers:,} subscribers in {time.perf_counter() - start:.1f}s)")
+    results.append(run_stage(
+        harness, 'newsletter', lambda: run_newsletter.run_newsletter_job(is_production=True),
+        track_memory, args.verbose
+    ))
+
+    print()
+    print_table(results)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), 'stages': results}, f, indent=2)
+        print(f"\n💾 Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
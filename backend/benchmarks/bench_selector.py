@@ -0,0 +1,34 @@
+"""
+Story selection benchmark against the original list-scan implementation
+from run_newsletter_job (kept in testing/selection.py). The golden-output
+comparison with that implementation runs as a test (tests/test_selector.py).
+
+Usage (from backend/):
+    python -m benchmarks.bench_selector                 # 400, 5k, 20k, 50k items
+    python -m benchmarks.bench_selector 1000 100000
+"""
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter.selector import StorySelector
+from testing.selection import legacy_select, make_contents
+
+DEFAULT_SIZES = [400, 5_000, 20_000, 50_000]
+
+def bench(size):
+    contents = make_contents(size, random.Random(size))
+    start = time.perf_counter()
+    legacy_select(contents, random.Random(1))
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    StorySelector().select(contents, seed=1)
+    indexed = time.perf_counter() - start
+    print(f"  {size:>8,} items   legacy {legacy * 1000:9.2f}ms   indexed {indexed * 1000:8.2f}ms   x{legacy / indexed:.1f}")
+
+if __name__ == "__main__":
+    for size in [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES:
+        bench(size)
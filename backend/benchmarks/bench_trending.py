@@ -0,0 +1,70 @@
+"""
+Trending score benchmark: time to score every newsletter candidate from its
+view-count snapshots, plus a sanity check that a story breaking today
+outranks a big channel's steady week-old video.
+
+Usage (from backend/):
+    python -m benchmarks.bench_trending                 # 2k, 20k, 100k items
+    python -m benchmarks.bench_trending 5000
+"""
+import sys
+import os
+import time
+import random
+import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.content_manifest import SERIES_LENGTH, append_point
+from newsletter.trending import trending_scores, velocity_and_acceleration
+
+DEFAULT_SIZES = [2_000, 20_000, 100_000]
+HOUR = 3600
+
+def make_item(rng, now, points=SERIES_LENGTH):
+    published = now - rng.randrange(1, 30 * 24) * HOUR
+    rate = rng.lognormvariate(4, 2)
+    series = None
+    for i in range(points, 0, -1):
+        t = now - i * 24 * HOUR + HOUR
+        if t > published:
+            series = append_point(series, t, int(rate * (t - published) / HOUR))
+    return {
+        'published_at': datetime.datetime.fromtimestamp(published, datetime.timezone.utc).isoformat(),
+        'view_count': (series or {'v': [0]})['v'][-1],
+        'view_series': series,
+    }
+
+def sanity_check(now):
+    def iso(hours_ago):
+        return datetime.datetime.fromtimestamp(now - hours_ago * HOUR, datetime.timezone.utc).isoformat()
+
+    # Big channel: 2M views, published a week ago, ~1k views/hour and slowing
+    steady = {'published_at': iso(168), 'view_count': 2_000_000,
+              'view_series': {'t': [now - 48 * HOUR, now - 24 * HOUR, now], 'v': [1_950_000, 1_980_000, 2_000_000]}}
+    # Small channel: published 6 hours ago, 30k views, first snapshot
+    breaking = {'published_at': iso(6), 'view_count': 30_000,
+                'view_series': {'t': [now], 'v': [30_000]}}
+    steady_score, breaking_score = trending_scores([steady, breaking], now)
+    (v_steady, v_breaking), _ = velocity_and_acceleration([steady, breaking], now)
+    ok = breaking_score > steady_score
+    print(f"{'✅' if ok else '❌'} breaking story ({v_breaking:,.0f} views/h, score {breaking_score:.2f}) vs "
+          f"big channel ({v_steady:,.0f} views/h, score {steady_score:.2f})")
+    return ok
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    now = time.time()
+    ok = sanity_check(now)
+    rng = random.Random(7)
+    for size in sizes:
+        items = [make_item(rng, now) for _ in range(size)]
+        start = time.perf_counter()
+        scores = trending_scores(items, now)
+        elapsed = time.perf_counter() - start
+        print(f"   {size:>8,} items: {elapsed * 1000:8.1f} ms ({elapsed * 1e6 / size:.2f} µs/item), "
+              f"top score {max(scores):.2f}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Near-duplicate clustering timing: how fingerprinting and MinHash + LSH
+clustering time grows with the number of candidates (synthetic headlines,
+10% rewrites). Precision / recall on labelled Korean headlines is checked
+by tests/test_near_duplicates.py.
+
+Usage (from backend/):
+    python -m benchmarks.near_duplicates_check              # 2k, 20k synthetic items
+    python -m benchmarks.near_duplicates_check 50000
+"""
+import sys
+import os
+import time
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fingerprint import fingerprint
+from newsletter.near_duplicates import cluster_near_duplicates
+
+DEFAULT_SIZES = [2_000, 20_000]
+
+def synthetic_items(size, rng, duplicate_rate=0.1):
+    """
+    Random Hangul headlines (5-7 words of 2-4 syllables, from a vocabulary
+    of 50k words), with `duplicate_rate` of them rewrites of an
+    earlier one (a word dropped and another added).
+    """
+    syllables = [chr(code) for code in range(0xAC00, 0xD7A4, 37)]
+    vocabulary = [''.join(rng.choices(syllables, k=rng.randint(2, 4))) for _ in range(50_000)]
+    titles = []
+    for _ in range(size):
+        if titles and rng.random() < duplicate_rate:
+            words = rng.choice(titles).split()
+            words.pop(rng.randrange(len(words)))
+            words.insert(rng.randrange(len(words) + 1), rng.choice(vocabulary))
+        else:
+            words = rng.sample(vocabulary, rng.randint(5, 7))
+        titles.append(' '.join(words))
+    return [{'title': title} for title in titles]
+
+def timing(sizes):
+    rng = random.Random(11)
+    for size in sizes:
+        items = synthetic_items(size, rng)
+        start = time.perf_counter()
+        for item in items:
+            item['fingerprint'] = fingerprint(item['title'])
+        signed = time.perf_counter()
+        duplicates = cluster_near_duplicates(items)
+        clustered = time.perf_counter()
+        print(f"   {size:>8,} items: fingerprint {(signed - start) * 1000:8.1f} ms, "
+              f"cluster {(clustered - signed) * 1000:8.1f} ms ({(clustered - signed) * 1e6 / size:.1f} µs/item), "
+              f"{duplicates:,} grouped")
+
+def main():
+    timing([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
+
+if __name__ == "__main__":
+    main()
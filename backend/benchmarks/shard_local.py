@@ -0,0 +1,121 @@
+"""
+Local dry run of a sharded newsletter send: N processes, each acting as one
+Cloud Run task, against a shared fake Firestore and a recording SMTP server.
+Checks that every subscriber got exactly one email, that one shared issue
+(and one issue snapshot) was published, and that mail_history holds the
+merged totals.
+
+Usage (from backend/):
+    python -m benchmarks.shard_local                # 4 shards, 500 subscribers
+    python -m benchmarks.shard_local 8 5000
+"""
+import sys
+import os
+import random
+import datetime
+import collections
+import multiprocessing
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testing.fakes import FakeFirestore, RecordingSMTP
+from services.crypto_service import encrypt_email
+
+CATEGORIES = ['정치', '경제', '사회', '부동산', 'IT', '과학', '문화', '지식']
+
+def seed(db, subscribers, rng):
+    now = datetime.datetime.now()
+    for i in range(300):
+        db.collection('contents').document(f"youtube_v{i}").set({
+            'source_type': 'youtube',
+            'original_id': f"v{i}",
+            'title': f"제목 {i}",
+            'url': f"https://www.youtube.com/watch?v=v{i}",
+            'view_count': rng.randrange(100000),
+            'opinion_leader': f"channel{i % 40}",
+            'category': CATEGORIES[i % len(CATEGORIES)],
+            'scraped_at': now - datetime.timedelta(hours=rng.randrange(24)),
+        })
+    for i in range(subscribers):
+        data = {'email': encrypt_email(f"reader{i}@example.com"), 'status': 'active', 'is_test': False}
+        if i % 3 == 0:
+            data['preferences'] = {'categories': [CATEGORIES[i % 4]], 'channels': []}
+        db.collection('subscribers').document(f"sub{i:06d}").set(data)
+
+def run_task(index, count, docs, lock, delivered):
+    os.environ.update(
+        CLOUD_RUN_TASK_INDEX=str(index),
+        CLOUD_RUN_TASK_COUNT=str(count),
+        NEWSLETTER_RUN_ID='local-shard-test',
+        NEWSLETTER_SEED='local-shard-test',
+        EMAIL_USER='local', EMAIL_PASSWORD='local',
+        EMAIL_STARTTLS='0', EMAIL_RATE_PER_SECOND='0',
+    )
+    import utils.db
+    utils.db._db_client = FakeFirestore(docs, lock)
+    RecordingSMTP.delivered = delivered
+
+    from services.email_service import EmailService
+    create_engine = EmailService.create_delivery_engine
+
+    def create_recording_engine(self):
+        engine = create_engine(self)
+        engine.smtp_factory = RecordingSMTP
+        return engine
+
+    EmailService.create_delivery_engine = create_recording_engine
+
+    import run_newsletter
+    run_newsletter.run_newsletter_job(is_production=True)
+
+def main(shards=4, subscribers=500):
+    manager = multiprocessing.Manager()
+    docs, lock, delivered = manager.dict(), manager.RLock(), manager.list()
+    seed(FakeFirestore(docs, lock), subscribers, random.Random(7))
+
+    tasks = [
+        multiprocessing.Process(target=run_task, args=(index, shards, docs, lock, delivered))
+        for index in range(shards)
+    ]
+    for task in tasks:
+        task.start()
+    for task in tasks:
+        task.join()
+
+    delivered = list(delivered)
+    repeats = [email for email, n in collections.Counter(delivered).items() if n > 1]
+    history = docs.get('mail_history/run-local-shard-test') or {}
+    issue = docs.get('newsletter_issues/run-local-shard-test') or {}
+    snapshots = [
+        data for path, data in docs.items()
+        if path.startswith('newsletter_snapshots/') and data.get('mail_id') == 'run-local-shard-test'
+    ]
+    shard_docs = {
+        path.rsplit('/', 1)[-1]: data for path, data in docs.items()
+        if path.startswith('mail_history/run-local-shard-test/shards/')
+    }
+
+    print("\n=== sharded send ===")
+    for index, report in sorted(shard_docs.items()):
+        print(f"  shard {index}: {report['success_count']} sent of {report['recipient_count']}")
+    print(f"  delivered {len(delivered)} / {subscribers} subscribers, {len(repeats)} duplicate sends")
+    print(f"  shared issue: {issue.get('item_count')} candidate items, "
+          f"{len(snapshots)} snapshot(s) with {snapshots[0]['item_count'] if snapshots else 0} stories")
+    print(f"  mail_history: status={history.get('status')} "
+          f"sent={history.get('success_count')} recipients={history.get('recipient_count')}")
+
+    ok = (
+        all(task.exitcode == 0 for task in tasks)
+        and len(set(delivered)) == subscribers
+        and not repeats
+        and issue.get('item_count')
+        and len(snapshots) == 1
+        and history.get('status') == 'success'
+        and history.get('success_count') == subscribers
+    )
+    print("✅ OK" if ok else "❌ FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:]]
+    sys.exit(main(*args))
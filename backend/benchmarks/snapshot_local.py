@@ -0,0 +1,94 @@
+"""
+Local dry run of issue snapshots: a send writes newsletter_snapshots/{date}_{mail_id},
+and resuming that send (with live contents changed in between) re-sends the
+snapshot's HTML without running the content queries or the selection again.
+
+Usage (from backend/):
+    python -m benchmarks.snapshot_local
+"""
+import sys
+import os
+import json
+import email
+import random
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from testing.fakes import FakeFirestore, RecordingSMTP
+from benchmarks.shard_local import seed
+
+SUBSCRIBERS = 30
+
+class CapturingSMTP(RecordingSMTP):
+    """Keeps the HTML body of every message."""
+    bodies = []
+
+    def sendmail(self, from_addr, to_addr, message):
+        html = next(
+            part.get_payload(decode=True).decode('utf-8')
+            for part in email.message_from_string(message).walk() if part.get_content_type() == 'text/html'
+        )
+        CapturingSMTP.bodies.append((to_addr, html))
+        return super().sendmail(from_addr, to_addr, message)
+
+def main():
+    os.environ.update(
+        NEWSLETTER_PERSONALIZE='0', NEWSLETTER_SEED='snapshot-test',
+        EMAIL_USER='local', EMAIL_PASSWORD='local', EMAIL_STARTTLS='0', EMAIL_RATE_PER_SECOND='0',
+    )
+    import utils.db
+    db = FakeFirestore()
+    utils.db._db_client = db
+    rng = random.Random(3)
+    seed(db, SUBSCRIBERS, rng)
+
+    from services.email_service import EmailService, make_sid
+    create_engine = EmailService.create_delivery_engine
+
+    def create_capturing_engine(self):
+        engine = create_engine(self)
+        engine.smtp_factory = CapturingSMTP
+        return engine
+
+    EmailService.create_delivery_engine = create_capturing_engine
+
+    import run_newsletter
+    from newsletter.snapshots import SNAPSHOTS_COLLECTION, content_hash
+    prepare_calls = []
+    prepare_issue = run_newsletter.prepare_issue
+    run_newsletter.prepare_issue = lambda *args: prepare_calls.append(1) or prepare_issue(*args)
+
+    # 1. A normal send writes the snapshot
+    run_newsletter.run_newsletter_job(is_production=True)
+    snapshots = {path: data for path, data in db.docs.items() if path.startswith(f"{SNAPSHOTS_COLLECTION}/")}
+    path, snapshot = next(iter(snapshots.items()))
+    mail_id = snapshot['mail_id']
+    first_send = dict(CapturingSMTP.bodies)
+    size = len(json.dumps(snapshot, ensure_ascii=False, default=str).encode('utf-8'))
+
+    # 2. Live data changes, the journal is lost, and the send is resumed
+    for doc_path in [p for p in db.docs if p.startswith('contents/')]:
+        db.docs[doc_path] = {**db.docs[doc_path], 'view_count': rng.randrange(100000)}
+    for doc_path in [p for p in db.docs if p.startswith(f"mail_history/{mail_id}/deliveries/")]:
+        db.remove(doc_path)
+    CapturingSMTP.bodies = []
+    run_newsletter.run_newsletter_job(is_production=True, resume_mail_id=mail_id)
+    resent = dict(CapturingSMTP.bodies)
+
+    expected = {address: str(make_sid(address)).join(snapshot['html_parts']) for address in first_send}
+    print("\n=== issue snapshot ===")
+    print(f"  {path}: {snapshot['item_count']} stories, {len(snapshot['html_parts'])} HTML parts, {size / 1024:.1f} KiB")
+    print(f"  first send: {len(first_send)} emails, resume: {len(resent)} emails, prepare_issue calls: {len(prepare_calls)}")
+    ok = (
+        len(snapshots) == 1
+        and snapshot['content_hash'] == content_hash(snapshot['selection'], snapshot['html_parts'])
+        and len(first_send) == SUBSCRIBERS
+        and first_send == expected
+        and resent == expected
+        and len(prepare_calls) == 1
+    )
+    print("✅ OK" if ok else "❌ FAILED")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
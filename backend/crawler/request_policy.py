@@ -0,0 +1,207 @@
+import math
+import time
+import random
+import threading
+import email.utils
+import requests
+from utils.metrics import metrics
+
+
+class RequestAborted(Exception):
+    """정책상 요청을 보내지 않고 포기한 경우. 이번 실행에서는 다시 시도해도 소용없습니다."""
+
+
+class DeadlineExceeded(RequestAborted):
+    """크롤링 시간 예산을 다 씀."""
+
+
+class CircuitOpen(RequestAborted):
+    """연속 실패로 서킷 브레이커가 열려 있음 (API 장애로 판단)."""
+
+
+class QuotaExhausted(RequestAborted):
+    """일일 할당량 소진 (403 quotaExceeded / dailyLimitExceeded)."""
+
+
+def _retry_after(resp: requests.Response) -> float:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 초로 변환합니다. 없거나 잘못되면 0."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return 0.0
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _error_reason(resp: requests.Response) -> str | None:
+    """Google API 오류 응답의 error.errors[0].reason (예: quotaExceeded)."""
+    try:
+        errors = resp.json().get("error", {}).get("errors") or [{}]
+        return errors[0].get("reason")
+    except (ValueError, AttributeError):
+        return None
+
+
+class RequestPolicy:
+    """
+    크롤링 전체 시간 예산 안에서 API 호출의 타임아웃·재시도·차단을 정합니다.
+    여러 워커 스레드가 하나의 정책을 공유합니다.
+
+    - 데드라인: 정책 생성 시점부터 deadline초 (None이면 무제한).
+      호출별 타임아웃은 call_timeout과 남은 시간 중 작은 값이고,
+      남은 시간이 min_timeout보다 적으면 보내지 않고 DeadlineExceeded.
+    - 재시도: 타임아웃/연결 오류, 5xx, 429, 403 rateLimitExceeded 류는
+      지터를 준 지수 백오프(0 ~ base_delay·2^n, 최대 max_delay)로 최대 max_attempts회.
+      Retry-After가 있으면 최소 그만큼 기다리고, 기다리면 데드라인을 넘기는 경우는 바로 포기합니다.
+    - 할당량: 403 quotaExceeded / dailyLimitExceeded는 재시도하지 않고,
+      이후 모든 호출을 QuotaExhausted로 즉시 실패시킵니다.
+    - 서킷 브레이커: 재시도 대상 실패가 breaker_threshold번 연속되면 breaker_cooldown초 동안
+      모든 호출을 CircuitOpen으로 즉시 실패시킵니다. 쿨다운 후에는 한 건만 시험 삼아 보내고(half-open),
+      성공하면 닫고 실패하면 다시 엽니다.
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+    RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded"}
+    QUOTA_REASONS = {"quotaExceeded", "dailyLimitExceeded"}
+
+    def __init__(self, deadline: float | None = None, call_timeout: float = 15, min_timeout: float = 1,
+                 max_attempts: int = 4, base_delay: float = 0.5, max_delay: float = 30,
+                 breaker_threshold: int = 8, breaker_cooldown: float = 60, name: str = "youtube_api",
+                 clock=time.monotonic, sleep=time.sleep, rng: random.Random | None = None):
+        self.deadline = deadline
+        self.call_timeout = call_timeout
+        self.min_timeout = min_timeout
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker_threshold = breaker_threshold
+        self.breaker_cooldown = breaker_cooldown
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+        self._started = clock()
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+        self._quota_exhausted = False
+
+    # ── 시간 예산 ──
+
+    def remaining(self) -> float:
+        """남은 시간(초). 데드라인이 없으면 무한대."""
+        if self.deadline is None:
+            return math.inf
+        return self.deadline - (self._clock() - self._started)
+
+    def expired(self, reserve: float = 0.0) -> bool:
+        """남은 시간이 reserve초 이하인지 (뒤 단계를 위해 시간을 남겨둘 때 사용)."""
+        return self.remaining() <= reserve
+
+    def timeout(self) -> float:
+        remaining = self.remaining()
+        if remaining < self.min_timeout:
+            raise DeadlineExceeded(f"시간 예산 {self.deadline:.0f}초 소진")
+        return min(self.call_timeout, remaining)
+
+    def backoff(self, attempt: int, retry_after: float = 0.0) -> float:
+        """attempt번째 재시도 전 대기 시간 (full jitter, Retry-After 이상)."""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return max(self._rng.uniform(0, ceiling), retry_after)
+
+    # ── 서킷 브레이커 ──
+
+    def _before_call(self):
+        with self._lock:
+            if self._quota_exhausted:
+                raise QuotaExhausted("YouTube API 일일 할당량 소진")
+            if self._opened_at is None:
+                return
+            if self._clock() - self._opened_at < self.breaker_cooldown or self._probing:
+                raise CircuitOpen(f"연속 실패 {self._failures}회로 차단 중")
+            # 쿨다운이 지나면 이 호출 한 건만 통과 (half-open)
+            self._probing = True
+
+    def _record(self, failed: bool):
+        with self._lock:
+            self._probing = False
+            if not failed:
+                self._failures = 0
+                if self._opened_at is not None:
+                    print("  🔌 API 응답 회복 — 차단 해제")
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._failures >= self.breaker_threshold:
+                if self._opened_at is None:
+                    print(f"  🔌 연속 실패 {self._failures}회 — {self.breaker_cooldown:.0f}초간 API 호출 차단")
+                    metrics.inc(f"{self.name}_circuit_opened")
+                self._opened_at = self._clock()
+
+    # ── 호출 ──
+
+    def _classify(self, resp: requests.Response) -> str | None:
+        """재시도할 응답이면 사유를, 아니면 None. 할당량 소진이면 QuotaExhausted."""
+        if resp.status_code == 403:
+            reason = _error_reason(resp)
+            if reason in self.QUOTA_REASONS:
+                with self._lock:
+                    self._quota_exhausted = True
+                metrics.inc(f"{self.name}_aborted", reason="quota")
+                raise QuotaExhausted(f"YouTube API 일일 할당량 소진 ({reason})")
+            return "rate_limit" if reason in self.RATE_LIMIT_REASONS else None
+        if resp.status_code == 429:
+            return "rate_limit"
+        if resp.status_code in self.RETRYABLE_STATUS:
+            return "server_error"
+        return None
+
+    def send(self, request, **labels) -> requests.Response:
+        """
+        request(timeout)를 정책에 따라 호출하고 마지막 응답을 반환합니다.
+        재시도를 다 써도 실패하면 마지막 오류 응답을 반환하거나 마지막 예외를 다시 던집니다.
+        """
+        for attempt in range(self.max_attempts):
+            try:
+                self._before_call()
+                timeout = self.timeout()
+            except RequestAborted as e:
+                reason = "deadline" if isinstance(e, DeadlineExceeded) else \
+                    "quota" if isinstance(e, QuotaExhausted) else "circuit_open"
+                metrics.inc(f"{self.name}_aborted", reason=reason, **labels)
+                raise
+
+            retry_after = 0.0
+            try:
+                resp = request(timeout)
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self._record(failed=True)
+                reason, resp, error = "timeout" if isinstance(e, requests.Timeout) else "connection", None, e
+            except Exception:
+                # 그 밖의 예외(ChunkedEncodingError, InvalidURL, JSON 오류 등)는 재시도하지 않지만
+                # 실패로 기록해야 half-open 시험 호출이 풀립니다
+                self._record(failed=True)
+                raise
+            else:
+                reason, error = self._classify(resp), None
+                self._record(failed=reason is not None)
+                if reason is None:
+                    return resp
+                retry_after = _retry_after(resp)
+
+            delay = self.backoff(attempt, retry_after)
+            if attempt + 1 >= self.max_attempts or delay + self.min_timeout > self.remaining():
+                break
+            metrics.inc(f"{self.name}_retries", reason=reason, **labels)
+            self._sleep(delay)
+
+        if error is not None:
+            raise error
+        return resp
@@ -0,0 +1,135 @@
+import math
+import time
+import datetime
+
+
+def _parse_time(value: str) -> float | None:
+    """ISO 8601 (YouTube의 ...Z 형식 포함) → epoch초. 파싱 실패 시 None."""
+    try:
+        return datetime.datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+class CrawlScheduler:
+    """
+    채널별 업로드 빈도에 맞춰 이번 실행에서 폴링할 채널과 가져올 영상 수를 정합니다.
+
+    - 업로드 빈도: 워터마크에 저장된 최근 업로드 시각(recent_published)으로 추정.
+      기록이 적은 채널은 사전값(주 1회)에 가깝게 보정하고, 기록이 없는 채널은
+      첫 폴링에서 BOOTSTRAP_LIMIT개를 가져와 기록을 쌓습니다.
+    - 폴링 주기: 한 번 폴링할 때 새 영상이 약 1개 있도록 24h / 일일 업로드 수,
+      [실행 간격, max_interval_hours] 범위로 제한합니다.
+    - 가져올 개수: 지난 폴링 이후 예상 업로드 수의 1.5배 + 1, [min_limit, max_limit].
+    - 예산: 일일 할당량(daily_quota)을 하루 실행 횟수로 나눈 만큼만 이번 실행에 사용.
+      폴링 시점이 된 채널은 밀린 정도가 큰 순서로 예산 안에서 선택하고,
+      주기를 한 실행 이상 넘긴(overdue) 채널과 처음 보는 채널은 예산과 무관하게 항상 폴링합니다.
+
+    상태(채널별 마지막 폴링 시각, 오늘 사용한 할당량)는 load()/save()를 가진
+    저장소(예: StateDoc)에 보관합니다.
+    """
+
+    # 사전 업로드 빈도 (주 1회, 가중치는 관측 0.1건어치 — 기록이 쌓이면 거의 영향 없음)
+    PRIOR_UPLOADS = 0.1
+    PRIOR_DAYS = 0.7
+    # 기록이 없는 채널은 첫 폴링에서 넉넉히 가져와 빈도 추정에 쓸 기록을 쌓음
+    BOOTSTRAP_LIMIT = 15
+    # 폴링 1회 비용: playlistItems 1 unit + videos.list 몫 (50개당 1 unit)
+    POLL_COST = 1
+    IDS_PER_DETAILS_UNIT = 50
+
+    def __init__(self, store=None, daily_quota: int = 2000, runs_per_day: int = 1,
+                 max_interval_hours: float = 168, min_limit: int = 3, max_limit: int = 25,
+                 now: float | None = None):
+        self._store = store
+        state = store.load() if store else {}
+        self._channels: dict[str, dict] = state.get("channels", {})
+        self._usage: dict = state.get("usage", {})
+        self.daily_quota = daily_quota
+        self.runs_per_day = max(1, runs_per_day)
+        self.run_interval = 86400 / self.runs_per_day
+        self.max_interval = max(max_interval_hours * 3600, self.run_interval)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.now = now if now is not None else time.time()
+
+    @property
+    def today(self) -> str:
+        return datetime.datetime.fromtimestamp(self.now, datetime.timezone.utc).strftime("%Y-%m-%d")
+
+    def used_today(self) -> int:
+        return self._usage.get("units", 0) if self._usage.get("date") == self.today else 0
+
+    def upload_rate(self, published: list[str]) -> float:
+        """하루 평균 업로드 수 추정치. 가장 오래된 기록부터 지금까지의 업로드 수 / 기간."""
+        times = [t for t in (_parse_time(p) for p in published) if t is not None]
+        if not times:
+            return self.PRIOR_UPLOADS / self.PRIOR_DAYS
+        window_days = max(self.now - min(times), 0) / 86400
+        return (len(times) + self.PRIOR_UPLOADS) / (window_days + self.PRIOR_DAYS)
+
+    def interval_for(self, rate: float) -> float:
+        """폴링 주기(초): 새 영상 ~1개마다 한 번."""
+        return min(max(86400 / max(rate, 1e-6), self.run_interval), self.max_interval)
+
+    def limit_for(self, rate: float, elapsed: float) -> int:
+        """지난 폴링 이후(elapsed초) 예상 업로드 수의 1.5배 + 1."""
+        expected = rate * elapsed / 86400
+        return min(max(math.ceil(expected * 1.5) + 1, self.min_limit), self.max_limit)
+
+    def plan(self, sources: list[dict], history_for) -> list[dict]:
+        """
+        이번 실행에서 크롤링할 source 목록을 반환합니다 (각 dict에 "limit" 추가).
+        history_for(url)는 그 채널의 최근 업로드 시각 리스트를 반환해야 합니다.
+        """
+        budget = max(0, min(self.daily_quota / self.runs_per_day, self.daily_quota - self.used_today()))
+        forced, due = [], []
+        for source in sources:
+            history = history_for(source["url"])
+            rate = self.upload_rate(history)
+            interval = self.interval_for(rate)
+            last_polled = self._channels.get(source["url"], {}).get("last_polled_at")
+            # 실행 시각이 조금씩 어긋나도 다음 실행까지 밀리지 않도록 실행 간격 10%의 여유
+            elapsed = self.now - last_polled + self.run_interval * 0.1 if last_polled else math.inf
+            if history and last_polled:
+                limit = self.limit_for(rate, elapsed)
+            else:
+                limit = min(self.BOOTSTRAP_LIMIT, self.max_limit)
+            entry = ({**source, "limit": limit}, elapsed / interval)
+            if elapsed >= interval + self.run_interval:
+                forced.append(entry)
+            elif elapsed >= interval:
+                due.append(entry)
+
+        planned = [source for source, _ in forced]
+        spent = sum(self.cost(source["limit"]) for source in planned)
+        # 오래 밀린 채널부터 예산 안에서
+        for source, _ in sorted(due, key=lambda entry: -entry[1]):
+            cost = self.cost(source["limit"])
+            if spent + cost > budget:
+                continue
+            planned.append(source)
+            spent += cost
+
+        print(f"🗓️ 스케줄: {len(sources)}개 채널 중 {len(planned)}개 폴링 "
+              f"(밀린 채널 {len(forced)}개, 예상 {spent:.0f} / 예산 {budget:.0f} units, "
+              f"오늘 사용 {self.used_today()} / {self.daily_quota})")
+        return planned
+
+    def cost(self, limit: int) -> float:
+        return self.POLL_COST + limit / self.IDS_PER_DETAILS_UNIT
+
+    def mark_polled(self, sources: list[dict]):
+        for source in sources:
+            self._channels.setdefault(source["url"], {})["last_polled_at"] = self.now
+
+    def record_usage(self, units: int):
+        self._usage = {"date": self.today, "units": self.used_today() + units}
+
+    def save(self, sources: list[dict] | None = None):
+        """저장소에 상태를 기록합니다. sources를 주면 더 이상 없는 채널의 상태는 정리합니다."""
+        if sources is not None:
+            urls = {source["url"] for source in sources}
+            self._channels = {url: entry for url, entry in self._channels.items() if url in urls}
+        if self._store:
+            self._store.save({"channels": self._channels, "usage": self._usage})
@@ -1,6 +1,12 @@
 import os
+import time
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 import requests
+from requests.adapters import HTTPAdapter
+from crawler.sources.youtube_rss import YouTubeRSSFeed
+from crawler.request_policy import RequestPolicy, RequestAborted
+from utils.metrics import metrics
 
 
 class YouTubeCrawler:
@@ -8,35 +14,115 @@ class YouTubeCrawler:
     YouTube Data API v3를 사용하여 채널 최신 영상을 크롤링합니다.
     yt-dlp 방식 대비 IP 차단 없음, 공식 API 사용으로 안정적입니다.
 
-    할당량: 채널당 ~3 units, 40채널 = ~120 units/일 (10,000 할당량 대비 1.2%)
+    할당량: 채널당 ~2 units + videos.list ⌈영상 수/50⌉ units (bulk 사용 시)
+           40채널 = ~84 units/일 (10,000 할당량 대비 0.8%)
     """
 
     BASE_URL = "https://www.googleapis.com/youtube/v3"
+    # videos.list 의 id 파라미터 최대 개수
+    MAX_IDS_PER_REQUEST = 50
+    # 하이워터마크에 보관하는 최근 영상 ID 수
+    RECENT_IDS_KEPT = 30
+    # 엔드포인트별 할당량 단위 (304 응답도 요청 1건으로 차감)
+    QUOTA_COST = {"channels": 1, "playlistItems": 1, "videos": 1, "search": 100}
+    # 크롤링 시간 예산 중 상세 조회(videos.list) 단계 몫으로 남겨두는 비율
+    DETAILS_TIME_RESERVE = 0.1
 
-    def __init__(self):
+    def __init__(self, pool_size: int = 10, channel_store=None, channel_ttl_days: float = 30,
+                 watermark_store=None, view_refresh_hours: float = 72, rss_prefilter: bool = False,
+                 request_policy: RequestPolicy | None = None):
         self.api_key = os.environ.get("YOUTUBE_API_KEY")
         if not self.api_key:
             raise ValueError("YOUTUBE_API_KEY 환경변수가 설정되지 않았습니다.")
         # handle → channel_id 캐시 (중복 조회 방지)
         self._channel_cache: dict[str, str] = {}
 
-    def _get(self, endpoint: str, params: dict) -> dict:
+        # 실행 간 유지되는 uploads 플레이리스트 캐시 (load()/save()를 가진 저장소, 예: StateDoc)
+        # {lookup_key: {"uploads_id": str, "resolved_at": epoch초}}
+        self._channel_store = channel_store
+        self._channel_ttl = channel_ttl_days * 86400
+        self._resolved: dict[str, dict] = channel_store.load() if channel_store else {}
+        self._from_store: set[str] = set()
+        self._resolved_dirty = False
+
+        # uploads 플레이리스트별 하이워터마크 (증분 크롤링용)
+        # {uploads_id: {"etag", "newest_id", "newest_published_at", "recent_ids",
+        #               "recent_published", "views_refreshed_at"}}
+        self._watermark_store = watermark_store
+        self._watermarks: dict[str, dict] = watermark_store.load() if watermark_store else {}
+        self._view_refresh = view_refresh_hours * 3600
+        # 아직 반영하지 않은 하이워터마크 변경 — 상세 조회가 끝난 뒤 commit_watermarks()가 반영
+        # {uploads_id: {"etag", "items", "requested", "views_refreshed_at"}}
+        self._pending_watermarks: dict[str, dict] = {}
+
+        # keep-alive 세션 공유 — 요청마다 TLS 핸드셰이크를 다시 하지 않도록
+        # pool_size는 동시 크롤링 워커 수 이상이어야 커넥션 재사용이 됩니다.
+        self._session = requests.Session()
+        # 호스트별 풀: googleapis.com (Data API) + youtube.com (RSS 피드)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max(1, pool_size))
+        self._session.mount("https://", adapter)
+
+        # 타임아웃/재시도/서킷 브레이커 정책 (기본: 데드라인 없음, 호출당 15초)
+        self._policy = request_policy or RequestPolicy()
+        # 시간 예산·할당량 부족으로 이번 실행에서 건너뛴 채널 URL
+        self.skipped_urls: set[str] = set()
+        # API 오류로 크롤링에 실패한 채널 URL (스케줄러가 폴링한 것으로 치지 않도록)
+        self.failed_urls: set[str] = set()
+        # 마지막 조회가 실패한 채널 URL(channels.list)과 uploads ID(playlistItems)
+        self._failed_lookups: set[str] = set()
+
+        # 할당량 0의 RSS 사전 필터 — 새 영상이 없는 채널은 Data API를 호출하지 않음
+        self._rss_feed = YouTubeRSSFeed(self._session) if rss_prefilter else None
+
+    def close(self):
+        self._session.close()
+
+    def _get(self, endpoint: str, params: dict, etag: str | None = None) -> dict | None:
+        """
+        API GET 요청. etag를 주면 조건부 요청(If-None-Match)을 보내고,
+        변경이 없으면(304 Not Modified) None을 반환합니다.
+
+        타임아웃·재시도·차단은 RequestPolicy를 따르며, 정책상 포기하면
+        RequestAborted(DeadlineExceeded / CircuitOpen / QuotaExhausted)를 던집니다.
+        """
         params["key"] = self.api_key
-        resp = requests.get(f"{self.BASE_URL}/{endpoint}", params=params, timeout=15)
+        headers = {"If-None-Match": etag} if etag else None
+
+        def attempt(timeout: float) -> requests.Response:
+            metrics.inc("youtube_quota_units", self.QUOTA_COST.get(endpoint, 1), endpoint=endpoint)
+            with metrics.span("youtube_api", endpoint=endpoint):
+                resp = self._session.get(f"{self.BASE_URL}/{endpoint}", params=params, headers=headers, timeout=timeout)
+            metrics.inc("youtube_api_responses", endpoint=endpoint, status=resp.status_code)
+            return resp
+
+        resp = self._policy.send(attempt, endpoint=endpoint)
+        if resp.status_code == 304:
+            return None
         if not resp.ok:
             print(f"  API 오류 상세: {resp.text[:300]}")
         resp.raise_for_status()
         return resp.json()
 
-    def _get_uploads_playlist_id(self, channel_url: str) -> str | None:
+    def save_channel_cache(self):
+        """변경된 채널 해석 결과를 저장소에 기록합니다 (크롤링 종료 시 1회)."""
+        if self._channel_store and self._resolved_dirty:
+            self._channel_store.save(self._resolved)
+            self._resolved_dirty = False
+
+    def save_state(self):
         """
-        채널 URL에서 uploads 플레이리스트 ID를 가져옵니다.
-        @handle, /channel/UC..., /c/name, /user/name 형식 모두 지원합니다.
+        채널 해석 캐시와 하이워터마크를 저장소에 기록합니다.
+        크롤링한 콘텐츠를 저장한 뒤에 호출해야 합니다 — 먼저 기록하면 저장에 실패한
+        새 영상을 다음 실행에서 "이미 본 영상"으로 건너뜁니다.
         """
-        if channel_url in self._channel_cache:
-            return self._channel_cache[channel_url]
+        self.save_channel_cache()
+        if self._watermark_store and self._watermarks:
+            self._watermark_store.save(self._watermarks)
 
-        params: dict = {"part": "contentDetails"}
+    @staticmethod
+    def _channel_lookup_params(channel_url: str) -> dict | None:
+        """채널 URL을 channels.list 조회 파라미터로 변환합니다."""
+        params: dict = {}
 
         # @handle 추출 — forHandle 파라미터는 @ 없이 핸들명만 전달
         if "/@" in channel_url:
@@ -49,45 +135,215 @@ class YouTubeCrawler:
             username = channel_url.split("/user/")[-1].rstrip("/")
             params["forUsername"] = username
         elif "/c/" in channel_url:
-            # /c/ 형식은 forHandle로 시도
+            # /c/ 형식은 forHandle로 시도 — @handle과 같은 조회 키가 되도록 @ 없이 전달
             name = channel_url.split("/c/")[-1].rstrip("/")
-            params["forHandle"] = f"@{name}"
+            params["forHandle"] = name
         else:
+            return None
+        return params
+
+    def _get_uploads_playlist_id(self, channel_url: str, force_refresh: bool = False) -> str | None:
+        """
+        채널 URL에서 uploads 플레이리스트 ID를 가져옵니다.
+        @handle, /channel/UC..., /c/name, /user/name 형식 모두 지원합니다.
+
+        저장소에 TTL 이내 결과가 있으면 channels.list 호출 없이 재사용합니다.
+        force_refresh=True면 캐시를 무시하고 다시 조회합니다.
+        """
+        if not force_refresh and channel_url in self._channel_cache:
+            return self._channel_cache[channel_url]
+
+        lookup = self._channel_lookup_params(channel_url)
+        if lookup is None:
             print(f"  ⚠️ 지원하지 않는 채널 URL 형식: {channel_url}")
             return None
 
+        # URL 형식(@handle, /channel/, /user/, /c/)과 무관하게 조회 파라미터 기준으로 캐싱
+        key = "&".join(f"{k}={v}" for k, v in sorted(lookup.items()))
+        entry = self._resolved.get(key)
+        if not force_refresh and entry and time.time() - entry.get("resolved_at", 0) < self._channel_ttl:
+            self._channel_cache[channel_url] = entry["uploads_id"]
+            self._from_store.add(channel_url)
+            return entry["uploads_id"]
+
+        self._from_store.discard(channel_url)
+        if entry:
+            del self._resolved[key]
+            self._resolved_dirty = True
+
         try:
-            data = self._get("channels", params)
+            data = self._get("channels", {"part": "contentDetails", **lookup})
             items = data.get("items", [])
             if not items:
                 print(f"  ⚠️ 채널을 찾을 수 없음: {channel_url}")
                 return None
 
             uploads_id = items[0]["contentDetails"]["relatedPlaylists"]["uploads"]
+            self._failed_lookups.discard(channel_url)
             self._channel_cache[channel_url] = uploads_id
+            self._resolved[key] = {"uploads_id": uploads_id, "resolved_at": time.time()}
+            self._resolved_dirty = True
             return uploads_id
+        except RequestAborted:
+            raise
         except Exception as e:
             print(f"  ❌ channels.list 실패 ({channel_url}): {e}")
+            self._failed_lookups.add(channel_url)
             return None
 
-    def _get_video_ids(self, uploads_playlist_id: str, limit: int) -> list[str]:
-        """uploads 플레이리스트에서 최신 영상 ID를 가져옵니다."""
+    def known_uploads_id(self, channel_url: str) -> str | None:
+        """API 호출 없이 알 수 있는 uploads 플레이리스트 ID (이번 실행 또는 저장소 캐시)."""
+        if channel_url in self._channel_cache:
+            return self._channel_cache[channel_url]
+        lookup = self._channel_lookup_params(channel_url)
+        if lookup is None:
+            return None
+        key = "&".join(f"{k}={v}" for k, v in sorted(lookup.items()))
+        return (self._resolved.get(key) or {}).get("uploads_id")
+
+    def channel_history(self, channel_url: str) -> list[str]:
+        """저장된 최근 영상 업로드 시각(ISO 8601, 최신순). 본 적 없는 채널이면 빈 리스트."""
+        uploads_id = self.known_uploads_id(channel_url)
+        watermark = self._watermarks.get(uploads_id, {}) if uploads_id else {}
+        return [t for t in watermark.get("recent_published", []) if t]
+
+    def _get_channel_video_ids(self, channel_url: str, limit: int, incremental: bool = False) -> list[str]:
+        """
+        채널의 최신 영상 ID를 가져옵니다.
+        저장된 uploads ID로 조회가 실패하면 채널을 강제로 다시 해석해 한 번 더 시도합니다.
+
+        incremental=True면 저장된 ETag로 조건부 요청을 보내고, 이전에 본 적 없는
+        영상 ID만 반환합니다. 단, 조회수 갱신 주기(view_refresh_hours)가 지난 채널은
+        최신 영상 전체를 반환해 조회수를 다시 가져오게 합니다.
+        """
+        uploads_id = self._get_uploads_playlist_id(channel_url)
+        if not uploads_id:
+            return []
+
+        watermark = self._watermarks.get(uploads_id, {})
+        seen = set(watermark.get("recent_ids", []))
+        etag = watermark.get("etag") if incremental else None
+
+        if self._rss_feed is not None and self._feed_has_nothing_new(uploads_id, limit, seen, watermark):
+            return []
+
+        video_ids = self._get_video_ids(uploads_id, limit, etag=etag)
+        if video_ids is None:
+            # 304 Not Modified — 플레이리스트 변화 없음
+            video_ids = watermark.get("recent_ids", [])[:limit]
+        elif not video_ids and channel_url in self._from_store:
+            print(f"  🔄 캐시된 uploads ID 재확인: {channel_url}")
+            refreshed_id = self._get_uploads_playlist_id(channel_url, force_refresh=True)
+            if refreshed_id:
+                uploads_id = refreshed_id
+                video_ids = self._get_video_ids(refreshed_id, limit) or []
+
+        if not video_ids:
+            return []
+
+        watermark = self._watermarks.get(uploads_id, {})
+        pending = self._pending_watermarks.setdefault(uploads_id, {})
+        now = time.time()
+        if not incremental or now - watermark.get("views_refreshed_at", 0) >= self._view_refresh:
+            pending["views_refreshed_at"] = now
+        else:
+            video_ids = [video_id for video_id in video_ids if video_id not in seen]
+        pending["requested"] = video_ids
+        return video_ids
+
+    def _feed_has_nothing_new(self, uploads_id: str, limit: int, seen: set, watermark: dict) -> bool:
+        """
+        RSS 피드의 최신 영상이 모두 이미 본 영상이면 True.
+        피드를 못 읽었거나, 피드에 항목이 없거나, 조회수 갱신 주기가 지났으면 False (Data API 경로로 진행).
+        """
+        if time.time() - watermark.get("views_refreshed_at", 0) >= self._view_refresh:
+            return False
+        channel_id = YouTubeRSSFeed.channel_id_for(uploads_id)
+        if not channel_id:
+            return False
+        feed_ids = self._rss_feed.fetch_video_ids(channel_id)
+        if not feed_ids:
+            # 빈 피드(일시적 오류, 항목 없는 200 응답)는 "새 영상 없음"의 근거가 되지 못합니다
+            return False
+        return all(video_id in seen for video_id in feed_ids[:limit])
+
+    def commit_watermarks(self, fetched_ids: set[str]):
+        """
+        상세 조회(videos.list)가 끝난 영상만 하이워터마크에 반영합니다.
+        fetched_ids는 videos.list 요청이 성공한 ID (삭제된 영상처럼 응답에 없는 ID 포함).
+        상세를 못 가져온 영상이 있는 플레이리스트는 그 영상을 본 것으로 기록하지 않고
+        ETag와 조회수 갱신 시각도 그대로 두어, 다음 실행에서 다시 가져오게 합니다.
+        """
+        pending, self._pending_watermarks = self._pending_watermarks, {}
+        for uploads_id, change in pending.items():
+            watermark = self._watermarks.get(uploads_id, {})
+            seen = set(watermark.get("recent_ids", []))
+            items = change.get("items", [])
+            done = [
+                item for item in items
+                if item["contentDetails"]["videoId"] in fetched_ids or item["contentDetails"]["videoId"] in seen
+            ]
+            complete = all(video_id in fetched_ids for video_id in change.get("requested", []))
+            if complete and len(done) == len(items):
+                self._record_watermark(uploads_id, change.get("etag"), done)
+            elif done:
+                self._record_watermark(uploads_id, watermark.get("etag"), done)
+            if complete and "views_refreshed_at" in change:
+                self._watermarks.setdefault(uploads_id, {})["views_refreshed_at"] = change["views_refreshed_at"]
+
+    def _record_watermark(self, uploads_playlist_id: str, etag: str | None, items: list[dict]):
+        """playlistItems 응답 항목(상세 조회까지 끝난 것)으로 플레이리스트의 하이워터마크를 갱신합니다."""
+        if not items:
+            return
+        watermark = self._watermarks.setdefault(uploads_playlist_id, {})
+        newest = items[0]["contentDetails"]
+        ids = [item["contentDetails"]["videoId"] for item in items]
+        watermark["etag"] = etag
+        watermark["newest_id"] = newest["videoId"]
+        watermark["newest_published_at"] = newest.get("videoPublishedAt")
+        # 최근 본 영상 ID (최신순, 최대 RECENT_IDS_KEPT개)
+        # recent_published는 같은 순서의 업로드 시각 — 스케줄러가 업로드 빈도 추정에 사용
+        published = dict(zip(watermark.get("recent_ids", []), watermark.get("recent_published", [])))
+        for item in items:
+            details = item["contentDetails"]
+            published[details["videoId"]] = details.get("videoPublishedAt") or published.get(details["videoId"])
+        previous = [v for v in watermark.get("recent_ids", []) if v not in ids]
+        watermark["recent_ids"] = (ids + previous)[:self.RECENT_IDS_KEPT]
+        watermark["recent_published"] = [published.get(v) for v in watermark["recent_ids"]]
+
+    def _get_video_ids(self, uploads_playlist_id: str, limit: int, etag: str | None = None) -> list[str] | None:
+        """
+        uploads 플레이리스트에서 최신 영상 ID를 가져옵니다.
+        etag가 주어졌고 플레이리스트가 그대로면 None을 반환합니다.
+        """
         try:
             data = self._get("playlistItems", {
                 "part": "contentDetails",
                 "playlistId": uploads_playlist_id,
                 "maxResults": limit,
-            })
+            }, etag=etag)
+            self._failed_lookups.discard(uploads_playlist_id)
+            if data is None:
+                return None
+            items = data.get("items", [])
+            # 하이워터마크는 상세 조회가 끝난 뒤 commit_watermarks()에서 반영
+            self._pending_watermarks.setdefault(uploads_playlist_id, {}).update(etag=data.get("etag"), items=items)
             return [
                 item["contentDetails"]["videoId"]
-                for item in data.get("items", [])
+                for item in items
             ]
+        except RequestAborted:
+            raise
         except Exception as e:
             print(f"  ❌ playlistItems.list 실패: {e}")
+            self._failed_lookups.add(uploads_playlist_id)
             return []
 
-    def _get_video_details(self, video_ids: list[str]) -> list[dict]:
-        """영상 ID 목록으로 제목/조회수/썸네일/설명을 일괄 조회합니다."""
+    def _get_video_details(self, video_ids: list[str]) -> list[dict] | None:
+        """
+        영상 ID 목록으로 제목/조회수/썸네일/설명을 일괄 조회합니다.
+        요청이 실패하면(시간 예산·할당량 소진 포함) None을 반환합니다.
+        """
         if not video_ids:
             return []
         try:
@@ -98,7 +354,49 @@ class YouTubeCrawler:
             return data.get("items", [])
         except Exception as e:
             print(f"  ❌ videos.list 실패: {e}")
-            return []
+            return None
+
+    def _parse_video(self, item: dict, opinion_leader_name: str) -> dict:
+        """videos.list 응답 항목 하나를 저장용 dict로 변환합니다."""
+        video_id = item.get("id", "")
+        snippet = item.get("snippet", {})
+        statistics = item.get("statistics", {})
+
+        title = snippet.get("title", "Unknown Title")
+
+        # 썸네일: maxres → high → medium → 직접 생성 순서
+        thumbnails = snippet.get("thumbnails", {})
+        thumbnail_url = (
+            thumbnails.get("maxres", {}).get("url")
+            or thumbnails.get("high", {}).get("url")
+            or thumbnails.get("medium", {}).get("url")
+            or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+        )
+
+        description_full = snippet.get("description", "")
+        description = (
+            description_full[:200] + "..."
+            if len(description_full) > 200
+            else description_full or "No description available."
+        )
+
+        view_count_raw = statistics.get("viewCount")
+        view_count = int(view_count_raw) if view_count_raw else 0
+
+        # 실제 업로드 시각 사용 (yt-dlp는 크롤링 시각을 저장하던 버그 있었음)
+        published_at = snippet.get("publishedAt", datetime.datetime.now(datetime.timezone.utc).isoformat())
+
+        return {
+            "source_type": "youtube",
+            "opinion_leader": opinion_leader_name,
+            "title": title,
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "thumbnail": thumbnail_url,
+            "description": description,
+            "published_at": published_at,
+            "original_id": video_id,
+            "view_count": view_count,
+        }
 
     def fetch_latest_videos(self, channel_url: str, limit: int = 5, opinion_leader_name: str = "Unknown") -> list[dict]:
         """
@@ -110,59 +408,124 @@ class YouTubeCrawler:
         print(f"Crawling {opinion_leader_name} ({channel_url})...")
         videos = []
 
-        uploads_id = self._get_uploads_playlist_id(channel_url)
-        if not uploads_id:
-            return videos
-
-        video_ids = self._get_video_ids(uploads_id, limit)
+        video_ids = self._get_channel_video_ids(channel_url, limit)
         if not video_ids:
             print(f"  ⚠️ 영상 없음: {opinion_leader_name}")
             return videos
 
-        items = self._get_video_details(video_ids)
+        details = self._get_video_details(video_ids)
+        self.commit_watermarks(set(video_ids) if details is not None else set())
+        for item in details or []:
+            video = self._parse_video(item, opinion_leader_name)
+            videos.append(video)
+            print(f"  ✅ {video['title'][:40]}")
 
-        for item in items:
-            video_id = item.get("id", "")
-            snippet = item.get("snippet", {})
-            statistics = item.get("statistics", {})
-
-            title = snippet.get("title", "Unknown Title")
-
-            # 썸네일: maxres → high → medium → 직접 생성 순서
-            thumbnails = snippet.get("thumbnails", {})
-            thumbnail_url = (
-                thumbnails.get("maxres", {}).get("url")
-                or thumbnails.get("high", {}).get("url")
-                or thumbnails.get("medium", {}).get("url")
-                or f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
-            )
-
-            description_full = snippet.get("description", "")
-            description = (
-                description_full[:200] + "..."
-                if len(description_full) > 200
-                else description_full or "No description available."
-            )
-
-            view_count_raw = statistics.get("viewCount")
-            view_count = int(view_count_raw) if view_count_raw else 0
-
-            # 실제 업로드 시각 사용 (yt-dlp는 크롤링 시각을 저장하던 버그 있었음)
-            published_at = snippet.get("publishedAt", datetime.datetime.now(datetime.timezone.utc).isoformat())
-
-            videos.append({
-                "source_type": "youtube",
-                "opinion_leader": opinion_leader_name,
-                "title": title,
-                "url": f"https://www.youtube.com/watch?v={video_id}",
-                "thumbnail": thumbnail_url,
-                "description": description,
-                "published_at": published_at,
-                "original_id": video_id,
-                "view_count": view_count,
-            })
-            print(f"  ✅ {title[:40]}")
+        return videos
+
+    def _collect_video_ids(self, source: dict, limit: int, incremental: bool = False) -> list[str]:
+        """
+        채널 하나의 uploads 플레이리스트에서 최신 영상 ID만 수집합니다.
+        source에 "limit"이 있으면 (스케줄러가 정한 채널별 개수) 그 값을 우선합니다.
+        """
+        print(f"Crawling {source['name']} ({source['url']})...")
+        video_ids = self._get_channel_video_ids(source["url"], source.get("limit", limit), incremental=incremental)
+        if not video_ids:
+            skipped = incremental or self._rss_feed is not None
+            print(f"  {'💤 새 영상 없음' if skipped else '⚠️ 영상 없음'}: {source['name']}")
+        return video_ids
+
+    def fetch_latest_videos_bulk(self, sources: list[dict], limit: int = 5, workers: int = 1,
+                                 incremental: bool = False) -> list[dict]:
+        """
+        여러 채널의 최신 영상을 한 번에 가져옵니다.
+
+        1) 채널별 uploads 플레이리스트에서 영상 ID 수집 (workers개 채널 동시 처리)
+        2) 전체 ID를 50개씩 묶어 videos.list 호출 — 채널당 1회 대신 전체 ⌈N/50⌉회
+        3) 결과를 각 채널의 opinion_leader / category에 다시 매핑
+
+        incremental=True면 새 영상이 없는 채널은 videos.list에서 빠지므로,
+        변화 없는 날의 실행은 playlistItems 조건부 요청만으로 끝납니다.
+
+        Args:
+            sources: {"name", "url", "category"} dict 리스트 (선택: 채널별 "limit")
+        Returns:
+            list[dict]: video metadata 리스트 (sources 순서, 채널 내 최신순)
+        """
+        ids_per_source: list[list[str]] = [[] for _ in sources]
+
+        # 상세 조회(videos.list) 몫으로 시간 예산의 일부(최소 호출 1건 분량)를 남겨둠
+        reserve = 0.0
+        if self._policy.deadline:
+            reserve = max(self._policy.deadline * self.DETAILS_TIME_RESERVE,
+                          self._policy.call_timeout + self._policy.min_timeout)
+
+        def collect(i: int):
+            if self._policy.expired(reserve):
+                self.skipped_urls.add(sources[i]["url"])
+                return
+            url = sources[i]["url"]
+            try:
+                ids_per_source[i] = self._collect_video_ids(sources[i], limit, incremental=incremental)
+            except RequestAborted as e:
+                self.skipped_urls.add(url)
+                print(f"  ⏭️ {sources[i]['name']} 건너뜀: {e}")
+                return
+            except Exception as e:
+                self.failed_urls.add(url)
+                print(f"Error crawling {sources[i]['name']}: {e}")
+                return
+            # 실패한 조회는 "새 영상 없음"과 같은 빈 결과를 돌려주므로 여기서 구분
+            if url in self._failed_lookups or self.known_uploads_id(url) in self._failed_lookups:
+                self.failed_urls.add(url)
+
+        if workers <= 1:
+            for i in range(len(sources)):
+                collect(i)
+        else:
+            # 느린 채널 하나가 나머지를 붙잡지 않도록 채널 단위로 병렬 처리
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(collect, range(len(sources))))
+        if self.skipped_urls:
+            print(f"  ⏰ {len(self.skipped_urls)}개 채널은 다음 실행으로 미룸")
+
+        # video_id → source index (같은 영상이 여러 채널에 걸리면 먼저 나온 채널 기준)
+        owner: dict[str, int] = {}
+        for i, video_ids in enumerate(ids_per_source):
+            for video_id in video_ids:
+                owner.setdefault(video_id, i)
+
+        all_ids = list(owner)
+        chunks = [
+            all_ids[start:start + self.MAX_IDS_PER_REQUEST]
+            for start in range(0, len(all_ids), self.MAX_IDS_PER_REQUEST)
+        ]
+        if workers <= 1:
+            detail_chunks = [self._get_video_details(chunk) for chunk in chunks]
+        else:
+            with ThreadPoolExecutor(max_workers=min(workers, len(chunks) or 1)) as executor:
+                detail_chunks = list(executor.map(self._get_video_details, chunks))
+
+        details = {item.get("id", ""): item for items in detail_chunks for item in items or []}
+        for chunk, items in zip(chunks, detail_chunks):
+            if items is None:
+                self.failed_urls.update(sources[owner[video_id]]["url"] for video_id in chunk)
+        # 상세 조회에 성공한 묶음의 ID만 하이워터마크에 반영 (실패한 묶음은 다음 실행에서 다시 시도)
+        self.commit_watermarks({
+            video_id for chunk, items in zip(chunks, detail_chunks) if items is not None for video_id in chunk
+        })
+
+        videos = []
+        for i, source in enumerate(sources):
+            for video_id in ids_per_source[i]:
+                item = details.get(video_id)
+                if item is None or owner[video_id] != i:
+                    continue
+                video = self._parse_video(item, source["name"])
+                video["category"] = source.get("category", "기타")
+                videos.append(video)
+                print(f"  ✅ [{source['name']}] {video['title'][:40]}")
 
+        print(f"  📦 videos.list {len(chunks)}회로 {len(details)}개 영상 상세 조회")
         return videos
 
 
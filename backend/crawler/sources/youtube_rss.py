@@ -0,0 +1,68 @@
+import xml.etree.ElementTree as ET
+import requests
+from utils.metrics import metrics
+
+
+class YouTubeRSSFeed:
+    """
+    채널 공개 Atom 피드(/feeds/videos.xml)에서 최신 영상 ID를 읽습니다.
+    Data API 할당량을 쓰지 않으므로, 새 영상이 있는 채널만 API로 조회하는
+    사전 필터로 사용합니다. 피드는 최근 15개 영상만 담고 있습니다.
+    """
+
+    FEED_URL = "https://www.youtube.com/feeds/videos.xml"
+    VIDEO_ID_TAG = "{http://www.youtube.com/xml/schemas/2015}videoId"
+    ENTRY_TAG = "{http://www.w3.org/2005/Atom}entry"
+
+    def __init__(self, session: requests.Session | None = None, timeout: float = 10):
+        self._session = session or requests.Session()
+        self.timeout = timeout
+
+    @staticmethod
+    def channel_id_for(uploads_playlist_id: str) -> str | None:
+        """uploads 플레이리스트 ID(UU...)를 채널 ID(UC...)로 변환합니다."""
+        if uploads_playlist_id and uploads_playlist_id.startswith("UU"):
+            return "UC" + uploads_playlist_id[2:]
+        return None
+
+    @classmethod
+    def parse_video_ids(cls, stream) -> list[str]:
+        """
+        Atom 피드를 스트리밍 파싱해 영상 ID를 최신순으로 반환합니다.
+        항목을 다 읽은 뒤에는 바로 비워 문서 전체를 메모리에 올리지 않습니다.
+        """
+        video_ids = []
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            if elem.tag == cls.VIDEO_ID_TAG and elem.text:
+                video_ids.append(elem.text.strip())
+            elif elem.tag == cls.ENTRY_TAG:
+                elem.clear()
+        return video_ids
+
+    def fetch_video_ids(self, channel_id: str) -> list[str] | None:
+        """
+        채널 피드의 영상 ID 목록을 가져옵니다.
+        피드를 쓸 수 없으면(네트워크 오류, 404, 파싱 실패) None을 반환하므로
+        호출 측은 기존 Data API 경로로 넘어가면 됩니다.
+        """
+        try:
+            with metrics.span("youtube_rss"):
+                resp = self._session.get(
+                    self.FEED_URL,
+                    params={"channel_id": channel_id},
+                    timeout=self.timeout,
+                    stream=True,
+                )
+                try:
+                    if not resp.ok:
+                        print(f"  ⚠️ RSS 피드 응답 {resp.status_code}: {channel_id}")
+                        metrics.inc("youtube_rss_failures")
+                        return None
+                    resp.raw.decode_content = True
+                    return self.parse_video_ids(resp.raw)
+                finally:
+                    resp.close()
+        except (requests.RequestException, ET.ParseError) as e:
+            print(f"  ⚠️ RSS 피드 실패 ({channel_id}): {e}")
+            metrics.inc("youtube_rss_failures")
+            return None
@@ -0,0 +1,112 @@
+import time
+import threading
+
+DEFAULT_SIGNATURE = ((), ())
+
+def preference_signature(preferences):
+    """
+    Canonical cohort key for a subscriber's onboarding preferences:
+    (sorted categories, sorted channels). Order and duplicates in the stored
+    lists do not matter; no preferences maps to DEFAULT_SIGNATURE.
+    """
+    preferences = preferences or {}
+
+    def clean(values):
+        if not isinstance(values, list):
+            return ()
+        return tuple(sorted({v for v in values if isinstance(v, str) and v}))
+
+    return (clean(preferences.get('categories')), clean(preferences.get('channels')))
+
+def describe(signature):
+    categories, channels = signature
+    if signature == DEFAULT_SIGNATURE:
+        return 'default'
+    return f"cats={','.join(categories) or '-'} channels={len(channels)}"
+
+class CohortIssues:
+    """
+    One selected-and-rendered issue per preference cohort.
+
+    All cohorts share the issue's category order, so personalization only
+    reorders and re-ranks; the default cohort gets the plain issue. Issues are
+    built the first time a cohort's subscriber comes through the delivery
+    stream and reused for everyone else in it, so render cost scales with the
+    number of cohorts, not subscribers. Safe to call from delivery workers.
+
+    At most `max_cohorts` issues are built. Past the cap, a new cohort gets
+    the issue of its categories-only cohort when that one exists, and the
+    default issue otherwise, so memory and render time stay bounded however
+    many distinct channel picks subscribers make. Only the default cohort's
+    selection is kept (for the issue snapshot).
+    """
+
+    def __init__(self, email_service, selector, contents, category_order, mail_id=None, max_cohorts=200):
+        self.email_service = email_service
+        self.selector = selector
+        self.contents = contents
+        self.category_order = category_order
+        self.mail_id = mail_id
+        self.max_cohorts = max_cohorts
+        self.fallbacks = 0
+        self.render_seconds = {}
+        self.selections = {}
+        self._issues = {}
+        self._lock = threading.Lock()
+
+    def seed(self, signature, issue):
+        """Uses an already-rendered issue (e.g. from a snapshot) for a cohort instead of selecting one."""
+        with self._lock:
+            self._issues[signature] = issue
+
+    def selection_for(self, signature):
+        categories, channels = signature
+        return self.selector.select(
+            self.contents,
+            category_order=self.category_order,
+            preferred_categories=categories,
+            preferred_channels=channels
+        )
+
+    def issue_for(self, signature):
+        issue = self._issues.get(signature)
+        if issue is not None:
+            return issue
+        with self._lock:
+            issue = self._issues.get(signature)
+            if issue is not None:
+                return issue
+            if signature != DEFAULT_SIGNATURE and len(self._issues) >= self.max_cohorts:
+                self.fallbacks += 1
+                issue = self._issues.get((signature[0], ())) or self._issues.get(DEFAULT_SIGNATURE)
+                if issue is not None:
+                    return issue
+                signature = DEFAULT_SIGNATURE
+            start = time.perf_counter()
+            selection = self.selection_for(signature)
+            issue = self.email_service.compile_issue(selection, mail_id=self.mail_id)
+            self.render_seconds[signature] = time.perf_counter() - start
+            if signature == DEFAULT_SIGNATURE:
+                self.selections[signature] = selection
+            self._issues[signature] = issue
+        return issue
+
+    def metrics(self):
+        timings = list(self.render_seconds.values())
+        return {
+            # Includes issues seeded from a snapshot (not rendered in this run)
+            'cohort_count': len(self._issues),
+            # Recipients who got a coarser cohort's issue because the cap was reached
+            'cohort_fallbacks': self.fallbacks,
+            'render_ms_total': round(sum(timings) * 1000, 2),
+            'render_ms_per_cohort': round(sum(timings) * 1000 / len(timings), 2) if timings else 0,
+        }
+
+    def print_summary(self):
+        metrics = self.metrics()
+        print(f"👥 {metrics['cohort_count']} cohort(s), "
+              f"{metrics['render_ms_per_cohort']}ms render per cohort")
+        if self.fallbacks:
+            print(f"   ↪ cohort cap ({self.max_cohorts}) reached: {self.fallbacks} fallback(s) to a coarser issue")
+        for signature, seconds in sorted(self.render_seconds.items(), key=lambda kv: -kv[1])[:10]:
+            print(f"   - {describe(signature)}: {seconds * 1000:.1f}ms")
@@ -0,0 +1,79 @@
+import datetime
+from google.cloud import firestore
+from utils.content_manifest import as_utc, recent_entries
+
+# Only what the selector, thumbnail repair and email template read
+CONTENT_FIELDS = [
+    'source_type', 'original_id', 'title', 'url', 'thumbnail',
+    'view_count', 'opinion_leader', 'category', 'scraped_at', 'published_at',
+    'fingerprint',
+]
+
+# Try the freshest window first, fall back to wider ones on quiet days
+FALLBACK_WINDOWS_HOURS = [26, 48, 168, 720]
+
+def _load_from_manifests(db, since, limit):
+    """
+    Newest-first candidates via the channel manifests, with scraped_at set to
+    when the crawler last saw each item and view_series to its view-count
+    snapshots (when it has any). None if no manifests exist yet.
+    """
+    entries = recent_entries(db, since, limit)
+    if entries is None:
+        return None
+    refs = [db.collection('contents').document(doc_id) for _, doc_id, _ in entries]
+    snapshots = {
+        snapshot.id: snapshot.to_dict()
+        for snapshot in db.get_all(refs, field_paths=CONTENT_FIELDS)
+        if snapshot.exists
+    }
+    items = []
+    for seen_at, doc_id, series in entries:
+        item = snapshots.get(doc_id)
+        if item is not None:
+            item['scraped_at'] = seen_at
+            if series:
+                item['view_series'] = series
+            items.append(item)
+    return items
+
+def _load_by_scraped_at(db, since, limit):
+    # Pre-manifest data: scraped_at was bumped on every crawl
+    docs = (
+        db.collection('contents')
+        .where('scraped_at', '>=', since)
+        .order_by('scraped_at', direction=firestore.Query.DESCENDING)
+        .select(CONTENT_FIELDS)
+        .limit(limit)
+        .stream()
+    )
+    return [doc.to_dict() for doc in docs]
+
+def load_recent_contents(db, windows_hours=FALLBACK_WINDOWS_HOURS, limit=2000, now=None):
+    """
+    Loads newsletter candidates seen by the crawler within the widest window
+    (one manifest query plus one multi-get, or a single ordered, projected,
+    limited query before manifests existed), then picks the narrowest window
+    that has content.
+
+    Returns (hours, items); hours is None when nothing was found.
+    """
+    now = as_utc(now or datetime.datetime.now())
+    since = now - datetime.timedelta(hours=max(windows_hours))
+    items = _load_from_manifests(db, since, limit)
+    if items is None:
+        items = _load_by_scraped_at(db, since, limit)
+
+    for hours in sorted(windows_hours):
+        cutoff = now - datetime.timedelta(hours=hours)
+        # Items are newest-first, so the window is a prefix of the result set
+        window_items = []
+        for item in items:
+            scraped_at = as_utc(item.get('scraped_at'))
+            if scraped_at is None or scraped_at < cutoff:
+                break
+            window_items.append(item)
+        if window_items:
+            return hours, window_items
+
+    return None, []
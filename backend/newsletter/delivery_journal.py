@@ -0,0 +1,129 @@
+import time
+import datetime
+import threading
+from services.email_service import make_sid
+
+class DeliveryJournal:
+    """
+    Per-issue record of who has received a newsletter.
+
+    Each recipient gets a doc in mail_history/{mail_id}/deliveries keyed by
+    their SID (md5 of the address, so no plaintext emails are stored) with
+    status 'sent' or 'failed'. A recipient without a doc is still pending.
+    Results are buffered and written as batched checkpoints, not one write
+    per message, so a crash loses at most one checkpoint worth of state
+    (those recipients are simply retried on resume).
+
+    In a sharded send each task passes its `shard` index; entries are tagged
+    with it and `load()` only reads back that shard's recipients, so counts
+    stay per shard.
+
+    Only results loaded from a previous run are kept per recipient (to skip
+    those already sent); results of this run are counted, not stored.
+    """
+
+    SUBCOLLECTION = 'deliveries'
+
+    def __init__(self, db, mail_id, checkpoint_size=200, checkpoint_seconds=5.0, shard=None):
+        self.db = db
+        self.mail_id = mail_id
+        self.mail_ref = db.collection('mail_history').document(mail_id)
+        self.collection_ref = self.mail_ref.collection(self.SUBCOLLECTION)
+        self.checkpoint_size = min(checkpoint_size, 500)
+        self.checkpoint_seconds = checkpoint_seconds
+        self.shard = shard
+        self.statuses = {}
+        self._sent = 0
+        self._failed = 0
+        self._buffer = {}
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Loads recipient states from a previous (interrupted) run of this issue."""
+        query = self.collection_ref
+        if self.shard is not None:
+            query = query.where('shard', '==', self.shard)
+        for doc in query.select(['status']).stream():
+            status = (doc.to_dict() or {}).get('status')
+            self.statuses[doc.id] = status
+            self._count(status, 1)
+        return self.statuses
+
+    def _count(self, status, delta):
+        if status == 'sent':
+            self._sent += delta
+        elif status == 'failed':
+            self._failed += delta
+
+    def should_send(self, recipient):
+        """True for recipients that are pending or failed."""
+        return self.statuses.get(make_sid(recipient)) != 'sent'
+
+    def record(self, recipient, error=None):
+        """Records one delivery result; flushes when a checkpoint is due."""
+        sid = make_sid(recipient)
+        entry = {
+            'status': 'sent' if error is None else 'failed',
+            'error': None if error is None else str(error)[:500],
+            'updated_at': datetime.datetime.now(),
+        }
+        if self.shard is not None:
+            entry['shard'] = self.shard
+        with self._lock:
+            # Each recipient is recorded once per run; a previous result is replaced, not added to
+            if sid in self.statuses:
+                self._count(self.statuses[sid], -1)
+                self.statuses[sid] = entry['status']
+            self._count(entry['status'], 1)
+            self._buffer[sid] = entry
+            due = (len(self._buffer) >= self.checkpoint_size
+                   or time.monotonic() - self._last_flush >= self.checkpoint_seconds)
+            if due:
+                self._flush_locked()
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        batch = self.db.batch()
+        for sid, entry in self._buffer.items():
+            batch.set(self.collection_ref.document(sid), entry)
+        try:
+            batch.commit()
+            self._buffer = {}
+        except Exception as e:
+            # Keep the buffer; the next checkpoint retries it
+            print(f"⚠️ Delivery journal checkpoint failed: {e}")
+
+    def counts(self):
+        with self._lock:
+            return self._sent, self._failed
+
+    def finalize(self, recipient_count, extra=None):
+        """
+        Flushes outstanding results and writes the final counts (plus any
+        `extra` run metrics) to mail_history.
+        """
+        self.flush()
+        sent, failed = self.counts()
+        if failed == 0 and sent >= recipient_count:
+            status = 'success'
+        elif sent == 0:
+            status = 'error'
+        else:
+            status = 'partial'
+        self.mail_ref.update({
+            'status': status,
+            'recipient_count': recipient_count,
+            'success_count': sent,
+            'fail_count': failed,
+            'completed_at': datetime.datetime.now().isoformat(),
+            **(extra or {}),
+        })
+        print(f"🧾 Journal: {sent} sent, {failed} failed of {recipient_count} ({status})")
+        return status
@@ -0,0 +1,23 @@
+from utils.fingerprint import NearDuplicateIndex, fingerprint
+
+def cluster_near_duplicates(items, index=None):
+    """
+    Groups candidates that cover the same story (e.g. three channels
+    re-uploading one press conference) and stores the group as
+    item['story_cluster'], which StorySelector treats like a channel: one
+    story per cluster per issue.
+
+    Uses the crawler's `fingerprint` (MinHash of title + description, see
+    utils/fingerprint.py) and falls back to a title-only signature for docs
+    crawled before fingerprints existed. Signatures are dropped afterwards,
+    so published issues (and shard chunks) stay small. Returns the number of
+    items that share a cluster with an earlier item.
+    """
+    index = index or NearDuplicateIndex()
+    for item in items:
+        index.add(item.pop('fingerprint', None) or fingerprint(item.get('title')))
+    duplicates = 0
+    for position, (item, cluster) in enumerate(zip(items, index.clusters())):
+        item['story_cluster'] = cluster
+        duplicates += cluster != position
+    return duplicates
@@ -0,0 +1,150 @@
+import heapq
+import random
+
+MAJOR_CATEGORIES = ['정치', '경제', '사회', '부동산', 'IT', '과학', '문화', '지식']
+HIGHLIGHT_COUNT = 4
+ITEMS_PER_CATEGORY = 3
+
+def view_score(item):
+    # Treat None as -1 so unviewed items rank last but can still be selected
+    views = item.get('view_count')
+    return views if views is not None else -1
+
+def content_id(item):
+    return f"{item['source_type']}_{item['original_id']}"
+
+class _CategoryBucket:
+    """
+    Items of one category as a heap keyed by (rank, arrival order), where rank
+    is -score (optionally prefixed by a preference flag). This pops in the same
+    order as a stable descending sort. Items are only ordered as far as
+    selection actually reads, so a bucket of n costs O(n + k log n).
+    """
+
+    def __init__(self):
+        self._heap = []
+
+    def push(self, rank, order, item):
+        self._heap.append((rank, order, item))
+
+    def heapify(self):
+        heapq.heapify(self._heap)
+
+    def pop(self):
+        return heapq.heappop(self._heap)[2] if self._heap else None
+
+    def __bool__(self):
+        return bool(self._heap)
+
+class StorySelector:
+    """
+    Picks the newsletter's highlights and category sections.
+
+    Content is bucketed by category once. Selection walks each bucket in score
+    order exactly once across both phases: an item passed over in phase 1 has
+    an already-used channel or story cluster (and stays unusable), and the
+    item picked there is already used, so phase 2 resumes each bucket where
+    phase 1 stopped.
+
+    Every story comes from a distinct channel and a distinct content ID, and
+    at most one story is picked per `story_cluster` (near-duplicates of the
+    same story, see newsletter/near_duplicates.py) when items carry one.
+    `seed` (or an explicit `rng`) makes the random category order reproducible.
+    """
+
+    def __init__(self, categories=MAJOR_CATEGORIES, highlights=HIGHLIGHT_COUNT,
+                 per_category=ITEMS_PER_CATEGORY, score=view_score):
+        self.categories = list(categories)
+        self.highlights = highlights
+        self.per_category = per_category
+        self.score = score
+
+    def category_order(self, seed=None, rng=None):
+        rng = rng or (random.Random(seed) if seed is not None else random)
+        order = list(self.categories)
+        rng.shuffle(order)
+        return order
+
+    def personalized_order(self, order, preferred_categories=()):
+        """Moves preferred categories to the front, keeping the issue's order otherwise."""
+        preferred = set(preferred_categories)
+        return [c for c in order if c in preferred] + [c for c in order if c not in preferred]
+
+    def _bucket(self, contents, preferred_channels=()):
+        wanted = set(self.categories)
+        preferred = set(preferred_channels)
+        buckets = {}
+        for order, item in enumerate(contents):
+            category = item.get('category')
+            if category in wanted:
+                rank = -self.score(item)
+                if preferred:
+                    # Preferred channels rank ahead of everything else in their category
+                    rank = (item.get('opinion_leader') not in preferred, rank)
+                buckets.setdefault(category, _CategoryBucket()).push(rank, order, item)
+        for bucket in buckets.values():
+            bucket.heapify()
+        return buckets
+
+    def select(self, contents, seed=None, rng=None, category_order=None,
+               preferred_categories=(), preferred_channels=()):
+        """
+        Returns {'top_stories': [...], 'category_stories': {category: [...]}}.
+
+        A subscriber's preferences personalize the issue: preferred categories
+        come first (so they also get the highlights) and preferred channels are
+        picked before other channels within each category.
+        """
+        order = category_order or self.category_order(seed=seed, rng=rng)
+        if preferred_categories:
+            order = self.personalized_order(order, preferred_categories)
+        buckets = self._bucket(contents, preferred_channels)
+        seen_ids = set()
+        seen_channels = set()
+        seen_clusters = set()
+
+        def take(bucket):
+            # Next item from an unused channel with an unused ID and story cluster, or None
+            while True:
+                item = bucket.pop()
+                if item is None:
+                    return None
+                cluster = item.get('story_cluster')
+                if (item.get('opinion_leader') in seen_channels or content_id(item) in seen_ids
+                        or (cluster is not None and cluster in seen_clusters)):
+                    continue
+                seen_ids.add(content_id(item))
+                seen_channels.add(item.get('opinion_leader'))
+                if cluster is not None:
+                    seen_clusters.add(cluster)
+                return item
+
+        # Phase 1: one highlight from each of the first N categories that have content
+        top_stories = []
+        for category in [c for c in order if c in buckets][:self.highlights]:
+            item = take(buckets[category])
+            if item is not None:
+                top_stories.append(item)
+
+        # Phase 2: fill category sections from what is left in each bucket
+        category_stories = {}
+        for category in order:
+            bucket = buckets.get(category)
+            if not bucket:
+                continue
+            display_items = []
+            while len(display_items) < self.per_category:
+                item = take(bucket)
+                if item is None:
+                    break
+                display_items.append(item)
+            if display_items:
+                category_stories[category] = display_items
+
+        return {
+            'top_stories': top_stories,
+            'category_stories': category_stories
+        }
+
+def select_stories(contents, seed=None, rng=None, **options):
+    return StorySelector(**options).select(contents, seed=seed, rng=rng)
@@ -0,0 +1,222 @@
+import os
+import time
+import zlib
+import datetime
+from google.api_core import exceptions as gcp_exceptions
+
+ISSUES_COLLECTION = 'newsletter_issues'
+# Firestore docs max out at 1 MiB, so shared candidates are stored in chunks
+ITEMS_PER_CHUNK = 200
+
+class ShardSpec:
+    """
+    Which slice of the subscriber list this process delivers.
+
+    Cloud Run jobs set CLOUD_RUN_TASK_INDEX / CLOUD_RUN_TASK_COUNT for each
+    task and CLOUD_RUN_EXECUTION (shared by all tasks of one execution).
+    Locally, NEWSLETTER_RUN_ID can stand in for the execution name.
+    Subscribers are assigned by crc32 of their document ID, so every task
+    computes the same split without talking to the others.
+    """
+
+    def __init__(self, index=0, count=1, run_id=None):
+        if count < 1 or not 0 <= index < count:
+            raise ValueError(f"Invalid shard {index}/{count}")
+        self.index = index
+        self.count = count
+        self.run_id = run_id
+
+    @classmethod
+    def from_env(cls):
+        count = int(os.getenv('CLOUD_RUN_TASK_COUNT', 1))
+        index = int(os.getenv('CLOUD_RUN_TASK_INDEX', 0))
+        run_id = os.getenv('NEWSLETTER_RUN_ID') or os.getenv('CLOUD_RUN_EXECUTION')
+        if count > 1 and not run_id:
+            raise ValueError("Sharded send needs CLOUD_RUN_EXECUTION or NEWSLETTER_RUN_ID")
+        return cls(index, count, run_id)
+
+    @property
+    def enabled(self):
+        return self.count > 1
+
+    @property
+    def mail_id(self):
+        # Deterministic, so every task lands on the same mail_history record
+        return f"run-{self.run_id}"
+
+    def owns(self, doc_id):
+        return zlib.crc32(doc_id.encode('utf-8')) % self.count == self.index
+
+    def __str__(self):
+        return f"shard {self.index + 1}/{self.count}"
+
+def _current_lease(issue_ref):
+    """(generation, lease data) of the newest coordinator lease, or (None, None)."""
+    leases = list(issue_ref.collection('leases').stream())
+    if not leases:
+        return None, None
+    latest = max(leases, key=lambda doc: doc.id)
+    return int(latest.id), latest.to_dict() or {}
+
+def _take_lease(issue_ref, generation, shard, lease_seconds):
+    """
+    Creates lease doc `generation`. Creation is the compare-and-swap: of all
+    tasks that saw the same expired (or missing) lease, exactly one wins.
+    """
+    try:
+        issue_ref.collection('leases').document(f"{generation:04d}").create({
+            'owner': shard.index,
+            'expires_at': time.time() + lease_seconds,
+            'acquired_at': datetime.datetime.now(),
+        })
+        return True
+    except gcp_exceptions.Conflict:
+        return False
+
+def _publish_issue(db, issue_ref, generation, prepared):
+    """
+    Writes the issue under this lease's generation in one batch. The issue doc
+    is created, not set, so if a slow coordinator and its replacement both
+    finish, the first publish wins and the other batch (chunks included)
+    fails as a whole. Returns False when another coordinator published first.
+    """
+    contents, category_order, date = prepared if prepared else ([], [], None)
+    batch = db.batch()
+    for n in range(0, len(contents), ITEMS_PER_CHUNK):
+        chunk_ref = issue_ref.collection('chunks').document(f"{generation:04d}-{n // ITEMS_PER_CHUNK:04d}")
+        batch.set(chunk_ref, {'generation': generation, 'items': contents[n:n + ITEMS_PER_CHUNK]})
+    batch.create(issue_ref, {
+        'ready': True,
+        'generation': generation,
+        'category_order': category_order,
+        'date': date,
+        'item_count': len(contents),
+        'created_at': datetime.datetime.now(),
+    })
+    try:
+        batch.commit()
+        return True
+    except gcp_exceptions.Conflict:
+        return False
+
+def _load_issue(issue_ref, issue):
+    if not issue.get('item_count'):
+        return None
+    chunks = (
+        issue_ref.collection('chunks')
+        .where('generation', '==', issue['generation'])
+        .order_by('__name__')
+        .stream()
+    )
+    contents = []
+    for chunk in chunks:
+        contents.extend((chunk.to_dict() or {}).get('items', []))
+    return contents, issue['category_order'], issue.get('date')
+
+def claim_or_load_issue(db, shard, prepare_issue, mail_history_fields, timeout=600, poll_interval=2.0,
+                        lease_seconds=300):
+    """
+    Makes sure every shard sends the same stories.
+
+    The task holding the coordinator lease runs `prepare_issue()` ->
+    (contents, category_order, date) and publishes the result under
+    newsletter_issues/{mail_id}. Every other task waits for that doc and
+    loads it. The lease (newsletter_issues/{mail_id}/leases/{generation},
+    owner + expiry) expires after `lease_seconds`, or at once when
+    `prepare_issue` raises. A waiting task (or the retry of the failed one)
+    then takes the next generation and prepares the issue itself, so a
+    crashed coordinator no longer stalls the whole send. Returns (contents,
+    category_order, date), or None when the coordinator found nothing to send.
+    """
+    mail_ref = db.collection('mail_history').document(shard.mail_id)
+    issue_ref = db.collection(ISSUES_COLLECTION).document(shard.mail_id)
+
+    try:
+        mail_ref.create({**mail_history_fields, 'shard_count': shard.count})
+    except gcp_exceptions.Conflict:
+        pass
+
+    deadline = time.monotonic() + timeout
+    waiting = False
+    while True:
+        snapshot = issue_ref.get()
+        if snapshot.exists and (snapshot.to_dict() or {}).get('ready'):
+            return _load_issue(issue_ref, snapshot.to_dict())
+
+        generation, lease = _current_lease(issue_ref)
+        if lease is None or lease.get('expires_at', 0) <= time.time():
+            generation = 0 if generation is None else generation + 1
+            if _take_lease(issue_ref, generation, shard, lease_seconds):
+                return _coordinate(db, shard, mail_ref, issue_ref, generation, prepare_issue)
+
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Issue {issue_ref.id} was not published within {timeout}s")
+        if not waiting:
+            print(f"⏳ {shard}: waiting for issue {shard.mail_id}")
+            waiting = True
+        time.sleep(poll_interval)
+
+def _coordinate(db, shard, mail_ref, issue_ref, generation, prepare_issue):
+    takeover = f" (taking over, lease {generation})" if generation else ""
+    print(f"🧭 {shard}: coordinating issue {shard.mail_id}{takeover}")
+    lease_ref = issue_ref.collection('leases').document(f"{generation:04d}")
+    try:
+        prepared = prepare_issue()
+    except Exception as e:
+        # Give the lease up so a waiting shard (or this task's retry) takes over right away
+        lease_ref.update({'expires_at': 0, 'error': str(e)[:500]})
+        mail_ref.update({'status': 'error', 'error': f"Issue preparation failed: {e}"[:500]})
+        raise
+    if not _publish_issue(db, issue_ref, generation, prepared):
+        print(f"↪ {shard}: another coordinator published {shard.mail_id} first, using that issue")
+        return _load_issue(issue_ref, issue_ref.get().to_dict())
+    if not prepared:
+        mail_ref.update({'status': 'skipped'})
+    return prepared
+
+def report_shard(db, shard, journal, recipient_count, extra=None):
+    """
+    Records this shard's result and merges all shard results into the single
+    mail_history record once every shard has reported. The merge recomputes
+    totals from the shard docs, so whichever shard finishes last (or both,
+    if two finish together) writes the same numbers.
+    """
+    journal.flush()
+    sent, failed = journal.counts()
+    mail_ref = db.collection('mail_history').document(shard.mail_id)
+    mail_ref.collection('shards').document(str(shard.index)).set({
+        'recipient_count': recipient_count,
+        'success_count': sent,
+        'fail_count': failed,
+        'completed_at': datetime.datetime.now().isoformat(),
+        **(extra or {}),
+    })
+    print(f"🧾 {shard}: {sent} sent, {failed} failed of {recipient_count}")
+
+    reports = [doc.to_dict() for doc in mail_ref.collection('shards').stream()]
+    if len(reports) < shard.count:
+        return None
+
+    totals = {
+        key: sum(report.get(key, 0) for report in reports)
+        for key in ('recipient_count', 'success_count', 'fail_count')
+    }
+    simulated = all(report.get('simulated') for report in reports)
+    if simulated:
+        status = 'skipped'
+    elif totals['fail_count'] == 0 and totals['success_count'] >= totals['recipient_count']:
+        status = 'success'
+    elif totals['success_count'] == 0 and totals['recipient_count'] > 0:
+        status = 'error'
+    else:
+        status = 'partial'
+    mail_ref.update({
+        **totals,
+        'status': status,
+        'simulated': simulated,
+        'shards_completed': len(reports),
+        'completed_at': datetime.datetime.now().isoformat(),
+    })
+    print(f"🧾 All {shard.count} shards reported: {totals['success_count']} sent, "
+          f"{totals['fail_count']} failed ({status})")
+    return status
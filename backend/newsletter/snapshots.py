@@ -0,0 +1,101 @@
+import json
+import hashlib
+import datetime
+from google.api_core import exceptions as gcp_exceptions
+from services.email_service import CompiledIssue
+from utils.metrics import metrics
+
+SNAPSHOTS_COLLECTION = 'newsletter_snapshots'
+# Bump when the stored layout changes; readers skip snapshots of other versions
+SNAPSHOT_VERSION = 1
+# What the email template and the web archive read from a story
+SNAPSHOT_FIELDS = [
+    'source_type', 'original_id', 'title', 'url', 'thumbnail',
+    'view_count', 'opinion_leader', 'category', 'published_at',
+]
+# Issues are dated in KST, like the email subject
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+def issue_date(now=None):
+    return (now or datetime.datetime.now(KST)).astimezone(KST).strftime('%Y-%m-%d')
+
+def snapshot_id(date, mail_id):
+    return f"{date}_{mail_id}"
+
+def _compact(item):
+    return {field: item[field] for field in SNAPSHOT_FIELDS if item.get(field) is not None}
+
+def compact_selection(selection):
+    """StorySelector output reduced to SNAPSHOT_FIELDS (no scores, clusters or series)."""
+    return {
+        'top_stories': [_compact(item) for item in selection['top_stories']],
+        'category_stories': {
+            category: [_compact(item) for item in items]
+            for category, items in selection['category_stories'].items()
+        },
+    }
+
+def content_hash(selection, html_parts):
+    """sha256 of the stored selection and HTML; identical issues hash the same."""
+    raw = json.dumps({'selection': selection, 'html_parts': html_parts},
+                     sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+def build_snapshot(mail_id, selection, issue, category_order, date, ranking=None, mail_type=None):
+    """
+    The shared (non-personalized) issue of one send: its selected stories,
+    the rendered HTML as CompiledIssue parts (join with a recipient's sid to
+    get their email) and a content hash. `date` is the issue_date() of when
+    the issue was prepared, not of when it is saved. `mail_type` is
+    mail_history's 'production' / 'test_job'.
+    """
+    selection = compact_selection(selection)
+    return {
+        'version': SNAPSHOT_VERSION,
+        'mail_id': mail_id,
+        'date': date,
+        'type': mail_type,
+        'category_order': list(category_order),
+        'ranking': ranking,
+        'selection': selection,
+        'html_parts': list(issue.parts),
+        'content_hash': content_hash(selection, list(issue.parts)),
+        'item_count': len(selection['top_stories']) + sum(len(v) for v in selection['category_stories'].values()),
+        'created_at': datetime.datetime.now(datetime.timezone.utc),
+    }
+
+def save_snapshot(db, snapshot):
+    """
+    Writes the snapshot once per (date, mail_id). When another run (a shard
+    of the same send, or an earlier attempt) got there first, returns that
+    stored snapshot instead, so every sender uses the same issue.
+    """
+    ref = db.collection(SNAPSHOTS_COLLECTION).document(snapshot_id(snapshot['date'], snapshot['mail_id']))
+    try:
+        ref.create(snapshot)
+        metrics.inc('firestore_writes', 1, collection=SNAPSHOTS_COLLECTION)
+        return snapshot
+    except gcp_exceptions.Conflict:
+        metrics.inc('firestore_reads', 1, collection=SNAPSHOTS_COLLECTION)
+        return ref.get().to_dict()
+
+def load_snapshot(db, mail_id):
+    """
+    The snapshot of a send (whatever its date) in one read, or None when
+    there is none, it has another layout version or its hash does not match.
+    """
+    docs = list(db.collection(SNAPSHOTS_COLLECTION).where('mail_id', '==', mail_id).limit(1).stream())
+    metrics.inc('firestore_reads', max(len(docs), 1), collection=SNAPSHOTS_COLLECTION)
+    if not docs:
+        return None
+    snapshot = docs[0].to_dict()
+    if snapshot.get('version') != SNAPSHOT_VERSION:
+        print(f"⚠️ Snapshot {docs[0].id} has version {snapshot.get('version')}, expected {SNAPSHOT_VERSION}. Ignoring it.")
+        return None
+    if content_hash(snapshot.get('selection'), snapshot.get('html_parts')) != snapshot.get('content_hash'):
+        print(f"⚠️ Snapshot {docs[0].id} does not match its content hash. Ignoring it.")
+        return None
+    return snapshot
+
+def compiled_issue(snapshot):
+    return CompiledIssue(snapshot['html_parts'])
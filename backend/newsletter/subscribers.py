@@ -0,0 +1,98 @@
+import hashlib
+from collections import deque
+from services.crypto_service import decrypt_emails
+from newsletter.cohorts import preference_signature
+
+def iter_subscriber_docs(db, is_production, page_size=1000, fields=('email',)):
+    """
+    Pages through active subscribers of one group, fetching only `fields`.
+
+    The test group is `is_test == True` and is filtered in Firestore.
+    Production is every other subscriber, including older docs that have no
+    `is_test` field at all. Firestore's `!=` skips docs that lack the field,
+    so production reads `is_test` along with `fields` and drops test
+    subscribers here. Pages are walked with document cursors, so memory
+    stays at one page.
+    """
+    query = db.collection('subscribers').where('status', '==', 'active')
+    if is_production:
+        query = query.select(list(dict.fromkeys([*fields, 'is_test'])))
+    else:
+        query = query.where('is_test', '==', True).select(list(fields))
+    query = query.order_by('__name__').limit(page_size)
+    last_doc = None
+    while True:
+        page = query.start_after(last_doc) if last_doc is not None else query
+        docs = list(page.stream())
+        if is_production:
+            yield from (doc for doc in docs if (doc.to_dict() or {}).get('is_test') is not True)
+        else:
+            yield from docs
+        if len(docs) < page_size:
+            return
+        last_doc = docs[-1]
+
+class RecipientStream:
+    """
+    Iterable of decrypted, de-duplicated recipient emails.
+
+    Subscribers are read page by page, decrypted in chunks and handed to the
+    caller as soon as they are ready. Duplicates are dropped on the fly using
+    64-bit digests of the address, kept as ints (the only per-subscriber
+    state the stream holds). After iteration, `count`, `duplicates` and
+    `errors` describe what was seen.
+
+    With `with_preferences=True` the stream also reads `preferences` and yields
+    (email, cohort signature) pairs instead of bare addresses.
+
+    With a `shard` (see newsletter.sharding.ShardSpec) only subscribers whose
+    document ID hashes to that shard are decrypted and yielded. Every shard
+    still pages through the full (projected) list; the split is by document,
+    so duplicates stored under two IDs are only dropped within a shard.
+    """
+
+    def __init__(self, db, is_production, page_size=1000, decrypt_chunk_size=500, with_preferences=False, shard=None):
+        self.db = db
+        self.is_production = is_production
+        self.page_size = page_size
+        self.decrypt_chunk_size = decrypt_chunk_size
+        self.with_preferences = with_preferences
+        self.shard = shard
+        self.count = 0
+        self.duplicates = 0
+        self.errors = []
+        # Signatures of subscribers handed to decryption but not yet yielded back;
+        # decrypt_emails preserves order, so at most one chunk is pending here.
+        self._signatures = deque()
+
+    def _encrypted_emails(self):
+        fields = ('email', 'preferences') if self.with_preferences else ('email',)
+        for doc in iter_subscriber_docs(self.db, self.is_production, self.page_size, fields):
+            if self.shard is not None and not self.shard.owns(doc.id):
+                continue
+            data = doc.to_dict() or {}
+            if self.with_preferences:
+                self._signatures.append(preference_signature(data.get('preferences')))
+            yield data.get('email')
+
+    def __iter__(self):
+        seen = set()
+        # Single process: decryption (~100k/s) is far faster than SMTP delivery,
+        # and a pool would delay the first email until its first chunks fill up.
+        plaintexts = decrypt_emails(
+            self._encrypted_emails(),
+            errors=self.errors,
+            processes=1,
+            chunk_size=self.decrypt_chunk_size
+        )
+        for email in plaintexts:
+            signature = self._signatures.popleft() if self.with_preferences else None
+            if not email:
+                continue
+            key = int.from_bytes(hashlib.blake2b(email.encode('utf-8'), digest_size=8).digest(), 'big')
+            if key in seen:
+                self.duplicates += 1
+                continue
+            seen.add(key)
+            self.count += 1
+            yield (email, signature) if self.with_preferences else email
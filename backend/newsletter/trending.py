@@ -0,0 +1,90 @@
+import math
+import datetime
+from array import array
+
+# Weight of the acceleration term relative to log-velocity
+ACCEL_WEIGHT = 0.5
+# Floor for interval lengths so two crawls minutes apart do not explode velocity
+MIN_INTERVAL_HOURS = 1.0
+
+def _published_epoch(item):
+    value = item.get('published_at')
+    if not value:
+        return None
+    try:
+        return datetime.datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+def _columns(items, now):
+    """
+    Flattens each item's view series into four columns: the latest three
+    (time, views) points, as array('d'). Items with fewer snapshots are padded
+    with (published_at, 0), then with the current view_count at `now`, so a
+    video published this morning gets views / age as its velocity.
+    """
+    t0, t1, t2 = array('d'), array('d'), array('d')
+    v0, v1, v2 = array('d'), array('d'), array('d')
+    for item in items:
+        series = item.get('view_series') or {}
+        times = list(series.get('t') or [])[-3:]
+        values = list(series.get('v') or [])[-3:]
+        if not times:
+            times, values = [now], [float(item.get('view_count') or 0)]
+        if len(times) < 3:
+            published = _published_epoch(item)
+            if published is not None and published < times[0]:
+                times.insert(0, published)
+                values.insert(0, 0.0)
+        while len(times) < 3:
+            # Not enough history: repeat the oldest point (zero velocity for that interval)
+            times.insert(0, times[0])
+            values.insert(0, values[0])
+        t0.append(times[0]); t1.append(times[1]); t2.append(times[2])
+        v0.append(values[0]); v1.append(values[1]); v2.append(values[2])
+    return t0, t1, t2, v0, v1, v2
+
+def velocity_and_acceleration(items, now=None):
+    """
+    Per-item (velocity, acceleration) from the latest snapshots, computed
+    column-wise over all items in one pass.
+
+    velocity      views/hour over the latest interval
+    acceleration  change in views/hour between the previous and the latest
+                  interval, relative to the previous rate (so it is comparable
+                  across small and big channels)
+    """
+    now = now if now is not None else datetime.datetime.now(datetime.timezone.utc).timestamp()
+    t0, t1, t2, v0, v1, v2 = _columns(items, now)
+    hour = 3600.0
+    previous = [max(b - a, 0.0) / max((tb - ta) / hour, MIN_INTERVAL_HOURS) for a, b, ta, tb in zip(v0, v1, t0, t1)]
+    latest = [max(b - a, 0.0) / max((tb - ta) / hour, MIN_INTERVAL_HOURS) for a, b, ta, tb in zip(v1, v2, t1, t2)]
+    acceleration = [(cur - prev) / (prev + 1.0) for prev, cur in zip(previous, latest)]
+    return latest, acceleration
+
+def trending_scores(items, now=None, accel_weight=ACCEL_WEIGHT):
+    """
+    log1p(velocity) + accel_weight * clamp(acceleration, -1, 1) per item.
+    The log keeps a big channel's steady stream from drowning out a story
+    that is breaking today; acceleration breaks ties toward rising stories.
+    """
+    velocity, acceleration = velocity_and_acceleration(items, now)
+    return [
+        math.log1p(v) + accel_weight * max(-1.0, min(1.0, a))
+        for v, a in zip(velocity, acceleration)
+    ]
+
+def annotate_trending(items, now=None):
+    """
+    Stores each item's trending score as item['trend_score'] and drops the raw
+    series, so published issues (and shard chunks) stay small.
+    """
+    for item, score in zip(items, trending_scores(items, now)):
+        item['trend_score'] = round(score, 6)
+        item.pop('view_series', None)
+    return items
+
+def trend_score(item):
+    # StorySelector score function; items without a score rank last
+    score = item.get('trend_score')
+    return score if score is not None else -1
@@ -1,161 +1,343 @@
 import sys
 import os
 import datetime
-import re
-from google.cloud import translate_v2 as translate
+import collections
+from concurrent.futures import ThreadPoolExecutor
 from crawler.sources.youtube import YouTubeCrawler
+from crawler.scheduler import CrawlScheduler
+from crawler.request_policy import RequestPolicy
+from services.translation_service import TranslationService
 from utils.db import get_db
+from utils.state_store import StateDoc
+from utils.metrics import metrics
+from utils.content_manifest import MANIFEST_COLLECTION, DIGEST_FIELDS, manifest_id, content_digest, merge_manifest
+from utils.fingerprint import fingerprint
 
 # Add project root to path to allow imports
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def translate_text(text, target_language='ko'):
-    """Translates text to target language if it contains significant non-Korean characters."""
-    if not re.search('[가-힣]', text):
-        try:
-            translate_client = translate.Client()
-            result = translate_client.translate(text, target_language=target_language)
-            return result['translatedText']
-        except Exception as e:
-            print(f"Translation failed for '{text}': {e}")
-            return text
-    return text
+# Number of channels crawled in parallel (1 = sequential, the old behaviour)
+CRAWLER_WORKERS = int(os.getenv('CRAWLER_WORKERS', 8))
+# Firestore write batching for the persist phase (a batch holds at most 500 writes)
+CRAWLER_BATCH_SIZE = min(int(os.getenv('CRAWLER_BATCH_SIZE', 200)), 500)
+CRAWLER_WRITE_WORKERS = int(os.getenv('CRAWLER_WRITE_WORKERS', 4))
+# How long a resolved handle → uploads playlist mapping is trusted
+CHANNEL_CACHE_TTL_DAYS = float(os.getenv('CHANNEL_CACHE_TTL_DAYS', 30))
+# Incremental mode: only fetch details for videos not seen before (per-channel
+# high-watermarks + conditional playlistItems requests). View counts of recent
+# videos are still refreshed every VIEW_REFRESH_HOURS.
+CRAWLER_INCREMENTAL = os.getenv('CRAWLER_INCREMENTAL', '0') == '1'
+VIEW_REFRESH_HOURS = float(os.getenv('VIEW_REFRESH_HOURS', 72))
+# Check each channel's public RSS feed first (no API quota) and skip channels
+# whose feed shows nothing new; falls back to the Data API when the feed fails.
+CRAWLER_RSS_PREFILTER = os.getenv('CRAWLER_RSS_PREFILTER', '0') == '1'
+# Adaptive scheduling: poll each channel at an interval matched to its upload
+# rate, within a daily YouTube quota budget (see crawler/scheduler.py).
+# CRAWLER_RUNS_PER_DAY should match how often the job is triggered.
+CRAWLER_SCHEDULE = os.getenv('CRAWLER_SCHEDULE', '0') == '1'
+CRAWLER_DAILY_QUOTA = int(os.getenv('CRAWLER_DAILY_QUOTA', 2000))
+CRAWLER_RUNS_PER_DAY = int(os.getenv('CRAWLER_RUNS_PER_DAY', 1))
+CRAWLER_MAX_INTERVAL_HOURS = float(os.getenv('CRAWLER_MAX_INTERVAL_HOURS', 168))
+# Time budget for the YouTube crawl (0 = unlimited). Per-call timeouts shrink to
+# what is left; channels not reached in time are deferred to the next run.
+# Failed calls are retried with jittered exponential backoff (see crawler/request_policy.py).
+CRAWLER_DEADLINE_SECONDS = float(os.getenv('CRAWLER_DEADLINE_SECONDS', 1200))
+CRAWLER_CALL_TIMEOUT = float(os.getenv('CRAWLER_CALL_TIMEOUT', 15))
+CRAWLER_MAX_ATTEMPTS = int(os.getenv('CRAWLER_MAX_ATTEMPTS', 4))
 
-def run_crawlers():
-    print("🚀 Starting Daily Crawler Job (40 Channels with Correct Handles)...")
-    
-    # 1. Comprehensive Source List (Verified Handles for 40 channels)
-    sources = [
-        # 정치 (Politics & Current Affairs)
-        {"type": "youtube", "name": "김현정의 뉴스쇼", "url": "https://www.youtube.com/@newsshow981", "category": "정치"},
-        {"type": "youtube", "name": "슈카월드", "url": "https://www.youtube.com/@syukaworld", "category": "정치"},
-        {"type": "youtube", "name": "크랩 KLAB", "url": "https://www.youtube.com/@kbsklab", "category": "정치"},
-        {"type": "youtube", "name": "스브스뉴스", "url": "https://www.youtube.com/@subusunews", "category": "정치"},
-        {"type": "youtube", "name": "YTN 시사", "url": "https://www.youtube.com/@ytnnews24", "category": "정치"},
-        
-        # 경제 (Economy & Finance)
-        {"type": "youtube", "name": "삼프로TV", "url": "https://www.youtube.com/@3protv", "category": "경제"},
-        {"type": "youtube", "name": "머니인사이드", "url": "https://www.youtube.com/@moneyinside", "category": "경제"},
-        {"type": "youtube", "name": "박곰희TV", "url": "https://www.youtube.com/@gOM-TV", "category": "경제"},
-        {"type": "youtube", "name": "한경 코리아마켓", "url": "https://www.youtube.com/@hankyung_koreamarket", "category": "경제"},
-        {"type": "youtube", "name": "달란트투자", "url": "https://www.youtube.com/@talentinvestment", "category": "경제"},
-        
-        # 사회 (Society)
-        {"type": "youtube", "name": "씨리얼 CeREEL", "url": "https://www.youtube.com/@creal", "category": "사회"},
-        {"type": "youtube", "name": "ODG", "url": "https://www.youtube.com/@odg.studio", "category": "사회"},
-        {"type": "youtube", "name": "보따 BODA", "url": "https://www.youtube.com/@BODA_original", "category": "사회"},
-        {"type": "youtube", "name": "희철리즘", "url": "https://www.youtube.com/@Heechulism", "category": "사회"},
-        {"type": "youtube", "name": "헤이뉴스", "url": "https://www.youtube.com/@HeyNews", "category": "사회"},
-        
-        # 부동산 (Real Estate)
-        {"type": "youtube", "name": "월급쟁이부자들TV", "url": "https://www.youtube.com/@weolbu", "category": "부동산"},
-        {"type": "youtube", "name": "부읽남", "url": "https://www.youtube.com/@reading_man", "category": "부동산"},
-        {"type": "youtube", "name": "빠숑의 세상 답사기", "url": "https://www.youtube.com/@ppassong", "category": "부동산"},
-        {"type": "youtube", "name": "집코노미TV", "url": "https://www.youtube.com/@jipconomy", "category": "부동산"},
-        {"type": "youtube", "name": "리얼캐스트TV", "url": "https://www.youtube.com/@realcasttv", "category": "부동산"},
-        
-        # IT (Tech)
-        {"type": "youtube", "name": "ITSub잇섭", "url": "https://www.youtube.com/@ITSUB", "category": "IT"},
-        {"type": "youtube", "name": "주연 ZUYONI", "url": "https://www.youtube.com/@zuyoni", "category": "IT"},
-        {"type": "youtube", "name": "EO 이오", "url": "https://www.youtube.com/@eo_studio", "category": "IT"},
-        {"type": "youtube", "name": "UNDERkg", "url": "https://www.youtube.com/@underkg", "category": "IT"},
-        {"type": "youtube", "name": "뻘짓연구소", "url": "https://www.youtube.com/@BullsLab", "category": "IT"},
-        
-        # 과학 (Science)
-        {"type": "youtube", "name": "안될과학", "url": "https://www.youtube.com/@Unrealscience", "category": "과학"},
-        {"type": "youtube", "name": "긱블", "url": "https://www.youtube.com/@Geekble", "category": "과학"},
-        {"type": "youtube", "name": "과학드림", "url": "https://www.youtube.com/@ScienceDream", "category": "과학"},
-        {"type": "youtube", "name": "1분과학", "url": "https://www.youtube.com/@1minscience", "category": "과학"},
-        {"type": "youtube", "name": "에스오디 SOD", "url": "https://www.youtube.com/@SOD_", "category": "과학"},
-        
-        # 문화 (Culture/Art)
-        {"type": "youtube", "name": "이동진의 파이아키아", "url": "https://www.youtube.com/@Btv_piaquia", "category": "문화"},
-        {"type": "youtube", "name": "셜록현준", "url": "https://www.youtube.com/@sherlock_hj", "category": "문화"},
-        {"type": "youtube", "name": "조승연의 탐구생활", "url": "https://www.youtube.com/@Tamgu", "category": "문화"},
-        {"type": "youtube", "name": "널 위한 문화예술", "url": "https://www.youtube.com/@art_for_you", "category": "문화"},
-        {"type": "youtube", "name": "essential;", "url": "https://www.youtube.com/@essentialme", "category": "문화"},
-        
-        # 지식 (Knowledge/Trivia)
-        {"type": "youtube", "name": "사물궁이 잡학지식", "url": "https://www.youtube.com/@speedwg_", "category": "지식"},
-        {"type": "youtube", "name": "지식한입", "url": "https://www.youtube.com/@knowledge_sip", "category": "지식"},
-        {"type": "youtube", "name": "교양만두", "url": "https://www.youtube.com/@gyoyangmandoo", "category": "지식"},
-        {"type": "youtube", "name": "14F 일사에프", "url": "https://www.youtube.com/@14FMBC", "category": "지식"},
-        {"type": "youtube", "name": "효짱", "url": "https://www.youtube.com/@hyozzang2", "category": "지식"}
-    ]
-    
-    # 2. Initialize
-    yt_crawler = YouTubeCrawler()
-    db = get_db()
-    all_content = []
-    
-    # 3. Process Sources
-    for source in sources:
+_translation_service = None
+
+def get_translation_service():
+    global _translation_service
+    if _translation_service is None:
+        _translation_service = TranslationService()
+    return _translation_service
+
+def commit_writes(db, writes, batch_size=CRAWLER_BATCH_SIZE, workers=CRAWLER_WRITE_WORKERS):
+    """
+    Commits (op, doc_ref, data) tuples as Firestore batched writes.
+    Batches of `batch_size` writes are committed by up to `workers` threads.
+
+    Every batch is attempted even if another fails. Each batch is atomic, so
+    a failed one writes nothing; the first error is raised after the rest
+    are committed (the caller does not advance crawl state, and the next run
+    writes the missing docs again).
+    """
+    def commit(chunk):
+        batch = db.batch()
+        for op, doc_ref, data in chunk:
+            if op == 'set':
+                batch.set(doc_ref, data)
+            else:
+                batch.update(doc_ref, data)
+        with metrics.span('firestore_commit'):
+            batch.commit()
+        for collection, count in collections.Counter(doc_ref.path.split('/', 1)[0] for _, doc_ref, _ in chunk).items():
+            metrics.inc('firestore_writes', count, collection=collection)
+
+    def attempt(chunk):
         try:
-            print(f"Crawling {source['name']} ({source['url']})...")
-            videos = yt_crawler.fetch_latest_videos(
-                source['url'], 
-                limit=5, 
-                opinion_leader_name=source['name']
-            )
-            for v in videos:
-                v['category'] = source.get('category', '기타')
-            all_content.extend(videos)
+            commit(chunk)
         except Exception as e:
-            print(f"Error crawling {source['name']}: {e}")
-            
-    # 4. Save to Database
-    print(f"💾 Saving {len(all_content)} items to Firestore...")
+            return e
+        return None
+
+    chunks = [writes[i:i + batch_size] for i in range(0, len(writes), batch_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        errors = [attempt(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(attempt, chunks))
+    errors = [e for e in errors if e is not None]
+    if errors:
+        print(f"   ❌ {len(errors)}/{len(chunks)} Firestore batch commit(s) failed: {errors[0]}")
+        raise errors[0]
+    return len(chunks)
+
+def save_contents(db, items, now):
+    """
+    Upserts crawled items into the `contents` collection and records what
+    each channel's crawl saw in its `channel_manifests` doc.
+
+    Existing content docs are only rewritten when their digest (see
+    utils/content_manifest.py) or view count changed; "last seen" lives in
+    the manifest instead of a scraped_at bump. Existing docs and manifests
+    are read with a single multi-document get and all writes are committed
+    in batches. Returns the number of new items.
+    """
     collection_ref = db.collection('contents')
+    manifest_ref = db.collection(MANIFEST_COLLECTION)
+
+    # De-duplicate by doc id (first occurrence wins, as the sequential loop did)
+    items_by_id = {}
+    for item in items:
+        items_by_id.setdefault(f"{item['source_type']}_{item['original_id']}", item)
+
+    # Channel → content doc ids seen in this crawl
+    channels = {}
+    for doc_id, item in items_by_id.items():
+        key = manifest_id(item['source_type'], item.get('opinion_leader'))
+        channels.setdefault(key, (item, []))[1].append(doc_id)
+
+    doc_refs = {doc_id: collection_ref.document(doc_id) for doc_id in items_by_id}
+    manifest_refs = {key: manifest_ref.document(key) for key in channels}
+    with metrics.span('firestore_get_all'):
+        snapshots = [
+            snapshot
+            for snapshot in db.get_all(list(doc_refs.values()) + list(manifest_refs.values()))
+            if snapshot.exists
+        ]
+    existing = {
+        snapshot.id: snapshot.to_dict()
+        for snapshot in snapshots if snapshot.reference.path.startswith('contents/')
+    }
+    manifests = {
+        snapshot.id: snapshot.to_dict()
+        for snapshot in snapshots if snapshot.reference.path.startswith(f"{MANIFEST_COLLECTION}/")
+    }
+    metrics.inc('firestore_reads', len(doc_refs), collection='contents')
+    metrics.inc('firestore_reads', len(manifest_refs), collection=MANIFEST_COLLECTION)
+
+    # --- Optimization 1: Translation Caching ---
+    # If we already have a title in the DB, reuse it to skip Translation API call.
+    # Everything else is translated in one batched pass (backed by the on-disk cache).
+    to_translate = []
+    for doc_id, item in items_by_id.items():
+        existing_title = (existing.get(doc_id) or {}).get('title')
+        if existing_title:
+            item['title'] = existing_title
+        else:
+            to_translate.append(item)
+    with metrics.span('translate_titles'):
+        translated = get_translation_service().translate_many([item['title'] for item in to_translate])
+    for item, title in zip(to_translate, translated):
+        item['title'] = title
+
+    writes = []
     saved_count = 0
-    now = datetime.datetime.now()
-    
-    for item in all_content:
-        doc_id = f"{item['source_type']}_{item['original_id']}"
-        doc_ref = collection_ref.document(doc_id)
-        doc_snapshot = doc_ref.get()
+    unchanged_count = 0
+
+    for doc_id, item in items_by_id.items():
+        doc_ref = doc_refs[doc_id]
+        existing_data = existing.get(doc_id)
+        digest = content_digest(item)
         
-        if doc_snapshot.exists:
-            existing_data = doc_snapshot.to_dict()
-            
-            # --- Optimization 1: Translation Caching ---
-            # If we already have a title in the DB, reuse it to skip Translation API call
-            if existing_data.get('title'):
-                item['title'] = existing_data['title']
-            else:
-                item['title'] = translate_text(item['title'])
+        if existing_data is not None:
 
             # --- Optimization 2: Conditional Update ---
-            # Only update if view count changed significantly (e.g., > 5%) or other fields changed
+            # Only rewrite if view count changed significantly (e.g., > 5%) or the digest changed
             old_views = existing_data.get('view_count', 0) or 0
             new_views = item.get('view_count', 0) or 0
             
             # Significant view increase (at least 5% or first time seeing views)
             significant_view_change = (new_views > old_views * 1.05) if old_views > 0 else (new_views > 0)
-            category_changed = existing_data.get('category') != item.get('category')
-            
-            # scraped_at은 항상 갱신 — 이메일 발송 API의 "최근 N일 콘텐츠" 필터에 잡히도록
-            update_data = {
-                'scraped_at': now,
-            }
-
-            if significant_view_change or category_changed:
-                update_data['view_count'] = new_views
-                update_data['description'] = item.get('description')
-                update_data['category'] = item.get('category')
-                if category_changed:
-                    print(f"   - Category Updated: {item['title']} -> {item['category']}")
-                print(f"   - Updated: {item['title']} (Views: {old_views} -> {new_views})")
-
-            doc_ref.update(update_data)
+            # Docs written before digests existed are hashed from their stored fields
+            digest_changed = (existing_data.get('content_digest') or content_digest(existing_data)) != digest
+
+            if not (significant_view_change or digest_changed):
+                # Recency is recorded in the channel manifest; nothing new to write here
+                unchanged_count += 1
+                continue
+
+            update_data = {field: item.get(field) for field in DIGEST_FIELDS}
+            update_data['view_count'] = new_views
+            update_data['content_digest'] = digest
+            # Near-duplicate signature of the (translated) title + description; docs
+            # written before fingerprints existed pick one up on their next rewrite
+            update_data['fingerprint'] = fingerprint(item['title'], item.get('description'))
+            if existing_data.get('category') != item.get('category'):
+                print(f"   - Category Updated: {item['title']} -> {item['category']}")
+            print(f"   - Updated: {item['title']} (Views: {old_views} -> {new_views})")
+
+            writes.append(('update', doc_ref, update_data))
         else:
-            # New item: must translate and save
-            item['title'] = translate_text(item['title'])
+            # New item: translated above, save it (scraped_at = first seen)
             item['scraped_at'] = now
-            doc_ref.set(item)
+            item['content_digest'] = digest
+            item['fingerprint'] = fingerprint(item['title'], item.get('description'))
+            writes.append(('set', doc_ref, item))
             saved_count += 1
             print(f"   + New Content: {item['title']}")
+
+    # One manifest write per crawled channel replaces the per-item scraped_at bumps,
+    # and carries every item's view-count snapshot (even when the doc itself is unchanged)
+    for key, (item, doc_ids) in channels.items():
+        manifest = merge_manifest(
+            manifests.get(key), item['source_type'], item.get('opinion_leader'), item.get('category'), doc_ids, now,
+            views={doc_id: items_by_id[doc_id].get('view_count') for doc_id in doc_ids}
+        )
+        writes.append(('set', manifest_refs[key], manifest))
+
+    batch_count = commit_writes(db, writes)
+    metrics.inc('contents_unchanged', unchanged_count)
+    print(f"   📝 {len(existing)} docs + {len(manifests)} manifests read in 1 multi-get, "
+          f"{len(writes)} writes in {batch_count} batch(es) "
+          f"({len(writes) - len(channels)} content + {len(channels)} manifest, {unchanged_count} unchanged docs skipped; "
+          f"{len(existing) + saved_count} writes with per-item scraped_at bumps)")
+    return saved_count
+
+# Comprehensive Source List (Verified Handles for 40 channels)
+SOURCES = [
+    # 정치 (Politics & Current Affairs)
+    {"type": "youtube", "name": "김현정의 뉴스쇼", "url": "https://www.youtube.com/@newsshow981", "category": "정치"},
+    {"type": "youtube", "name": "슈카월드", "url": "https://www.youtube.com/@syukaworld", "category": "정치"},
+    {"type": "youtube", "name": "크랩 KLAB", "url": "https://www.youtube.com/@kbsklab", "category": "정치"},
+    {"type": "youtube", "name": "스브스뉴스", "url": "https://www.youtube.com/@subusunews", "category": "정치"},
+    {"type": "youtube", "name": "YTN 시사", "url": "https://www.youtube.com/@ytnnews24", "category": "정치"},
+    
+    # 경제 (Economy & Finance)
+    {"type": "youtube", "name": "삼프로TV", "url": "https://www.youtube.com/@3protv", "category": "경제"},
+    {"type": "youtube", "name": "머니인사이드", "url": "https://www.youtube.com/@moneyinside", "category": "경제"},
+    {"type": "youtube", "name": "박곰희TV", "url": "https://www.youtube.com/@gOM-TV", "category": "경제"},
+    {"type": "youtube", "name": "한경 코리아마켓", "url": "https://www.youtube.com/@hankyung_koreamarket", "category": "경제"},
+    {"type": "youtube", "name": "달란트투자", "url": "https://www.youtube.com/@talentinvestment", "category": "경제"},
+    
+    # 사회 (Society)
+    {"type": "youtube", "name": "씨리얼 CeREEL", "url": "https://www.youtube.com/@creal", "category": "사회"},
+    {"type": "youtube", "name": "ODG", "url": "https://www.youtube.com/@odg.studio", "category": "사회"},
+    {"type": "youtube", "name": "보따 BODA", "url": "https://www.youtube.com/@BODA_original", "category": "사회"},
+    {"type": "youtube", "name": "희철리즘", "url": "https://www.youtube.com/@Heechulism", "category": "사회"},
+    {"type": "youtube", "name": "헤이뉴스", "url": "https://www.youtube.com/@HeyNews", "category": "사회"},
+    
+    # 부동산 (Real Estate)
+    {"type": "youtube", "name": "월급쟁이부자들TV", "url": "https://www.youtube.com/@weolbu", "category": "부동산"},
+    {"type": "youtube", "name": "부읽남", "url": "https://www.youtube.com/@reading_man", "category": "부동산"},
+    {"type": "youtube", "name": "빠숑의 세상 답사기", "url": "https://www.youtube.com/@ppassong", "category": "부동산"},
+    {"type": "youtube", "name": "집코노미TV", "url": "https://www.youtube.com/@jipconomy", "category": "부동산"},
+    {"type": "youtube", "name": "리얼캐스트TV", "url": "https://www.youtube.com/@realcasttv", "category": "부동산"},
+    
+    # IT (Tech)
+    {"type": "youtube", "name": "ITSub잇섭", "url": "https://www.youtube.com/@ITSUB", "category": "IT"},
+    {"type": "youtube", "name": "주연 ZUYONI", "url": "https://www.youtube.com/@zuyoni", "category": "IT"},
+    {"type": "youtube", "name": "EO 이오", "url": "https://www.youtube.com/@eo_studio", "category": "IT"},
+    {"type": "youtube", "name": "UNDERkg", "url": "https://www.youtube.com/@underkg", "category": "IT"},
+    {"type": "youtube", "name": "뻘짓연구소", "url": "https://www.youtube.com/@BullsLab", "category": "IT"},
+    
+    # 과학 (Science)
+    {"type": "youtube", "name": "안될과학", "url": "https://www.youtube.com/@Unrealscience", "category": "과학"},
+    {"type": "youtube", "name": "긱블", "url": "https://www.youtube.com/@Geekble", "category": "과학"},
+    {"type": "youtube", "name": "과학드림", "url": "https://www.youtube.com/@ScienceDream", "category": "과학"},
+    {"type": "youtube", "name": "1분과학", "url": "https://www.youtube.com/@1minscience", "category": "과학"},
+    {"type": "youtube", "name": "에스오디 SOD", "url": "https://www.youtube.com/@SOD_", "category": "과학"},
+    
+    # 문화 (Culture/Art)
+    {"type": "youtube", "name": "이동진의 파이아키아", "url": "https://www.youtube.com/@Btv_piaquia", "category": "문화"},
+    {"type": "youtube", "name": "셜록현준", "url": "https://www.youtube.com/@sherlock_hj", "category": "문화"},
+    {"type": "youtube", "name": "조승연의 탐구생활", "url": "https://www.youtube.com/@Tamgu", "category": "문화"},
+    {"type": "youtube", "name": "널 위한 문화예술", "url": "https://www.youtube.com/@art_for_you", "category": "문화"},
+    {"type": "youtube", "name": "essential;", "url": "https://www.youtube.com/@essentialme", "category": "문화"},
+    
+    # 지식 (Knowledge/Trivia)
+    {"type": "youtube", "name": "사물궁이 잡학지식", "url": "https://www.youtube.com/@speedwg_", "category": "지식"},
+    {"type": "youtube", "name": "지식한입", "url": "https://www.youtube.com/@knowledge_sip", "category": "지식"},
+    {"type": "youtube", "name": "교양만두", "url": "https://www.youtube.com/@gyoyangmandoo", "category": "지식"},
+    {"type": "youtube", "name": "14F 일사에프", "url": "https://www.youtube.com/@14FMBC", "category": "지식"},
+    {"type": "youtube", "name": "효짱", "url": "https://www.youtube.com/@hyozzang2", "category": "지식"}
+]
+
+def run_crawlers(sources=SOURCES):
+    print(f"🚀 Starting Daily Crawler Job ({len(sources)} Channels with Correct Handles)...")
+    metrics.reset()
+    
+    # 1. Initialize
+    db = get_db()
+    yt_crawler = YouTubeCrawler(
+        pool_size=CRAWLER_WORKERS,
+        channel_store=StateDoc(db, 'youtube_channels'),
+        channel_ttl_days=CHANNEL_CACHE_TTL_DAYS,
+        watermark_store=StateDoc(db, 'youtube_watermarks'),
+        view_refresh_hours=VIEW_REFRESH_HOURS,
+        rss_prefilter=CRAWLER_RSS_PREFILTER,
+        request_policy=RequestPolicy(
+            deadline=CRAWLER_DEADLINE_SECONDS or None,
+            call_timeout=CRAWLER_CALL_TIMEOUT,
+            max_attempts=CRAWLER_MAX_ATTEMPTS
+        )
+    )
+    
+    # 1.5 Pick this run's channels (and per-channel fetch limits) by upload rate
+    scheduler = None
+    polled_sources = sources
+    if CRAWLER_SCHEDULE:
+        scheduler = CrawlScheduler(
+            StateDoc(db, 'crawl_schedule'),
+            daily_quota=CRAWLER_DAILY_QUOTA,
+            runs_per_day=CRAWLER_RUNS_PER_DAY,
+            max_interval_hours=CRAWLER_MAX_INTERVAL_HOURS
+        )
+        polled_sources = scheduler.plan(sources, yt_crawler.channel_history)
+    
+    # 2. Process Sources (concurrently, sharing one keep-alive connection pool)
+    #    Video details are fetched in 50-ID batches across all channels.
+    print(f"⚙️ Crawling with {CRAWLER_WORKERS} worker(s){' [incremental]' if CRAWLER_INCREMENTAL else ''}...")
+    with metrics.span('stage', stage='crawl'):
+        all_content = yt_crawler.fetch_latest_videos_bulk(
+            polled_sources,
+            limit=5,
+            workers=CRAWLER_WORKERS,
+            incremental=CRAWLER_INCREMENTAL
+        )
+    yt_crawler.close()
+            
+    # 3. Save to Database
+    print(f"💾 Saving {len(all_content)} items to Firestore...")
+    with metrics.span('stage', stage='persist'):
+        saved_count = save_contents(db, all_content, datetime.datetime.now())
+
+    # 4. Only once the contents are stored: advance the high-watermarks (and caches)
+    #    and the schedule. If the persist phase fails, the next run fetches the same videos again.
+    yt_crawler.save_state()
+    if scheduler:
+        # Channels skipped for time/quota, or whose crawl failed, stay due for the next run
+        not_polled = yt_crawler.skipped_urls | yt_crawler.failed_urls
+        scheduler.mark_polled([source for source in polled_sources if source['url'] not in not_polled])
+        scheduler.record_usage(metrics.total('youtube_quota_units'))
+        scheduler.save(sources)
+    metrics.inc('contents_crawled', len(all_content))
+    metrics.inc('contents_new', saved_count)
         
     print(f"✅ Job Complete. {saved_count} new items processed.")
+    metrics.write_summary('crawler')
 
 if __name__ == "__main__":
     run_crawlers()
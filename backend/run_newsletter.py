@@ -1,157 +1,241 @@
 import sys
 import os
 import datetime
-import random
+import itertools
 from utils.db import get_db
 from services.email_service import EmailService
-from services.crypto_service import decrypt_email
+from services.smtp_delivery import DeliveryAborted
+from newsletter.delivery_journal import DeliveryJournal
+from newsletter.subscribers import RecipientStream
+from newsletter.content_loader import load_recent_contents
+from newsletter.selector import StorySelector, view_score
+from newsletter.trending import annotate_trending, trend_score
+from newsletter.near_duplicates import cluster_near_duplicates
+from newsletter.cohorts import CohortIssues, DEFAULT_SIGNATURE
+from newsletter.sharding import ShardSpec, claim_or_load_issue, report_shard
+from newsletter.snapshots import build_snapshot, save_snapshot, load_snapshot, compiled_issue, snapshot_id, issue_date
+from utils.metrics import metrics
 
 # Add project root to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-def run_newsletter_job(is_production=False):
-    mode_text = "PRODUCTION" if is_production else "TEST MODE (Test Group Only)"
-    print(f"🚀 Starting Newsletter Delivery Job [{mode_text}]...")
-    db = get_db()
+DEFAULT_THUMB = "https://opinionnewsletter-web-810426728503.asia-northeast3.run.app/default_thumb.png"
+# Story ranking: 'views' (lifetime view count) or 'trending' (view velocity and
+# acceleration from the crawler's view-count snapshots, see newsletter/trending.py)
+NEWSLETTER_RANKING = os.getenv('NEWSLETTER_RANKING', 'views')
+
+def repair_thumbnail(item):
+    # 1. YouTube: Always reconstruct stable URL to fix broken/expiring links
+    if item.get('source_type') == 'youtube' and item.get('original_id'):
+        return f"https://i.ytimg.com/vi/{item['original_id']}/hqdefault.jpg"
     
-    # 1. Fetch Latest Content — try 26h first, fallback up to 30 days
-    all_contents = []
-    for hours in [26, 48, 168, 720]:
-        print(f"Fetching content (last {hours}h)...")
-        time_threshold = datetime.datetime.now() - datetime.timedelta(hours=hours)
-        docs = db.collection('contents')\
-            .where('scraped_at', '>=', time_threshold)\
-            .stream()
-        all_contents = [doc.to_dict() for doc in docs]
-        if all_contents:
-            print(f"  ✓ Found {len(all_contents)} items")
-            break
+    # 2. Others: Use existing or fallback to default
+    if item.get('thumbnail'):
+        return item['thumbnail']
+        
+    return DEFAULT_THUMB
 
+def prepare_issue(db, selector):
+    """
+    Loads this issue's candidate stories and category order, or None when
+    there is nothing to send. The issue is dated (KST) when it is prepared,
+    so a send or resume that runs past midnight keeps that date.
+    """
+    # 1. Fetch Latest Content — one query over 30 days, narrowest non-empty window wins (26h first)
+    print("Fetching content (last 26h, falling back up to 30 days)...")
+    with metrics.span('stage', stage='load_contents'):
+        hours, all_contents = load_recent_contents(db, limit=int(os.getenv('CONTENT_FETCH_LIMIT', 2000)))
     if not all_contents:
         print("⚠️ No content found. Aborting.")
-        return
-
-    # Sort all by view_count DESC to prioritize quality
-    # Treat None as -1 to put them at the end of sorted list but still allow selection
-    all_contents.sort(key=lambda x: x.get('view_count') if x.get('view_count') is not None else -1, reverse=True)
-    
-    # All Categories
-    major_cats = ['정치', '경제', '사회', '부동산', 'IT', '과학', '문화', '지식']
-    random.shuffle(major_cats)
-    
-    top_stories = []
-    category_stories = {}
-    seen_ids = set()
-    seen_channels = set() # Global channel deduplication to ensure maximum variety
-    
-    # Selection Phase 1: Pick Top Highlights
-    # We want 4 highlights from 4 different categories AND 4 different channels
-    potential_highlight_cats = [cat for cat in major_cats if any(d.get('category') == cat for d in all_contents)]
-    highlight_cats = potential_highlight_cats[:4]
-    
-    for cat in highlight_cats:
-        cat_items = [d for d in all_contents if d.get('category') == cat]
-        for item in cat_items:
-            channel = item.get('opinion_leader')
-            if channel not in seen_channels:
-                top_stories.append(item)
-                seen_ids.add(f"{item['source_type']}_{item['original_id']}")
-                seen_channels.add(channel)
-                break # Move to next category highlight
-
-    # Selection Phase 2: Fill Category Sections
-    # We iterate through ALL categories that have content
-    for cat in major_cats:
-        cat_items = [d for d in all_contents if d.get('category') == cat]
-        if not cat_items:
-            continue
-            
-        display_items = []
-        for item in cat_items:
-            # Skip if already in highlights or if this channel was already used
-            item_id = f"{item['source_type']}_{item['original_id']}"
-            channel = item.get('opinion_leader')
-            
-            if item_id not in seen_ids and channel not in seen_channels:
-                display_items.append(item)
-                seen_ids.add(item_id)
-                seen_channels.add(channel)
-                
-                if len(display_items) >= 3:
-                    break
-        
-        if display_items:
-            category_stories[cat] = display_items
+        return None
+    print(f"  ✓ Found {len(all_contents)} items (last {hours}h, ranked by {NEWSLETTER_RANKING})")
 
-    newsletter_data = {
-        'top_stories': top_stories,
-        'category_stories': category_stories
-    }
-    
     # 1.5 Thumbnail Repair & Default Injection
-    DEFAULT_THUMB = "https://opinionnewsletter-web-810426728503.asia-northeast3.run.app/default_thumb.png"
-    
-    def repair_thumbnail(item):
-        # 1. YouTube: Always reconstruct stable URL to fix broken/expiring links
-        if item.get('source_type') == 'youtube' and item.get('original_id'):
-            return f"https://i.ytimg.com/vi/{item['original_id']}/hqdefault.jpg"
-        
-        # 2. Others: Use existing or fallback to default
-        if item.get('thumbnail'):
-            return item['thumbnail']
-            
-        return DEFAULT_THUMB
-
-    for item in newsletter_data['top_stories']:
+    for item in all_contents:
         item['thumbnail'] = repair_thumbnail(item)
-            
-    for cat_items in newsletter_data['category_stories'].values():
-        for item in cat_items:
-            item['thumbnail'] = repair_thumbnail(item)
-
-    # 2. Fetch Active Subscribers
-    print(f"Fetching {'production' if is_production else 'test'} subscribers...")
-    subs_docs = db.collection('subscribers').where('status', '==', 'active').stream()
-    recipients = []
-    
-    for doc in subs_docs:
-        data = doc.to_dict()
-        is_test_user = data.get('is_test') == True
-        
-        if is_production:
-            if not is_test_user: recipients.append(decrypt_email(data['email']))
-        else:
-            if is_test_user: recipients.append(decrypt_email(data['email']))
-    
-    recipients = [r for r in list(set(recipients)) if r]
-    
-    if not recipients:
-        print(f"ℹ️ No recipients found logic. Job skipped.")
-        return
 
-    print(f"📧 Found {len(recipients)} recipients.")
-    
-    # 3. Create mail_history entry
-    mail_history_ref = db.collection('mail_history').add({
+    # 1.6 Trending scores for all candidates in one pass (drops the raw view series)
+    with metrics.span('trending_scores'):
+        annotate_trending(all_contents)
+
+    # 1.7 Near-duplicate stories (same event from several channels) share a cluster;
+    # the selector picks at most one per cluster
+    with metrics.span('near_duplicates'):
+        duplicates = cluster_near_duplicates(all_contents)
+    print(f"  ✓ {duplicates} near-duplicate item(s) grouped with another story")
+
+    # Story selection happens per preference cohort (see CohortIssues); every
+    # cohort shares this issue's category order. NEWSLETTER_SEED makes it reproducible.
+    return all_contents, selector.category_order(seed=os.getenv('NEWSLETTER_SEED')), issue_date()
+
+def new_mail_history(is_production):
+    # recipient_count is filled in once the stream has been fully delivered.
+    return {
         'sent_at': datetime.datetime.now().isoformat(),
         'type': 'production' if is_production else 'test_job',
-        'recipient_count': len(recipients),
-        'status': 'success',
+        'recipient_count': 0,
+        'status': 'sending',
         'simulated': False,
         'open_count': 0,
         'email_pv': 0,
         'click_count': 0
-    })
+    }
+
+def run_newsletter_job(is_production=False, resume_mail_id=None):
+    metrics.reset()
+    try:
+        _run_newsletter_job(is_production, resume_mail_id)
+    finally:
+        # Written for skipped and failed runs too
+        metrics.write_summary('newsletter')
+
+def _run_newsletter_job(is_production, resume_mail_id):
+    mode_text = "PRODUCTION" if is_production else "TEST MODE (Test Group Only)"
+    # Sharded mode: CLOUD_RUN_TASK_INDEX / CLOUD_RUN_TASK_COUNT (see newsletter/sharding.py)
+    shard = ShardSpec.from_env()
+    shard_text = f" [{shard}, run {shard.run_id}]" if shard.enabled else ""
+    print(f"🚀 Starting Newsletter Delivery Job [{mode_text}]{shard_text}...")
+    db = get_db()
+    selector = StorySelector(score=trend_score if NEWSLETTER_RANKING == 'trending' else view_score)
+    personalize = os.getenv('NEWSLETTER_PERSONALIZE', '1') == '1'
+
+    # A resumed send reuses the issue it started with (see newsletter/snapshots.py);
+    # without personalization that issue is all it needs, so no content queries run
+    snapshot = load_snapshot(db, resume_mail_id) if resume_mail_id else None
+    if snapshot is not None and not personalize:
+        print(f"📸 Using issue snapshot {snapshot_id(snapshot['date'], resume_mail_id)} "
+              f"({snapshot['item_count']} stories), skipping content queries")
+        prepared = ([], snapshot['category_order'], snapshot['date'])
+    elif shard.enabled:
+        # The task holding the coordinator lease selects the issue and publishes it; the others load it,
+        # so every shard sends the same stories under one mail_history record.
+        prepared = claim_or_load_issue(
+            db, shard, lambda: prepare_issue(db, selector), new_mail_history(is_production),
+            lease_seconds=int(os.getenv('NEWSLETTER_COORDINATOR_LEASE_SECONDS', 300))
+        )
+    else:
+        prepared = prepare_issue(db, selector)
+    if not prepared:
+        return
+    all_contents, category_order, prepared_date = prepared
+
+    # 2. Stream Active Subscribers (server-filtered, email field only, paged)
+    print(f"Streaming {'production' if is_production else 'test'} subscribers...")
+    recipient_stream = RecipientStream(
+        db, is_production,
+        page_size=int(os.getenv('SUBSCRIBER_PAGE_SIZE', 1000)),
+        with_preferences=personalize,
+        shard=shard if shard.enabled else None
+    )
+    recipients = iter(recipient_stream)
+    first_recipient = next(recipients, None)
+    
+    # A shard with no recipients still has to report, or the merge never completes
+    if first_recipient is None and not shard.enabled:
+        print(f"ℹ️ No recipients found logic. Job skipped.")
+        return
+    recipients = itertools.chain([first_recipient] if first_recipient is not None else [], recipients)
     
-    mail_id = mail_history_ref[1].id
+    # 3. Create mail_history entry (or reuse it when resuming an interrupted send)
+    if shard.enabled:
+        # Re-running the same execution (task retry or NEWSLETTER_RUN_ID) resumes it
+        mail_id = shard.mail_id
+    elif resume_mail_id:
+        mail_id = resume_mail_id
+        print(f"🔁 Resuming delivery for mail_id={mail_id}")
+    else:
+        mail_history_ref = db.collection('mail_history').add(new_mail_history(is_production))
+        
+        mail_id = mail_history_ref[1].id
     
-    # 4. Send Emails
+    # 4. Send Emails — only to recipients the journal has not marked as sent
+    journal = DeliveryJournal(
+        db, mail_id,
+        checkpoint_size=int(os.getenv('JOURNAL_CHECKPOINT_SIZE', 200)),
+        checkpoint_seconds=float(os.getenv('JOURNAL_CHECKPOINT_SECONDS', 5)),
+        shard=shard.index if shard.enabled else None
+    )
+    journal.load()
     email_service = EmailService()
-    email_service.send_newsletter(recipients, newsletter_data, mail_id=mail_id)
+    cohorts = CohortIssues(
+        email_service, selector, all_contents, category_order, mail_id=mail_id,
+        max_cohorts=int(os.getenv('NEWSLETTER_MAX_COHORTS', 200))
+    )
+
+    # 3.5 Snapshot of the shared issue (stories + rendered HTML), written once per mail_id.
+    # Shards and resumed sends load it, so the default cohort gets the same email everywhere.
+    if snapshot is None and (shard.enabled or resume_mail_id):
+        snapshot = load_snapshot(db, mail_id)
+    if snapshot is None:
+        with metrics.span('issue_snapshot'):
+            issue = cohorts.issue_for(DEFAULT_SIGNATURE)
+            snapshot = save_snapshot(db, build_snapshot(
+                mail_id, cohorts.selections[DEFAULT_SIGNATURE], issue, category_order, prepared_date,
+                ranking=NEWSLETTER_RANKING, mail_type=new_mail_history(is_production)['type']
+            ))
+        print(f"📸 Saved issue snapshot {snapshot_id(snapshot['date'], mail_id)} "
+              f"({snapshot['item_count']} stories, hash {snapshot['content_hash'][:12]})")
+    cohorts.seed(DEFAULT_SIGNATURE, compiled_issue(snapshot))
+
+    try:
+        with metrics.span('stage', stage='send'):
+            if personalize:
+                # Items are (email, preference signature); one render per distinct signature
+                pending = (r for r in recipients if journal.should_send(r[0]))
+                report = email_service.send_issues(
+                    pending,
+                    lambda item: cohorts.issue_for(item[1]),
+                    recipient_of=lambda item: item[0],
+                    on_result=journal.record
+                )
+            else:
+                pending = (r for r in recipients if journal.should_send(r))
+                report = email_service.send_issues(
+                    pending,
+                    lambda recipient: cohorts.issue_for(DEFAULT_SIGNATURE),
+                    on_result=journal.record
+                )
+    except DeliveryAborted as e:
+        # Results so far stay journaled, so a resume (or the task retry) only sends the rest
+        journal.flush()
+        db.collection('mail_history').document(mail_id).update({
+            'status': 'error',
+            'error': str(e)[:500],
+            'aborted_at': datetime.datetime.now().isoformat(),
+        })
+        print(f"🛑 Delivery aborted: {e}")
+        raise
+    cohorts.print_summary()
+    metrics.inc('subscribers_streamed', recipient_stream.count)
+    metrics.inc('subscribers_duplicate', recipient_stream.duplicates)
+    metrics.inc('subscribers_undecryptable', len(recipient_stream.errors))
+    metrics.inc('cohorts', cohorts.metrics()['cohort_count'])
+
+    print(f"📧 Streamed {recipient_stream.count} recipients "
+          f"({recipient_stream.duplicates} duplicates dropped).")
+    if recipient_stream.errors:
+        print(f"⚠️ {len(recipient_stream.errors)} subscriber email(s) could not be decrypted "
+              f"(first: {recipient_stream.errors[0][1]})")
+
+    if shard.enabled:
+        extra = cohorts.metrics()
+        if report is None:
+            extra['simulated'] = True
+        report_shard(db, shard, journal, recipient_stream.count, extra=extra)
+    elif report is None:
+        db.collection('mail_history').document(mail_id).update({
+            'status': 'skipped',
+            'simulated': True,
+            'recipient_count': recipient_stream.count
+        })
+    else:
+        journal.finalize(recipient_stream.count, extra=cohorts.metrics())
     
     print(f"✅ Newsletter Job Complete.")
 
 if __name__ == "__main__":
     # If run manually, default to test mode unless production arg passed
     prod = "--production" in sys.argv
-    run_newsletter_job(is_production=prod)
+    # Resume an interrupted send: --resume <mail_id>
+    resume = sys.argv[sys.argv.index("--resume") + 1] if "--resume" in sys.argv else None
+    run_newsletter_job(is_production=prod, resume_mail_id=resume)
@@ -0,0 +1,141 @@
+import sys
+import os
+import datetime
+from utils.db import get_db
+from utils.metrics import metrics
+from utils.content_manifest import MANIFEST_COLLECTION, MANIFEST_RETENTION_DAYS, as_utc, recent_entries
+from services.content_archive import ContentArchive, DEFAULT_ARCHIVE_DIR
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Content not seen by the crawler for this many days leaves the hot collection.
+# Keep it >= the widest reader window (30 days) so nothing a reader can show is archived,
+# and <= MANIFEST_RETENTION_DAYS, since "seen" comes from the channel manifests.
+RETENTION_DAYS = float(os.getenv('RETENTION_DAYS', 90))
+# Local archive root; with ARCHIVE_BUCKET set the archive is mirrored to
+# gs://ARCHIVE_BUCKET/ARCHIVE_PREFIX/ (Cloud Run jobs start with an empty disk)
+ARCHIVE_DIR = os.getenv('ARCHIVE_DIR', DEFAULT_ARCHIVE_DIR)
+ARCHIVE_BUCKET = os.getenv('ARCHIVE_BUCKET')
+ARCHIVE_PREFIX = os.getenv('ARCHIVE_PREFIX', 'archive')
+# Docs archived + deleted per round (a Firestore batch holds at most 500 writes)
+RETENTION_PAGE_SIZE = min(int(os.getenv('RETENTION_PAGE_SIZE', 400)), 500)
+RETENTION_DRY_RUN = os.getenv('RETENTION_DRY_RUN', '0') == '1'
+
+def month_of(data):
+    """Archive partition: the month the item was first crawled (published month as fallback)."""
+    scraped_at = data.get('scraped_at')
+    if isinstance(scraped_at, datetime.datetime):
+        return as_utc(scraped_at).strftime('%Y-%m')
+    return str(data.get('published_at') or 'unknown')[:7]
+
+def expired_pages(db, cutoff, page_size):
+    """Pages of content snapshots first crawled before the cutoff, oldest first."""
+    query = (
+        db.collection('contents')
+        .where('scraped_at', '<', cutoff)
+        .order_by('scraped_at')
+        .limit(page_size)
+    )
+    last = None
+    while True:
+        page = list((query.start_after(last) if last is not None else query).stream())
+        metrics.inc('firestore_reads', len(page), collection='contents')
+        if not page:
+            return
+        yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+def delete_docs(db, refs):
+    batch = db.batch()
+    for ref in refs:
+        batch.delete(ref)
+    with metrics.span('firestore_commit'):
+        batch.commit()
+    metrics.inc('firestore_writes', len(refs), collection=refs[0].path.split('/', 1)[0])
+
+def prune_manifests(db, cutoff, dry_run):
+    """Removes manifests of channels not crawled since the cutoff (dropped from SOURCES)."""
+    stale = list(db.collection(MANIFEST_COLLECTION).where('crawled_at', '<', cutoff).stream())
+    if stale and not dry_run:
+        delete_docs(db, [snapshot.reference for snapshot in stale])
+    return len(stale)
+
+def run_retention(retention_days=RETENTION_DAYS, dry_run=RETENTION_DRY_RUN):
+    if retention_days > MANIFEST_RETENTION_DAYS:
+        # Manifests would forget items before they are due, and items still crawled would be archived
+        raise ValueError(f"RETENTION_DAYS={retention_days:g} exceeds MANIFEST_RETENTION_DAYS="
+                         f"{MANIFEST_RETENTION_DAYS:g}; raise the manifest retention first")
+    metrics.reset()
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cutoff = now - datetime.timedelta(days=retention_days)
+    mode_text = " [DRY RUN]" if dry_run else ""
+    print(f"🧊 Starting Retention Job{mode_text}: archiving contents not seen since {cutoff:%Y-%m-%d} "
+          f"({retention_days:g} days)...")
+
+    db = get_db()
+    archive = ContentArchive(ARCHIVE_DIR, bucket=ARCHIVE_BUCKET, prefix=ARCHIVE_PREFIX)
+
+    # 1. Items the crawler still sees stay hot even if they were first crawled long ago
+    entries = recent_entries(db, cutoff) or []
+    still_seen = {doc_id for _, doc_id, _ in entries}
+    print(f"  👀 {len(still_seen)} item(s) seen since the cutoff (channel manifests)")
+
+    # 2. Archive, then delete, one page at a time — a crash never loses unarchived docs
+    archived, kept = 0, set()
+    months = {}
+    with metrics.span('stage', stage='archive'):
+        for page in expired_pages(db, cutoff, RETENTION_PAGE_SIZE):
+            expired = [snapshot for snapshot in page if snapshot.id not in still_seen]
+            kept.update(snapshot.id for snapshot in page if snapshot.id in still_seen)
+            if not expired:
+                continue
+            if not dry_run:
+                with metrics.span('archive_write'):
+                    counts = archive.write([(snapshot.id, snapshot.to_dict()) for snapshot in expired], month_of)
+                delete_docs(db, [snapshot.reference for snapshot in expired])
+            else:
+                counts = {}
+                for snapshot in expired:
+                    month = month_of(snapshot.to_dict())
+                    counts[month] = counts.get(month, 0) + 1
+            for month, count in counts.items():
+                months[month] = months.get(month, 0) + count
+            archived += len(expired)
+            print(f"  📦 {archived} archived so far ({len(expired)} in this page)")
+
+    # 3. Manifests of channels that are no longer crawled
+    stale_manifests = prune_manifests(db, cutoff, dry_run)
+
+    metrics.inc('contents_archived', archived)
+    metrics.inc('contents_kept', len(kept))
+    metrics.inc('manifests_pruned', stale_manifests)
+    for month, count in sorted(months.items()):
+        print(f"   - month={month}: {count}")
+    verb = "Would archive" if dry_run else "Archived"
+    print(f"✅ {verb} {archived} item(s) ({len(kept)} old but still crawled kept, "
+          f"{stale_manifests} stale manifest(s)) → {f'gs://{ARCHIVE_BUCKET}/{ARCHIVE_PREFIX}' if ARCHIVE_BUCKET else ARCHIVE_DIR}")
+    archive.close()
+    metrics.write_summary('retention')
+    return archived
+
+def lookup(original_id):
+    """Prints the archived copies of one item (e.g. a video ID)."""
+    archive = ContentArchive(ARCHIVE_DIR, bucket=ARCHIVE_BUCKET, prefix=ARCHIVE_PREFIX)
+    found = archive.lookup(original_id)
+    archive.close()
+    if not found:
+        print(f"🔍 {original_id} is not in the archive")
+    for data in found:
+        print(data)
+    return found
+
+if __name__ == "__main__":
+    # python run_retention.py [--dry-run]       archive expired contents
+    # python run_retention.py --lookup <id>     point lookup in the archive by original_id
+    if "--lookup" in sys.argv:
+        lookup(sys.argv[sys.argv.index("--lookup") + 1])
+    else:
+        run_retention(dry_run=RETENTION_DRY_RUN or "--dry-run" in sys.argv)
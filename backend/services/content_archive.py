@@ -0,0 +1,146 @@
+import os
+import io
+import gzip
+import json
+import uuid
+import sqlite3
+import datetime
+from utils.metrics import metrics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ARCHIVE_DIR = os.path.join(BASE_DIR, '.cache', 'archive')
+INDEX_NAME = 'index.sqlite3'
+
+def _json_default(value):
+    # Firestore timestamps come back as datetime subclasses
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+class ContentArchive:
+    """
+    Cold storage for content docs moved out of Firestore: gzip'd JSONL
+    partitioned by month, plus a SQLite index by original_id for point
+    lookups.
+
+        {root}/contents/month=YYYY-MM/part-{stamp}-{id}.jsonl.gz
+        {root}/index.sqlite3   archived(doc_id, original_id, source_type, month, path, line, archived_at)
+
+    Each write() adds new part files (existing ones are never rewritten).
+    With `bucket` set, parts and the index are mirrored to
+    gs://{bucket}/{prefix}/ and the local root is a working copy; the
+    index is downloaded first so runs on fresh containers keep adding to it.
+    """
+
+    def __init__(self, root=DEFAULT_ARCHIVE_DIR, bucket=None, prefix='archive'):
+        self.root = root
+        self.prefix = prefix.strip('/')
+        self._bucket_name = bucket
+        self._bucket = None
+        os.makedirs(root, exist_ok=True)
+        self.index_path = os.path.join(root, INDEX_NAME)
+        if bucket:
+            self._download(INDEX_NAME, missing_ok=True)
+        self._conn = sqlite3.connect(self.index_path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS archived ('
+            ' doc_id TEXT PRIMARY KEY, original_id TEXT, source_type TEXT,'
+            ' month TEXT NOT NULL, path TEXT NOT NULL, line INTEGER NOT NULL, archived_at TEXT NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_original_id ON archived (original_id)')
+        self._conn.commit()
+
+    # --- Object store (optional) ---
+
+    def _get_bucket(self):
+        if self._bucket is None:
+            # Only needed when archiving to GCS
+            from google.cloud import storage
+            self._bucket = storage.Client().bucket(self._bucket_name)
+        return self._bucket
+
+    def _blob(self, relative_path):
+        return self._get_bucket().blob(f"{self.prefix}/{relative_path}")
+
+    def _upload(self, relative_path):
+        with metrics.span('archive_upload'):
+            self._blob(relative_path).upload_from_filename(os.path.join(self.root, relative_path))
+
+    def _download(self, relative_path, missing_ok=False):
+        blob = self._blob(relative_path)
+        if missing_ok and not blob.exists():
+            return False
+        local_path = os.path.join(self.root, relative_path)
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        blob.download_to_filename(local_path)
+        return True
+
+    # --- Writing ---
+
+    def write(self, docs, month_of):
+        """
+        Archives (doc_id, data) pairs, one new part file per month
+        (month_of(data) -> 'YYYY-MM'), and indexes them. Returns
+        {month: count}. Everything is durable (and uploaded) on return,
+        so the caller can delete the hot copies afterwards.
+        """
+        by_month = {}
+        for doc_id, data in docs:
+            by_month.setdefault(month_of(data), []).append((doc_id, data))
+
+        archived_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        stamp = datetime.datetime.now().strftime('%Y%m%dT%H%M%S')
+        rows = []
+        written = []
+        for month, month_docs in sorted(by_month.items()):
+            relative_path = f"contents/month={month}/part-{stamp}-{uuid.uuid4().hex[:6]}.jsonl.gz"
+            path = os.path.join(self.root, relative_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path + '.tmp', 'wb') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='wb') as gz, io.TextIOWrapper(gz, encoding='utf-8') as out:
+                    for line, (doc_id, data) in enumerate(month_docs):
+                        out.write(json.dumps({'id': doc_id, **data}, ensure_ascii=False, default=_json_default))
+                        out.write('\n')
+                        rows.append((doc_id, data.get('original_id'), data.get('source_type'),
+                                     month, relative_path, line, archived_at))
+                # gzip trailer is written on close; sync it before the hot copies can be deleted
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(path + '.tmp', path)
+            written.append(relative_path)
+
+        # Re-archiving a doc (e.g. a run that died before deleting) points the index at the newest copy
+        self._conn.executemany('INSERT OR REPLACE INTO archived VALUES (?, ?, ?, ?, ?, ?, ?)', rows)
+        self._conn.commit()
+
+        if self._bucket_name:
+            for relative_path in written:
+                self._upload(relative_path)
+            self._upload(INDEX_NAME)
+        return {month: len(month_docs) for month, month_docs in by_month.items()}
+
+    # --- Reading ---
+
+    def lookup(self, original_id):
+        """Archived copies of a content item by original_id (usually one)."""
+        rows = self._conn.execute(
+            'SELECT path, line FROM archived WHERE original_id = ? ORDER BY archived_at DESC', (original_id,)
+        ).fetchall()
+        found = []
+        for relative_path, line in rows:
+            path = os.path.join(self.root, relative_path)
+            if not os.path.exists(path) and self._bucket_name:
+                self._download(relative_path)
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                for i, text in enumerate(f):
+                    if i == line:
+                        found.append(json.loads(text))
+                        break
+        return found
+
+    def stats(self):
+        """{month: archived doc count} from the index."""
+        return dict(self._conn.execute('SELECT month, COUNT(*) FROM archived GROUP BY month ORDER BY month').fetchall())
+
+    def close(self):
+        self._conn.close()
@@ -1,5 +1,7 @@
 import os
 import binascii
+import itertools
+import multiprocessing
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import unpad, pad
 
@@ -23,6 +25,91 @@ def decrypt_email(encrypted_text):
         print(f"Decryption error: {e}")
         return encrypted_text # Fallback to original
 
+# Batch decryption: expand the key schedule once and do the CBC chaining ourselves.
+# AES-CBC decryption of block i is ECB_decrypt(C_i) XOR C_(i-1) (C_0 = IV), so one
+# ECB call over the whole ciphertext plus a single big-int XOR replaces building a
+# new CBC cipher per subscriber. Output is identical to decrypt_email / crypto.ts.
+_ecb_cipher = AES.new(KEY_BYTES, AES.MODE_ECB)
+
+# Below this many items a process pool costs more than it saves
+PARALLEL_THRESHOLD = 50000
+CHUNK_SIZE = 5000
+
+def _decrypt_one(encrypted_text):
+    # Like decrypt_email, only the field after the IV is ciphertext: crypto.ts rejoins
+    # the rest with ':' but Buffer.from(hex) stops decoding at the first ':' anyway.
+    parts = encrypted_text.split(':')
+    iv = binascii.unhexlify(parts[0])
+    ct = binascii.unhexlify(parts[1])
+    if len(iv) != AES.block_size or not ct or len(ct) % AES.block_size:
+        raise ValueError("Invalid IV or ciphertext length")
+    decrypted = _ecb_cipher.decrypt(ct)
+    chained = iv + ct[:-AES.block_size]
+    pt = (int.from_bytes(decrypted, 'big') ^ int.from_bytes(chained, 'big')).to_bytes(len(ct), 'big')
+    return unpad(pt, AES.block_size).decode('utf-8')
+
+def _decrypt_chunk(chunk):
+    """Decrypts a list of texts. Returns (plaintexts, [(offset, error), ...])."""
+    results = []
+    failures = []
+    for offset, text in enumerate(chunk):
+        if not text or ':' not in text:
+            results.append(text)
+            continue
+        try:
+            results.append(_decrypt_one(text))
+        except Exception as e:
+            results.append(None)
+            failures.append((offset, str(e)))
+    return results, failures
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def decrypt_emails(encrypted_texts, errors=None, processes=None, chunk_size=CHUNK_SIZE,
+                   parallel_threshold=PARALLEL_THRESHOLD):
+    """
+    Decrypts a stream of encrypted emails, yielding plaintexts in input order.
+
+    Values without an IV separator are passed through like decrypt_email does.
+    Items that fail to decrypt yield None and are appended to `errors` as
+    (index, error) instead of being printed one by one.
+
+    `processes`: worker process count. None picks automatically — a single
+    process for small inputs, all CPUs once the stream reaches `parallel_threshold`
+    items (PARALLEL_THRESHOLD by default).
+    """
+    if errors is None:
+        errors = []
+
+    iterator = iter(encrypted_texts)
+    if processes is None:
+        head = list(itertools.islice(iterator, parallel_threshold))
+        processes = (os.cpu_count() or 1) if len(head) >= parallel_threshold else 1
+        iterator = itertools.chain(head, iterator)
+
+    chunks = _chunks(iterator, chunk_size)
+    base = 0
+
+    if processes <= 1:
+        results = map(_decrypt_chunk, chunks)
+        for plaintexts, failures in results:
+            errors.extend((base + offset, error) for offset, error in failures)
+            base += len(plaintexts)
+            yield from plaintexts
+        return
+
+    with multiprocessing.Pool(processes) as pool:
+        for plaintexts, failures in pool.imap(_decrypt_chunk, chunks):
+            errors.extend((base + offset, error) for offset, error in failures)
+            base += len(plaintexts)
+            yield from plaintexts
+
 def encrypt_email(text):
     if not text:
         return text
@@ -1,14 +1,36 @@
-import smtplib
 import os
 import datetime
+import hashlib
+import uuid
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 from dotenv import load_dotenv
+from services.smtp_delivery import SMTPDeliveryEngine
+from utils.metrics import metrics
 
 # Load env vars
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv(os.path.join(BASE_DIR, '.env'))
+JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR', os.path.join(BASE_DIR, '.cache', 'jinja'))
+
+def make_sid(email):
+    """Tracking ID for a recipient: md5 of the lower-cased address."""
+    return hashlib.md5(email.lower().encode()).hexdigest()
+
+class CompiledIssue:
+    """
+    A newsletter issue rendered once, with the per-recipient `sid` left as
+    splice points. `render(sid)` produces exactly what a full per-recipient
+    template render would, at the cost of a string join.
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def render(self, sid):
+        # Jinja renders values with str(), so None becomes 'None' in both paths
+        return str(sid).join(self.parts)
 
 class EmailService:
     def __init__(self):
@@ -20,7 +42,11 @@ class EmailService:
         
         # Setup Jinja2
         template_dir = os.path.join(BASE_DIR, 'templates')
-        self.jinja_env = Environment(loader=FileSystemLoader(template_dir))
+        os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+        self.jinja_env = Environment(
+            loader=FileSystemLoader(template_dir),
+            bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR)
+        )
         
         # Add urlencode filter
         import urllib.parse
@@ -36,63 +62,81 @@ class EmailService:
         # Base URL for tracking
         base_tracking_url = "https://opinionnewsletter-web-810426728503.asia-northeast3.run.app"
         
-        return template.render(
-            contents=contents, 
-            date_str=date_str, 
-            mail_id=mail_id,
-            sid=sid,
-            tracking_url=base_tracking_url
+        with metrics.span('render_template'):
+            return template.render(
+                contents=contents, 
+                date_str=date_str, 
+                mail_id=mail_id,
+                sid=sid,
+                tracking_url=base_tracking_url
+            )
+
+    def compile_issue(self, contents, mail_id=None):
+        """
+        Renders the shared issue HTML once. The only per-recipient value in the
+        template is `sid`, so we render with a unique placeholder and split on it.
+        """
+        placeholder = f"__ONEW_SID_{uuid.uuid4().hex}__"
+        html = self.render_template(contents, mail_id=mail_id, sid=placeholder)
+        return CompiledIssue(html.split(placeholder))
+
+    def create_delivery_engine(self):
+        """SMTP connection pool configured from the EMAIL_* environment."""
+        return SMTPDeliveryEngine(
+            self.host, self.port,
+            user=self.user,
+            password=self.password,
+            from_addr=self.user,
+            workers=int(os.getenv('EMAIL_WORKERS', 4)),
+            max_per_connection=int(os.getenv('EMAIL_MAX_PER_CONNECTION', 100)),
+            rate_per_second=float(os.getenv('EMAIL_RATE_PER_SECOND', 10)),
+            retries=int(os.getenv('EMAIL_RETRIES', 2)),
+            max_consecutive_failures=int(os.getenv('EMAIL_MAX_CONSECUTIVE_FAILURES', 20)),
+            starttls=os.getenv('EMAIL_STARTTLS', '1') == '1'
         )
 
-    def send_newsletter(self, to_emails, contents, mail_id=None):
+    def send_issues(self, recipients, issue_for, recipient_of=None, on_result=None):
         """
-        Sends the newsletter to a list of recipients.
-        For MVP, we send individually or in bcc to avoid exposing emails.
-        For this demo, we'll loop and send individually to mimic transactional feels or use BCC.
-        Using BCC is better for quota.
+        Sends pre-compiled issues. `issue_for(item)` returns the CompiledIssue
+        for a work item and `recipient_of(item)` its email address (items are
+        plain addresses by default).
         """
         if not self.user or not self.password:
             print("⚠️ EMAIL_USER or EMAIL_PASSWORD not set. Skipping email send.")
-            print(f"   [Mock Send] Would have sent to {len(to_emails)} recipients.")
-            return
+            count = sum(1 for _ in recipients)
+            print(f"   [Mock Send] Would have sent to {count} recipients.")
+            return None
 
         # Use KST timezone (UTC+9)
         import pytz
         kst = pytz.timezone('Asia/Seoul')
         now_kst = datetime.datetime.now(kst)
         subject = f"오뉴 - 오늘의 오피니언 뉴스 [{now_kst.month}/{now_kst.day}]"
+        address_of = recipient_of or (lambda item: item)
 
-        try:
-            # Connect to SMTP Server
-            server = smtplib.SMTP(self.host, self.port)
-            server.starttls()
-            server.login(self.user, self.password)
+        def build_message(item):
+            recipient = address_of(item)
+            # Splice THIS recipient's SID into the pre-rendered issue
+            recipient_html = issue_for(item).render(make_sid(recipient))
             
-            # Send (Looping for individual customization in future, but simple for now)
-            # To avoid spam flags, sending in batches is better. 
-            # For MVP, let's just send one by one to ensure delivery in test.
+            msg = MIMEMultipart('alternative')
+            msg['Subject'] = subject
+            msg['From'] = self.msg_from
+            msg['To'] = recipient
             
-            import hashlib
-            
-            for recipient in to_emails:
-                # Generate a unique SID for this recipient (hashed email)
-                sid = hashlib.md5(recipient.lower().encode()).hexdigest()
-                
-                # Render template specifically for THIS recipient with their SID
-                recipient_html = self.render_template(contents, mail_id=mail_id, sid=sid)
-                
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = self.msg_from
-                msg['To'] = recipient
-                
-                part = MIMEText(recipient_html, 'html')
-                msg.attach(part)
-                
-                server.sendmail(self.user, recipient, msg.as_string())
-                print(f"✅ Sent email to {recipient} (sid={sid})")
+            part = MIMEText(recipient_html, 'html')
+            msg.attach(part)
+            return msg.as_string()
 
-            server.quit()
-            
-        except Exception as e:
-            print(f"❌ Failed to send email: {e}")
+        def report_result(recipient, error):
+            if error is None:
+                print(f"✅ Sent email to {recipient} (sid={make_sid(recipient)})")
+            else:
+                print(f"❌ Failed to send email to {recipient}: {error}")
+            if on_result:
+                on_result(recipient, error)
+
+        engine = self.create_delivery_engine()
+        report = engine.deliver(recipients, build_message, on_result=report_result, recipient_of=recipient_of)
+        print(f"📬 Delivery finished: {report.sent_count} sent, {report.failed_count} failed")
+        return report
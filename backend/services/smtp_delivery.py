@@ -0,0 +1,287 @@
+import time
+import queue
+import smtplib
+import threading
+from utils.metrics import metrics
+
+class DeliveryReport:
+    """
+    Outcome counts of a delivery run. Per-recipient results go to `on_result`
+    (the delivery journal), so only the first `keep_failures` failures are
+    kept here, for the log.
+    """
+
+    def __init__(self, keep_failures=100):
+        self.sent_count = 0
+        self.failed_count = 0
+        self.failed = {}
+        self.keep_failures = keep_failures
+        self._lock = threading.Lock()
+
+    def record(self, recipient, error=None):
+        with self._lock:
+            if error is None:
+                self.sent_count += 1
+            else:
+                self.failed_count += 1
+                if len(self.failed) < self.keep_failures:
+                    self.failed[recipient] = str(error)
+
+    @property
+    def total(self):
+        return self.sent_count + self.failed_count
+
+    def to_dict(self):
+        return {
+            'sent_count': self.sent_count,
+            'failed_count': self.failed_count,
+            'failed': dict(self.failed),
+        }
+
+class DeliveryAborted(Exception):
+    """
+    The run cannot continue: the SMTP login was rejected, the server is
+    unreachable, too many recipients failed in a row, or the result callback
+    raised. `report` holds the results recorded before the pool stopped;
+    recipients without a result were never sent.
+    """
+
+    def __init__(self, message, report=None):
+        super().__init__(message)
+        self.report = report
+
+class _PoolControl:
+    """Stop flag shared by the producer and the workers, plus the consecutive-failure breaker."""
+
+    def __init__(self, max_consecutive_failures):
+        self.stopped = threading.Event()
+        self.error = None
+        self.max_consecutive_failures = max_consecutive_failures
+        self._consecutive_failures = 0
+        self._lock = threading.Lock()
+
+    def abort(self, error):
+        with self._lock:
+            if self.error is None:
+                self.error = error
+        self.stopped.set()
+
+    def observe(self, error):
+        """Counts failures in a row (refused recipients excluded); trips the breaker at the limit."""
+        with self._lock:
+            if error is None or isinstance(error, smtplib.SMTPRecipientsRefused):
+                self._consecutive_failures = 0
+                return
+            self._consecutive_failures += 1
+            tripped = 0 < self.max_consecutive_failures <= self._consecutive_failures
+        if tripped:
+            self.abort(DeliveryAborted(
+                f"{self.max_consecutive_failures} consecutive delivery failures (last: {error})"
+            ))
+
+class RateLimiter:
+    """Token bucket shared by all workers. rate <= 0 disables limiting."""
+
+    def __init__(self, rate_per_second):
+        self.rate = rate_per_second
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+class SMTPDeliveryEngine:
+    """
+    Sends messages over a pool of SMTP connections.
+
+    - `workers` threads each hold their own connection
+    - a connection is recycled after `max_per_connection` messages
+    - `rate_per_second` caps the global send rate across all workers
+    - each recipient is retried up to `retries` times (with a fresh
+      connection and exponential backoff) before it is reported as failed
+
+    One recipient failing never aborts the rest of the list, but failures
+    that no retry can fix stop the whole pool and `deliver` raises
+    DeliveryAborted: a rejected login, a server that refuses every
+    connection attempt, `max_consecutive_failures` failed recipients in a
+    row (0 disables the breaker), or an exception from `on_result`.
+    """
+
+    _DONE = object()
+    _POLL_SECONDS = 0.1
+
+    def __init__(self, host, port, user=None, password=None, from_addr=None,
+                 workers=4, max_per_connection=100, rate_per_second=0,
+                 retries=2, retry_backoff=1.0, starttls=True, timeout=30,
+                 max_consecutive_failures=20, smtp_factory=smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.from_addr = from_addr or user
+        self.workers = max(1, workers)
+        self.max_per_connection = max(1, max_per_connection)
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+        self.starttls = starttls
+        self.timeout = timeout
+        self.max_consecutive_failures = max_consecutive_failures
+        self.smtp_factory = smtp_factory
+        self.rate_limiter = RateLimiter(rate_per_second)
+
+    def _connect(self):
+        server = self.smtp_factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.user and self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            self._close(server)
+            raise
+        return server
+
+    @staticmethod
+    def _close(server):
+        if server is None:
+            return
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _send_one(self, state, recipient, message):
+        """
+        Sends one message, reconnecting/retrying as needed. Returns None or the last error.
+        Raises DeliveryAborted when the login is rejected or no attempt could connect.
+        """
+        last_error = None
+        connect_failures = 0
+        for attempt in range(self.retries + 1):
+            if attempt:
+                metrics.inc('smtp_retries')
+                time.sleep(self.retry_backoff * (2 ** (attempt - 1)))
+            if state['server'] is None or state['count'] >= self.max_per_connection:
+                self._close(state['server'])
+                state['server'] = None
+                try:
+                    with metrics.span('smtp_connect'):
+                        state['server'] = self._connect()
+                except smtplib.SMTPAuthenticationError as e:
+                    # Same credentials for every recipient; retrying only risks a lockout
+                    raise DeliveryAborted(f"SMTP login rejected: {e}") from e
+                except (smtplib.SMTPException, OSError) as e:
+                    last_error = e
+                    connect_failures += 1
+                    continue
+                state['count'] = 0
+            try:
+                self.rate_limiter.acquire()
+                with metrics.span('smtp_send'):
+                    state['server'].sendmail(self.from_addr, recipient, message)
+                state['count'] += 1
+                return None
+            except smtplib.SMTPRecipientsRefused as e:
+                # Permanent per-recipient rejection; retrying will not help
+                state['count'] += 1
+                return e
+            except (smtplib.SMTPException, OSError) as e:
+                last_error = e
+                self._close(state['server'])
+                state['server'] = None
+        if connect_failures > self.retries:
+            raise DeliveryAborted(
+                f"Cannot connect to SMTP server {self.host}:{self.port}: {last_error}"
+            ) from last_error
+        return last_error
+
+    def _worker(self, work, build_message, report, on_result, recipient_of, control):
+        state = {'server': None, 'count': 0}
+        try:
+            while not control.stopped.is_set():
+                try:
+                    item = work.get(timeout=self._POLL_SECONDS)
+                except queue.Empty:
+                    continue
+                if item is self._DONE:
+                    break
+                recipient = recipient_of(item) if recipient_of else item
+                try:
+                    with metrics.span('smtp_build_message'):
+                        message = build_message(item)
+                    error = self._send_one(state, recipient, message)
+                except DeliveryAborted as e:
+                    # Not sent and not recorded: the recipient stays pending
+                    control.abort(e)
+                    break
+                except Exception as e:
+                    error = e
+                metrics.inc('emails', result='sent' if error is None else 'failed')
+                report.record(recipient, error)
+                if on_result:
+                    try:
+                        on_result(recipient, error)
+                    except Exception as e:
+                        control.abort(DeliveryAborted(f"Result callback failed for {recipient}: {e!r}"))
+                        break
+                control.observe(error)
+        except Exception as e:
+            control.abort(DeliveryAborted(f"SMTP worker crashed: {e!r}"))
+        finally:
+            self._close(state['server'])
+
+    def _put(self, work, item, control):
+        """Queues an item unless the pool has stopped (a full queue would otherwise block forever)."""
+        while not control.stopped.is_set():
+            try:
+                work.put(item, timeout=self._POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def deliver(self, recipients, build_message, on_result=None, recipient_of=None):
+        """
+        Delivers to every recipient in `recipients` (any iterable, consumed
+        lazily). `build_message(item)` returns the full message string.
+        `on_result(recipient, error)` is called after each recipient, with
+        error=None on success. Returns a DeliveryReport.
+
+        Work items are email addresses unless `recipient_of(item)` is given to
+        extract the address from a richer item (e.g. (email, cohort) pairs).
+
+        Raises DeliveryAborted (with the partial report attached) when the
+        pool had to stop early; the rest of `recipients` is not consumed.
+        """
+        report = DeliveryReport()
+        control = _PoolControl(self.max_consecutive_failures)
+        work = queue.Queue(maxsize=self.workers * 4)
+        threads = [
+            threading.Thread(target=self._worker, args=(work, build_message, report, on_result, recipient_of, control), daemon=True)
+            for _ in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for recipient in recipients:
+                if not self._put(work, recipient, control):
+                    break
+        finally:
+            for _ in threads:
+                self._put(work, self._DONE, control)
+            for t in threads:
+                t.join()
+        if control.error is not None:
+            control.error.report = report
+            raise control.error
+        return report
@@ -0,0 +1,152 @@
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+from utils.metrics import metrics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, '.cache', 'translations.sqlite3')
+
+# Translate v2 accepts up to 128 segments per request
+MAX_SEGMENTS_PER_REQUEST = 100
+
+def needs_translation(text):
+    """Titles without any Hangul are sent to the Translation API."""
+    return bool(text) and not re.search('[가-힣]', text)
+
+class TranslationCache:
+    """
+    Persistent translation cache keyed by sha256(text) and target language.
+    Backed by SQLite; least-recently-used rows are evicted above `max_entries`.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=50000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS translations ('
+            ' key TEXT NOT NULL, target TEXT NOT NULL, translated TEXT NOT NULL,'
+            ' last_used REAL NOT NULL, PRIMARY KEY (key, target))'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_last_used ON translations (last_used)')
+        self._conn.commit()
+
+    @staticmethod
+    def _key(text):
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get_many(self, texts, target):
+        """Returns {text: translated} for every cached text."""
+        keys = {self._key(t): t for t in texts}
+        found = {}
+        with self._lock:
+            key_list = list(keys)
+            for i in range(0, len(key_list), 500):
+                chunk = key_list[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, translated FROM translations WHERE target = ? AND key IN ({placeholders})',
+                    [target, *chunk]
+                ).fetchall()
+                for key, translated in rows:
+                    found[keys[key]] = translated
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    'UPDATE translations SET last_used = ? WHERE key = ? AND target = ?',
+                    [(now, self._key(t), target) for t in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, translations, target):
+        """Stores {text: translated} and evicts the oldest rows beyond max_entries."""
+        if not translations:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO translations (key, target, translated, last_used) VALUES (?, ?, ?, ?)',
+                [(self._key(t), target, tr, now) for t, tr in translations.items()]
+            )
+            (count,) = self._conn.execute('SELECT COUNT(*) FROM translations').fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    'DELETE FROM translations WHERE rowid IN ('
+                    ' SELECT rowid FROM translations ORDER BY last_used ASC LIMIT ?)',
+                    (count - self.max_entries,)
+                )
+            self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+class TranslationService:
+    """
+    Translates non-Korean titles with one long-lived Translation API client.
+    Uncached texts are sent in batched requests and the results are persisted
+    in a TranslationCache, so a title is never translated twice even if it
+    shows up under another video ID or after its contents doc was purged.
+
+    `client` can be any object with the translate_v2 `translate(values,
+    target_language=...)` interface, which lets a fake backend stand in.
+    """
+
+    def __init__(self, client=None, cache=None):
+        self._client = client
+        self.cache = cache if cache is not None else TranslationCache(
+            os.getenv('TRANSLATION_CACHE_PATH', DEFAULT_CACHE_PATH),
+            max_entries=int(os.getenv('TRANSLATION_CACHE_MAX_ENTRIES', 50000))
+        )
+        self.api_calls = 0
+
+    @property
+    def client(self):
+        if self._client is None:
+            from google.cloud import translate_v2 as translate
+            self._client = translate.Client()
+        return self._client
+
+    def translate_many(self, texts, target_language='ko'):
+        """
+        Translates a list of texts, returning results in the same order.
+        Korean texts are returned unchanged; on API failure the original
+        text is kept (and not cached) so the next run can retry.
+        """
+        pending = list(dict.fromkeys(t for t in texts if needs_translation(t)))
+        translated = self.cache.get_many(pending, target_language) if pending else {}
+        missing = [t for t in pending if t not in translated]
+
+        fresh = {}
+        requests_made = 0
+        for i in range(0, len(missing), MAX_SEGMENTS_PER_REQUEST):
+            chunk = missing[i:i + MAX_SEGMENTS_PER_REQUEST]
+            try:
+                requests_made += 1
+                self.api_calls += 1
+                with metrics.span('translate_api'):
+                    results = self.client.translate(chunk, target_language=target_language)
+                metrics.inc('translate_characters', sum(len(t) for t in chunk))
+                for text, result in zip(chunk, results):
+                    fresh[text] = result['translatedText']
+            except Exception as e:
+                print(f"Translation failed for {len(chunk)} text(s): {e}")
+
+        self.cache.put_many(fresh, target_language)
+        translated.update(fresh)
+        metrics.inc('translate_texts', len(pending) - len(missing), result='cached')
+        metrics.inc('translate_texts', len(fresh), result='translated')
+        metrics.inc('translate_texts', len(missing) - len(fresh), result='failed')
+
+        if pending:
+            print(f"   🌐 Translation: {len(pending)} text(s), {len(pending) - len(missing)} cached, "
+                  f"{len(fresh)} translated in {requests_made} request(s)")
+        return [translated.get(t, t) for t in texts]
+
+    def translate(self, text, target_language='ko'):
+        return self.translate_many([text], target_language)[0]
@@ -0,0 +1,629 @@
+"""
+In-memory stand-ins for the external services the jobs talk to, for the unit
+tests, offline benchmarks and local dry runs. Nothing here is imported by the
+jobs themselves.
+
+- FakeFirestore: the subset of google.cloud.firestore the backend uses
+  (documents, subcollections, where/order_by/select/limit/start_after
+  queries, get_all, batches, create). Counts reads, writes and commits.
+  Pass a multiprocessing Manager dict + RLock as `docs` / `lock` to share
+  one datastore between processes.
+- FakeYouTubeAPI: channels / playlistItems / videos responses (and the RSS
+  feed) for a synthetic set of channels, with ETags and daily uploads.
+- FakeYouTubeServer: FakeYouTubeAPI over local HTTP, with injectable
+  latency, hangs and error responses.
+- FakeTranslateClient: translate_v2 Client lookalike.
+- RecordingSMTP: smtplib.SMTP lookalike that accepts everything.
+
+Every fake takes a `latency` in seconds that is slept once per simulated
+round trip, so pipelines that batch or parallelize calls show it.
+"""
+import copy
+import json
+import time
+import uuid
+import bisect
+import hashlib
+import datetime
+import threading
+import collections
+import urllib.parse
+import http.server
+from google.api_core import exceptions as gcp_exceptions
+
+def _normalize(value):
+    if isinstance(value, datetime.datetime) and value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+def _present(value):
+    return value is not None
+
+OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: _present(a) and a != b,
+    '>=': lambda a, b: _present(a) and a >= b,
+    '<=': lambda a, b: _present(a) and a <= b,
+    '>': lambda a, b: _present(a) and a > b,
+    '<': lambda a, b: _present(a) and a < b,
+    'in': lambda a, b: a in b,
+    'array_contains': lambda a, b: isinstance(a, list) and b in a,
+}
+
+class FakeSnapshot:
+    def __init__(self, reference, data, fields=None):
+        self.reference = reference
+        self.id = reference.id
+        self.exists = data is not None
+        self._data = data
+        self._fields = fields
+
+    def to_dict(self):
+        if self._data is None:
+            return None
+        if self._fields is not None:
+            return {k: copy.deepcopy(v) for k, v in self._data.items() if k in self._fields}
+        return copy.deepcopy(self._data)
+
+    def get(self, field):
+        return (self._data or {}).get(field)
+
+class FakeDocumentReference:
+    def __init__(self, db, path):
+        self._db = db
+        self.path = path
+        self.id = path.rsplit('/', 1)[-1]
+
+    def get(self, field_paths=None):
+        self._db.round_trip()
+        self._db.reads += 1
+        return FakeSnapshot(self, self._db.docs.get(self.path), field_paths)
+
+    def create(self, data):
+        self._db.round_trip()
+        with self._db.lock:
+            if self._db.docs.get(self.path) is not None:
+                raise gcp_exceptions.Conflict(f"Document already exists: {self.path}")
+            self._db.put(self.path, copy.deepcopy(data))
+
+    def set(self, data, merge=False):
+        self._db.round_trip()
+        self._set(data, merge)
+
+    def update(self, data):
+        self._db.round_trip()
+        self._update(data)
+
+    def delete(self):
+        self._db.round_trip()
+        self._delete()
+
+    def _set(self, data, merge=False):
+        with self._db.lock:
+            current = self._db.docs.get(self.path) if merge else None
+            # Always store a fresh value so Manager-backed dicts see the change
+            self._db.put(self.path, {**(current or {}), **copy.deepcopy(data)})
+
+    def _update(self, data):
+        with self._db.lock:
+            current = self._db.docs.get(self.path)
+            if current is None:
+                raise gcp_exceptions.NotFound(f"No document to update: {self.path}")
+            self._db.put(self.path, {**current, **copy.deepcopy(data)})
+
+    def _delete(self):
+        with self._db.lock:
+            self._db.remove(self.path)
+
+    def collection(self, name):
+        return FakeQuery(self._db, f"{self.path}/{name}")
+
+class FakeQuery:
+    def __init__(self, db, path, filters=(), orders=(), limit=None, fields=None, after=None):
+        self._db = db
+        self._path = path
+        self._filters = filters
+        self._orders = orders
+        self._limit = limit
+        self._fields = fields
+        self._after = after
+
+    def _with(self, **changes):
+        state = dict(filters=self._filters, orders=self._orders, limit=self._limit,
+                     fields=self._fields, after=self._after)
+        state.update(changes)
+        return FakeQuery(self._db, self._path, **state)
+
+    @property
+    def id(self):
+        return self._path.rsplit('/', 1)[-1]
+
+    def document(self, doc_id=None):
+        return FakeDocumentReference(self._db, f"{self._path}/{doc_id or uuid.uuid4().hex[:20]}")
+
+    def add(self, data):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+    def where(self, field, op, value):
+        return self._with(filters=self._filters + ((field, op, value),))
+
+    def order_by(self, field, direction='ASCENDING'):
+        return self._with(orders=self._orders + ((field, direction),))
+
+    def limit(self, count):
+        return self._with(limit=count)
+
+    def select(self, fields):
+        return self._with(fields=set(fields))
+
+    def start_after(self, snapshot):
+        return self._with(after=snapshot)
+
+    def _matches(self, data):
+        return all(
+            field in data and OPERATORS[op](_normalize(data.get(field)), _normalize(value))
+            for field, op, value in self._filters
+        )
+
+    def _scan_by_name(self, ids, docs):
+        """Cursor paging over document IDs without re-scanning earlier pages."""
+        start = 0
+        if self._after is not None:
+            start = bisect.bisect_right(ids, self._after.id)
+        rows = []
+        for position in range(start, len(ids)):
+            doc_id = ids[position]
+            data = docs.get(f"{self._path}/{doc_id}")
+            if data is not None and self._matches(data):
+                rows.append((f"{self._path}/{doc_id}", data))
+                if self._limit is not None and len(rows) >= self._limit:
+                    break
+        return rows
+
+    def _rows(self):
+        ids, docs = self._db.collection_ids(self._path)
+        if not self._orders or self._orders == (('__name__', 'ASCENDING'),):
+            return self._scan_by_name(ids, docs)
+
+        rows = [(f"{self._path}/{doc_id}", docs[f"{self._path}/{doc_id}"]) for doc_id in ids]
+        rows = [row for row in rows if self._matches(row[1])]
+        for field, direction in reversed(self._orders):
+            if field == '__name__':
+                key = lambda row: row[0].rsplit('/', 1)[-1]
+            else:
+                # Firestore drops docs missing an order_by field
+                rows = [row for row in rows if field in row[1]]
+                key = lambda row, field=field: _normalize(row[1][field])
+            rows.sort(key=key, reverse=(direction == 'DESCENDING'))
+        if self._after is not None:
+            paths = [path for path, _ in rows]
+            if self._after.reference.path in paths:
+                rows = rows[paths.index(self._after.reference.path) + 1:]
+        if self._limit is not None:
+            rows = rows[:self._limit]
+        return rows
+
+    def stream(self):
+        self._db.round_trip()
+        rows = self._rows()
+        self._db.reads += max(1, len(rows))
+        return iter([
+            FakeSnapshot(FakeDocumentReference(self._db, path), data, self._fields)
+            for path, data in rows
+        ])
+
+    def get(self):
+        return list(self.stream())
+
+class FakeBatch:
+    # Firestore rejects a batch (or transaction) with more writes than this
+    MAX_WRITES = 500
+
+    def __init__(self, db):
+        self._db = db
+        self._ops = []
+        self._creates = []
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(lambda: ref._set(data, merge=merge))
+
+    def update(self, ref, data):
+        self._ops.append(lambda: ref._update(data))
+
+    def create(self, ref, data):
+        self._creates.append(ref)
+        self._ops.append(lambda: ref._set(data))
+
+    def delete(self, ref):
+        self._ops.append(ref._delete)
+
+    def commit(self):
+        self._db.round_trip()
+        if len(self._ops) > self.MAX_WRITES:
+            raise gcp_exceptions.InvalidArgument(f"maximum {self.MAX_WRITES} writes allowed per request")
+        with self._db.lock:
+            # Like Firestore, a create of an existing doc fails the whole batch
+            for ref in self._creates:
+                if self._db.docs.get(ref.path) is not None:
+                    raise gcp_exceptions.Conflict(f"Document already exists: {ref.path}")
+            self._db.commits += 1
+            for op in self._ops:
+                op()
+        self._ops = []
+        self._creates = []
+
+class FakeFirestore:
+    """
+    Documents are stored flat by path. For a local (dict) store, sorted ID
+    lists per collection are kept so cursor paging stays linear even with a
+    million subscribers; a shared (Manager) store is copied once per query.
+    """
+
+    def __init__(self, docs=None, lock=None, latency=0.0):
+        self.docs = docs if docs is not None else {}
+        self.lock = lock if lock is not None else threading.RLock()
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self.commits = 0
+        self._local = isinstance(self.docs, dict)
+        self._children = collections.defaultdict(set)
+        self._sorted = {}
+        for path in list(self.docs.keys()) if self._local else []:
+            self._index(path)
+
+    def round_trip(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _index(self, path):
+        parent, doc_id = path.rsplit('/', 1)
+        if doc_id not in self._children[parent]:
+            self._children[parent].add(doc_id)
+            self._sorted.pop(parent, None)
+
+    def seed(self, path, data):
+        """Stores a document without counting a write (benchmark setup)."""
+        self.docs[path] = data
+        if self._local:
+            self._index(path)
+
+    def put(self, path, data):
+        self.writes += 1
+        self.docs[path] = data
+        if self._local:
+            self._index(path)
+
+    def remove(self, path):
+        self.writes += 1
+        if self.docs.pop(path, None) is not None and self._local:
+            parent, doc_id = path.rsplit('/', 1)
+            self._children[parent].discard(doc_id)
+            self._sorted.pop(parent, None)
+
+    def collection_ids(self, path):
+        """(sorted doc IDs, path -> data mapping) for one collection."""
+        if not self._local:
+            docs = self.docs.copy()
+            prefix = path + '/'
+            ids = sorted(p[len(prefix):] for p in docs if p.startswith(prefix) and '/' not in p[len(prefix):])
+            return ids, docs
+        with self.lock:
+            ids = self._sorted.get(path)
+            if ids is None:
+                ids = self._sorted[path] = sorted(self._children.get(path, ()))
+        return ids, self.docs
+
+    def collection(self, name):
+        return FakeQuery(self, name)
+
+    def get_all(self, refs, field_paths=None):
+        refs = list(refs)
+        self.round_trip()
+        self.reads += len(refs)
+        for ref in refs:
+            yield FakeSnapshot(ref, self.docs.get(ref.path), field_paths)
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def stats(self):
+        return {'reads': self.reads, 'writes': self.writes, 'commits': self.commits}
+
+class FakeYouTubeAPI:
+    """
+    Synthetic YouTube Data API v3 for `channels` channels. Each channel has
+    `backlog` videos to start with and uploads at `uploads_per_day` (a number,
+    or a sequence cycled over channels for a mix of daily and weekly
+    uploaders). `advance(hours)` moves the fake clock forward; publish times
+    are spread evenly at each channel's rate. View counts grow each day. A
+    share of titles are English (`english_ratio`) so the translation path is
+    exercised.
+
+    `get(endpoint, params, etag)` mirrors YouTubeCrawler._get: it returns
+    the JSON dict, or None for a 304 when `etag` still matches.
+    """
+
+    QUOTA_COST = {'channels': 1, 'playlistItems': 1, 'videos': 1}
+
+    def __init__(self, channels=40, backlog=20, uploads_per_day=1, english_ratio=0.3, latency=0.0, start=None):
+        self.channels = channels
+        self.backlog = backlog
+        self.english_ratio = english_ratio
+        self.latency = latency
+        self.start = start if start is not None else time.time()
+        self.days = 0.0
+        self.calls = collections.Counter()
+        self._lock = threading.Lock()
+        rates = uploads_per_day if isinstance(uploads_per_day, (list, tuple)) else [uploads_per_day]
+        self._rates = {self.uploads_id(i): rates[i % len(rates)] for i in range(channels)}
+        self._published = {}
+
+    @property
+    def day(self):
+        return int(self.days)
+
+    @property
+    def now(self):
+        return self.start + self.days * 86400
+
+    @staticmethod
+    def channel_key(index):
+        return hashlib.md5(f"channel{index}".encode()).hexdigest()[:22]
+
+    def handle(self, index):
+        return f"benchchannel{index}"
+
+    def uploads_id(self, index):
+        return "UU" + self.channel_key(index)
+
+    def sources(self, categories):
+        return [
+            {"type": "youtube", "name": f"Channel {i}", "url": f"https://www.youtube.com/@{self.handle(i)}",
+             "category": categories[i % len(categories)]}
+            for i in range(self.channels)
+        ]
+
+    def advance(self, hours):
+        self.days += hours / 24
+
+    def advance_day(self):
+        self.advance(24)
+
+    def upload_count(self, uploads_id):
+        rate = self._rates.get(uploads_id)
+        if rate is None:
+            return 0
+        return self.backlog + int(rate * self.days)
+
+    def _count(self, endpoint):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls[endpoint] += 1
+
+    def quota_units(self):
+        return sum(self.QUOTA_COST.get(endpoint, 0) * n for endpoint, n in self.calls.items())
+
+    def _video_ids(self, uploads_id, limit):
+        total = self.upload_count(uploads_id)
+        rate = self._rates.get(uploads_id) or 1
+        video_ids = []
+        for n in range(total - 1, max(total - 1 - limit, -1), -1):
+            video_id = hashlib.md5(f"{uploads_id}/{n}".encode()).hexdigest()[:11]
+            # Video n is published (n - backlog + 1) / rate days after the start
+            self._published[video_id] = self.start + (n - self.backlog + 1) / rate * 86400
+            video_ids.append(video_id)
+        return video_ids
+
+    def _published_at(self, video_id):
+        timestamp = self._published.get(video_id, self.start)
+        return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+    def _video(self, video_id):
+        seed = int(hashlib.md5(video_id.encode()).hexdigest()[:8], 16)
+        english = (seed % 1000) / 1000 < self.english_ratio
+        title = f"Weekly market outlook #{seed % 997}" if english else f"이번 주 시장 전망 {seed % 997}회"
+        return {
+            'id': video_id,
+            'snippet': {
+                'title': title,
+                'description': "설명 " * 80,
+                'publishedAt': self._published_at(video_id),
+                'thumbnails': {'high': {'url': f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"}},
+            },
+            'statistics': {'viewCount': str(1000 + seed % 100000 + self.day * (seed % 500))},
+        }
+
+    def _channel_index(self, params):
+        """Channel looked up by channels.list `id`, `forHandle` (with or without '@') or `forUsername`; -1 if none."""
+        if 'id' in params:
+            channel_key = params['id'][len('UC'):]
+            return next((i for i in range(self.channels) if self.channel_key(i) == channel_key), -1)
+        name = (params.get('forHandle') or params.get('forUsername') or '').lstrip('@')
+        suffix = name[len('benchchannel'):]
+        return int(suffix) if name.startswith('benchchannel') and suffix.isdigit() else -1
+
+    def get(self, endpoint, params, etag=None):
+        self._count(endpoint)
+        if endpoint == 'channels':
+            index = self._channel_index(params)
+            if not 0 <= index < self.channels:
+                return {'items': []}
+            return {'items': [{
+                'id': 'UC' + self.channel_key(index),
+                'contentDetails': {'relatedPlaylists': {'uploads': self.uploads_id(index)}},
+            }]}
+        if endpoint == 'playlistItems':
+            uploads_id = params['playlistId']
+            current = f'"{uploads_id}-{self.upload_count(uploads_id)}"'
+            if etag == current:
+                return None
+            return {'etag': current, 'items': [
+                {'contentDetails': {'videoId': video_id, 'videoPublishedAt': self._published_at(video_id)}}
+                for video_id in self._video_ids(uploads_id, int(params.get('maxResults', 5)))
+            ]}
+        if endpoint == 'videos':
+            return {'items': [self._video(video_id) for video_id in params['id'].split(',') if video_id]}
+        raise ValueError(f"Unsupported endpoint: {endpoint}")
+
+    def feed_video_ids(self, channel_id):
+        """Stand-in for YouTubeRSSFeed.fetch_video_ids (no quota)."""
+        self._count('rss')
+        return self._video_ids('UU' + channel_id[2:], 15)
+
+class FakeYouTubeServer:
+    """
+    Serves a FakeYouTubeAPI on 127.0.0.1 so the crawler's real HTTP path
+    (timeouts, retries, connection pool) can be exercised. Point a crawler
+    at it with `crawler.BASE_URL = server.url`.
+
+    Faults are dicts: {'hang': seconds} sleeps before answering normally;
+    {'status': code, 'reason': ..., 'headers': {...}} answers with a Google
+    style error body. `queue(*faults)` applies faults to the next requests
+    in order; `always` applies one to every request until reset to None.
+    `delay` is added to every request.
+    """
+
+    def __init__(self, api, delay=0.0):
+        self.api = api
+        self.delay = delay
+        self.always = None
+        self.requests = 0
+        self._queued = collections.deque()
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def queue(self, *faults):
+        with self._lock:
+            self._queued.extend(faults)
+
+    def reset(self):
+        with self._lock:
+            self._queued.clear()
+            self.always = None
+            self.requests = 0
+
+    @staticmethod
+    def error(status, reason=None, retry_after=None):
+        fault = {'status': status, 'reason': reason}
+        if retry_after is not None:
+            fault['headers'] = {'Retry-After': str(retry_after)}
+        return fault
+
+    def _handle(self, handler):
+        with self._lock:
+            self.requests += 1
+            fault = self._queued.popleft() if self._queued else self.always
+        if self.delay:
+            time.sleep(self.delay)
+        try:
+            if fault and 'hang' in fault:
+                time.sleep(fault['hang'])
+            if fault and 'status' in fault:
+                body = {'error': {'code': fault['status'], 'errors': [{'reason': fault.get('reason') or 'backendError'}]}}
+                self._respond(handler, fault['status'], body, fault.get('headers', {}))
+                return
+            url = urllib.parse.urlsplit(handler.path)
+            endpoint = url.path.rsplit('/', 1)[-1]
+            params = dict(urllib.parse.parse_qsl(url.query))
+            data = self.api.get(endpoint, params, handler.headers.get('If-None-Match'))
+            if data is None:
+                self._respond(handler, 304, None)
+            else:
+                self._respond(handler, 200, data)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up (timeout) before the answer was written
+            pass
+
+    @staticmethod
+    def _respond(handler, status, body, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        handler.send_response(status)
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        if body is not None:
+            handler.send_header('Content-Type', 'application/json')
+        handler.send_header('Content-Length', str(len(payload)))
+        handler.end_headers()
+        handler.wfile.write(payload)
+
+class FakeTranslateClient:
+    """translate_v2.Client lookalike: prefixes each text instead of translating it."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.characters = 0
+        self._lock = threading.Lock()
+
+    def translate(self, values, target_language='ko'):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            self.characters += sum(len(v) for v in values)
+        return [{'input': v, 'translatedText': f"[{target_language}] {v}"} for v in values]
+
+class RecordingSMTP:
+    """
+    smtplib.SMTP stand-in that accepts everything. `sent` counts messages
+    across connections; assign a list (or Manager list) to `delivered` to
+    also collect recipient addresses. `latency` is slept per message.
+    """
+
+    sent = 0
+    connections = 0
+    delivered = None
+    latency = 0.0
+    _lock = threading.Lock()
+
+    def __init__(self, host=None, port=None, timeout=None):
+        with RecordingSMTP._lock:
+            RecordingSMTP.connections += 1
+
+    def starttls(self):
+        pass
+
+    def login(self, user, password):
+        pass
+
+    def sendmail(self, from_addr, to_addr, message):
+        if self.latency:
+            time.sleep(self.latency)
+        with RecordingSMTP._lock:
+            RecordingSMTP.sent += 1
+            if RecordingSMTP.delivered is not None:
+                RecordingSMTP.delivered.append(to_addr)
+        return {}
+
+    def quit(self):
+        pass
+
+    def close(self):
+        pass
@@ -0,0 +1,67 @@
+"""
+Reference story selection and synthetic contents shared by the selector tests
+and benchmarks/bench_selector.py.
+"""
+from newsletter.selector import MAJOR_CATEGORIES
+
+def legacy_select(all_contents, rng):
+    """The selection loop as it was in run_newsletter_job, kept as the golden reference."""
+    all_contents = list(all_contents)
+    all_contents.sort(key=lambda x: x.get('view_count') if x.get('view_count') is not None else -1, reverse=True)
+    major_cats = list(MAJOR_CATEGORIES)
+    rng.shuffle(major_cats)
+
+    top_stories = []
+    category_stories = {}
+    seen_ids = set()
+    seen_channels = set()
+
+    potential_highlight_cats = [cat for cat in major_cats if any(d.get('category') == cat for d in all_contents)]
+    for cat in potential_highlight_cats[:4]:
+        for item in [d for d in all_contents if d.get('category') == cat]:
+            channel = item.get('opinion_leader')
+            if channel not in seen_channels:
+                top_stories.append(item)
+                seen_ids.add(f"{item['source_type']}_{item['original_id']}")
+                seen_channels.add(channel)
+                break
+
+    for cat in major_cats:
+        cat_items = [d for d in all_contents if d.get('category') == cat]
+        if not cat_items:
+            continue
+        display_items = []
+        for item in cat_items:
+            item_id = f"{item['source_type']}_{item['original_id']}"
+            channel = item.get('opinion_leader')
+            if item_id not in seen_ids and channel not in seen_channels:
+                display_items.append(item)
+                seen_ids.add(item_id)
+                seen_channels.add(channel)
+                if len(display_items) >= 3:
+                    break
+        if display_items:
+            category_stories[cat] = display_items
+
+    return {'top_stories': top_stories, 'category_stories': category_stories}
+
+def make_contents(size, rng, channels=None):
+    channels = channels or max(8, size // 10)
+    categories = MAJOR_CATEGORIES + ['기타']
+    contents = []
+    for i in range(size):
+        contents.append({
+            'source_type': 'youtube',
+            'original_id': f"v{i}",
+            'opinion_leader': f"channel{rng.randrange(channels)}",
+            'category': rng.choice(categories),
+            # Coarse view counts so ties (and their ordering) get exercised
+            'view_count': None if rng.random() < 0.05 else rng.randrange(50) * 1000,
+        })
+    return contents
+
+def ids(selection):
+    return (
+        [item['original_id'] for item in selection['top_stories']],
+        {cat: [item['original_id'] for item in items] for cat, items in selection['category_stories'].items()},
+    )
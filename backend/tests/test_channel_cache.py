@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+import utils.db
+import run_crawler
+from crawler.sources.youtube import YouTubeCrawler
+from services.translation_service import TranslationService, TranslationCache
+from testing.fakes import FakeFirestore, FakeYouTubeAPI, FakeTranslateClient
+
+CHANNELS = 6
+DAY = 86400
+
+@pytest.fixture
+def youtube(monkeypatch):
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    youtube = FakeYouTubeAPI(channels=CHANNELS, backlog=3, english_ratio=0)
+    monkeypatch.setattr(YouTubeCrawler, '_get', lambda crawler, endpoint, params, etag=None: youtube.get(endpoint, params, etag))
+    return youtube
+
+@pytest.fixture
+def crawl(youtube, monkeypatch):
+    """Runs run_crawlers() over the fake channels; returns the channels.list calls it made."""
+    db = FakeFirestore()
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(run_crawler, '_translation_service', TranslationService(
+        client=FakeTranslateClient(), cache=TranslationCache(':memory:')
+    ))
+    monkeypatch.setattr(run_crawler, 'CRAWLER_INCREMENTAL', True)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_RSS_PREFILTER', False)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_SCHEDULE', False)
+
+    def run():
+        before = youtube.calls['channels']
+        run_crawler.run_crawlers(youtube.sources(['경제']))
+        return youtube.calls['channels'] - before
+
+    run.cache = lambda: db.docs['crawler_state/youtube_channels']['entries']
+    return run
+
+def test_warm_run_resolves_nothing(crawl, youtube):
+    assert crawl() == CHANNELS
+    assert crawl() == 0
+    assert sorted(entry['uploads_id'] for entry in crawl.cache().values()) == sorted(
+        youtube.uploads_id(i) for i in range(CHANNELS)
+    )
+
+def test_expired_entry_is_resolved_once(crawl):
+    crawl()
+    crawl.cache()['forHandle=benchchannel2']['resolved_at'] -= run_crawler.CHANNEL_CACHE_TTL_DAYS * DAY
+    assert crawl() == 1
+    assert crawl.cache()['forHandle=benchchannel2']['resolved_at'] > time.time() - 60
+    assert crawl() == 0
+
+class MemoryStore:
+    def __init__(self, state=None):
+        self.state = state or {}
+
+    def load(self):
+        return dict(self.state)
+
+    def save(self, state):
+        self.state = dict(state)
+
+def test_stale_uploads_id_is_refreshed(youtube):
+    # A cached playlist that no longer lists any videos (channel moved) is resolved again
+    store = MemoryStore({'forHandle=benchchannel1': {'uploads_id': 'UUgone', 'resolved_at': time.time()}})
+    crawler = YouTubeCrawler(channel_store=store)
+    videos = crawler.fetch_latest_videos_bulk(youtube.sources(['경제'])[1:2], limit=3)
+    assert len(videos) == 3
+    assert youtube.calls['channels'] == 1
+    crawler.save_state()
+    assert store.state['forHandle=benchchannel1']['uploads_id'] == youtube.uploads_id(1)
+
+def test_failed_resolve_is_not_cached(youtube, monkeypatch):
+    store = MemoryStore()
+    crawler = YouTubeCrawler(channel_store=store)
+    url = youtube.sources(['경제'])[0]['url']
+
+    def unavailable(crawler, endpoint, params, etag=None):
+        raise RuntimeError("503 Service Unavailable")
+
+    monkeypatch.setattr(YouTubeCrawler, '_get', unavailable)
+    assert crawler._get_uploads_playlist_id(url) is None
+    crawler.save_state()
+    assert store.state == {}
+
+def url_forms(youtube, index):
+    """(lookup key, URL variants) of channel `index` for each URL form _get_uploads_playlist_id supports."""
+    handle, channel_id = youtube.handle(index), 'UC' + youtube.channel_key(index)
+    return {
+        '@handle': (f"forHandle={handle}", [
+            f"https://www.youtube.com/@{handle}", f"https://youtube.com/@{handle}/", f"https://m.youtube.com/@{handle}",
+        ]),
+        '/c/': (f"forHandle={handle}", [
+            f"https://www.youtube.com/c/{handle}", f"https://www.youtube.com/c/{handle}/",
+        ]),
+        '/channel/': (f"id={channel_id}", [
+            f"https://www.youtube.com/channel/{channel_id}", f"https://youtube.com/channel/{channel_id}/",
+        ]),
+        '/user/': (f"forUsername={handle}", [
+            f"https://www.youtube.com/user/{handle}", f"http://www.youtube.com/user/{handle}/",
+        ]),
+    }
+
+@pytest.mark.parametrize('form', ['@handle', '/c/', '/channel/', '/user/'])
+def test_each_url_form_maps_to_one_cache_key(youtube, form):
+    key, urls = url_forms(youtube, 3)[form]
+    store = MemoryStore()
+    crawler = YouTubeCrawler(channel_store=store)
+    assert [crawler._get_uploads_playlist_id(url) for url in urls] == [youtube.uploads_id(3)] * len(urls)
+    assert youtube.calls['channels'] == 1
+    crawler.save_state()
+    assert list(store.state) == [key]
+
+    # The next run resolves every variant from the stored entry
+    warm = YouTubeCrawler(channel_store=store)
+    assert [warm._get_uploads_playlist_id(url) for url in urls] == [youtube.uploads_id(3)] * len(urls)
+    assert youtube.calls['channels'] == 1
+
+def test_c_and_handle_urls_share_an_entry(youtube):
+    forms = url_forms(youtube, 4)
+    crawler = YouTubeCrawler(channel_store=MemoryStore())
+    crawler._get_uploads_playlist_id(forms['@handle'][1][0])
+    assert crawler._get_uploads_playlist_id(forms['/c/'][1][0]) == youtube.uploads_id(4)
+    assert youtube.calls['channels'] == 1
+
+def test_forced_refresh_ignores_the_cache(youtube):
+    url = youtube.sources(['경제'])[5]['url']
+    crawler = YouTubeCrawler(channel_store=MemoryStore())
+    crawler._get_uploads_playlist_id(url)
+    assert crawler._get_uploads_playlist_id(url) == youtube.uploads_id(5)
+    assert youtube.calls['channels'] == 1
+
+    assert crawler._get_uploads_playlist_id(url, force_refresh=True) == youtube.uploads_id(5)
+    assert youtube.calls['channels'] == 2
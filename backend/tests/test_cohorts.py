@@ -0,0 +1,51 @@
+import random
+
+from testing.selection import make_contents
+from newsletter.cohorts import CohortIssues, DEFAULT_SIGNATURE, preference_signature
+from newsletter.selector import StorySelector
+from services.email_service import CompiledIssue
+
+class FakeEmailService:
+    def __init__(self):
+        self.compiled = 0
+
+    def compile_issue(self, selection, mail_id=None):
+        self.compiled += 1
+        return CompiledIssue([','.join(item['original_id'] for item in selection['top_stories'])])
+
+def cohorts_for(max_cohorts):
+    selector = StorySelector()
+    contents = make_contents(400, random.Random(5), channels=40)
+    service = FakeEmailService()
+    cohorts = CohortIssues(service, selector, contents, selector.category_order(seed=5), max_cohorts=max_cohorts)
+    return cohorts, service
+
+def test_preference_signature_is_canonical():
+    assert preference_signature({'categories': ['경제', '정치', '경제'], 'channels': ['b', 'a', '']}) == \
+        (('경제', '정치'), ('a', 'b'))
+    assert preference_signature(None) == DEFAULT_SIGNATURE
+    assert preference_signature({'categories': 'not-a-list'}) == DEFAULT_SIGNATURE
+
+def test_issues_are_built_once_per_cohort():
+    cohorts, service = cohorts_for(max_cohorts=10)
+    signature = (('경제',), ('channel1',))
+    assert cohorts.issue_for(signature) is cohorts.issue_for(signature)
+    assert service.compiled == 1
+    assert list(cohorts.selections) == []
+    cohorts.issue_for(DEFAULT_SIGNATURE)
+    assert list(cohorts.selections) == [DEFAULT_SIGNATURE]
+
+def test_cohorts_past_the_cap_share_a_coarser_issue():
+    cohorts, service = cohorts_for(max_cohorts=3)
+    default = cohorts.issue_for(DEFAULT_SIGNATURE)
+    by_category = cohorts.issue_for((('경제',), ()))
+    cohorts.issue_for((('정치',), ('channel1',)))
+    assert service.compiled == 3
+
+    for i in range(50):
+        assert cohorts.issue_for((('경제',), (f"channel{i}",))) is by_category
+        assert cohorts.issue_for((('사회',), (f"channel{i}",))) is default
+    assert service.compiled == 3
+    assert cohorts.metrics()['cohort_count'] == 3
+    assert cohorts.metrics()['cohort_fallbacks'] == 100
+    assert len(cohorts.render_seconds) == 3
@@ -0,0 +1,74 @@
+import collections
+
+import pytest
+from google.api_core import exceptions as gcp_exceptions
+
+from run_crawler import commit_writes
+from testing.fakes import FakeBatch, FakeFirestore
+
+class CountingFirestore(FakeFirestore):
+    """FakeFirestore counting writes per doc; batches holding a doc in `fail_on` fail to commit."""
+
+    def __init__(self):
+        super().__init__()
+        self.written = collections.Counter()
+        self.fail_on = set()
+
+    def put(self, path, data):
+        self.written[path] += 1
+        super().put(path, data)
+
+    def batch(self):
+        batch = super().batch()
+        paths = []
+        set_doc, commit = batch.set, batch.commit
+
+        def recording_set(ref, data, merge=False):
+            paths.append(ref.path)
+            set_doc(ref, data, merge=merge)
+
+        def checked_commit():
+            if self.fail_on & set(paths):
+                raise gcp_exceptions.ServiceUnavailable("Batch write failed")
+            commit()
+
+        batch.set, batch.commit = recording_set, checked_commit
+        return batch
+
+def writes(db, count):
+    return [('set', db.collection('contents').document(f"doc{i:05d}"), {'n': i}) for i in range(count)]
+
+@pytest.mark.parametrize('workers', [1, 4])
+@pytest.mark.parametrize('batch_size, batches', [(500, 3), (200, 7), (1, 1203)])
+def test_every_doc_is_written_once(workers, batch_size, batches):
+    db = CountingFirestore()
+    assert commit_writes(db, writes(db, 1203), batch_size=batch_size, workers=workers) == batches
+    assert db.commits == batches
+    assert len(db.written) == 1203
+    assert set(db.written.values()) == {1}
+    assert db.docs['contents/doc01202'] == {'n': 1202}
+
+def test_batches_over_the_firestore_limit_are_rejected():
+    # The fake enforces Firestore's limit, so splitting above is checked against it
+    db = CountingFirestore()
+    with pytest.raises(gcp_exceptions.InvalidArgument):
+        commit_writes(db, writes(db, FakeBatch.MAX_WRITES + 1), batch_size=FakeBatch.MAX_WRITES + 1)
+    assert db.written == {}
+
+def test_no_writes_commit_nothing():
+    db = CountingFirestore()
+    assert commit_writes(db, []) == 0
+    assert db.commits == 0
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_failed_batch_does_not_stop_the_others(workers):
+    db = CountingFirestore()
+    # The second of five 200-write batches fails
+    db.fail_on = {'contents/doc00250'}
+    with pytest.raises(gcp_exceptions.ServiceUnavailable):
+        commit_writes(db, writes(db, 1000), batch_size=200, workers=workers)
+
+    assert db.commits == 4
+    # Batches are atomic: nothing of the failed one, everything of the rest, once
+    assert sorted(db.written) == [f"contents/doc{i:05d}" for i in range(1000) if not 200 <= i < 400]
+    assert set(db.written.values()) == {1}
@@ -0,0 +1,130 @@
+import datetime
+
+import pytest
+
+import run_crawler
+import testing.fakes
+from newsletter.content_loader import CONTENT_FIELDS, FALLBACK_WINDOWS_HOURS, load_recent_contents
+from services.translation_service import TranslationService, TranslationCache
+from testing.fakes import FakeFirestore, FakeTranslateClient
+
+START = datetime.datetime(2026, 3, 2, 6, 0)
+LAST_CRAWL = START + datetime.timedelta(days=9)
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Paths of the collections queried (stream()) through FakeFirestore."""
+    paths = []
+    stream = testing.fakes.FakeQuery.stream
+
+    def counting_stream(query):
+        paths.append(query._path)
+        return stream(query)
+
+    monkeypatch.setattr(testing.fakes.FakeQuery, 'stream', counting_stream)
+    return paths
+
+def video(video_id, channel, views):
+    return {
+        'source_type': 'youtube', 'original_id': video_id, 'title': f"Title {video_id}",
+        'opinion_leader': channel, 'category': '경제', 'description': f"About {video_id}",
+        'thumbnail': f"https://i.ytimg.com/{video_id}.jpg", 'published_at': '2026-03-01T00:00:00Z',
+        'url': f"https://www.youtube.com/watch?v={video_id}", 'view_count': views,
+    }
+
+def crawl_history():
+    """Daily crawls over ten days, each a list of items; channels drop videos and one goes quiet."""
+    channels = {'channel-a': ['a1', 'a2', 'a3', 'a4'], 'channel-b': ['b1', 'b2'], 'channel-c': ['c1', 'c2']}
+    crawls = []
+    for day in range(10):
+        crawl = []
+        for channel, ids in channels.items():
+            if channel == 'channel-c' and day > 2:
+                continue
+            crawl += [video(i, channel, 1000 * day) for i in ids[day // 3:]]
+        crawls.append((START + datetime.timedelta(days=day), crawl))
+    return crawls
+
+@pytest.fixture(scope='module')
+def stores():
+    """(manifest-era db, pre-manifest db) holding the same crawl history."""
+    current, legacy = FakeFirestore(), FakeFirestore()
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(run_crawler, '_translation_service', TranslationService(
+            client=FakeTranslateClient(), cache=TranslationCache(':memory:')
+        ))
+        for now, crawl in crawl_history():
+            run_crawler.save_contents(current, crawl, now)
+            # The old crawler bumped scraped_at (and rewrote the doc) on every crawl
+            for item in crawl:
+                legacy.collection('contents').document(f"youtube_{item['original_id']}").set(
+                    {**item, 'scraped_at': now}, merge=True
+                )
+    return current, legacy
+
+def legacy_load(db, now):
+    """The per-window queries run_newsletter_job used to run."""
+    for hours in FALLBACK_WINDOWS_HOURS:
+        since = now - datetime.timedelta(hours=hours)
+        docs = db.collection('contents').where('scraped_at', '>=', since).stream()
+        items = [doc.to_dict() for doc in docs]
+        if items:
+            return hours, items
+    return None, []
+
+def summary(items):
+    return sorted((item['original_id'], item['scraped_at'].replace(tzinfo=None)) for item in items)
+
+# now → expected window: 2h, 30h, 4 days and 40 days after the last crawl
+NOWS = {
+    26: LAST_CRAWL + datetime.timedelta(hours=2),
+    48: LAST_CRAWL + datetime.timedelta(hours=30),
+    168: LAST_CRAWL + datetime.timedelta(days=4),
+    None: LAST_CRAWL + datetime.timedelta(days=40),
+}
+
+@pytest.mark.parametrize('hours', list(NOWS), ids=[f"{h}h" if h else 'none' for h in NOWS])
+@pytest.mark.parametrize('store', ['manifests', 'scraped_at'])
+def test_matches_the_per_window_queries(stores, queries, hours, store):
+    current, legacy = stores
+    db = current if store == 'manifests' else legacy
+    now = NOWS[hours]
+
+    expected_hours, expected = legacy_load(legacy, now)
+    queries.clear()
+    loaded_hours, items = load_recent_contents(db, now=now)
+
+    assert loaded_hours == expected_hours == hours
+    assert summary(items) == summary(expected)
+    # One query for every window: the manifests crawled since the widest one, or (after
+    # finding no manifests at all) a single projected contents query
+    if store == 'manifests':
+        assert queries == ['channel_manifests'] if hours else ['channel_manifests', 'channel_manifests']
+    else:
+        assert queries == ['channel_manifests', 'channel_manifests', 'contents']
+    for item in items:
+        assert set(item) <= set(CONTENT_FIELDS) | {'view_series'}
+
+@pytest.mark.parametrize('store', ['manifests', 'scraped_at'])
+def test_each_window_is_a_prefix_of_the_widest(stores, store):
+    current, legacy = stores
+    db = current if store == 'manifests' else legacy
+    now = LAST_CRAWL + datetime.timedelta(hours=2)
+    _, widest = load_recent_contents(db, windows_hours=[max(FALLBACK_WINDOWS_HOURS)], now=now)
+
+    seen = [item['scraped_at'] for item in widest]
+    assert seen == sorted(seen, reverse=True)
+    for hours in FALLBACK_WINDOWS_HOURS:
+        since = now - datetime.timedelta(hours=hours)
+        window = [item for item in widest if item['scraped_at'].replace(tzinfo=None) >= since]
+        assert window == widest[:len(window)]
+        legacy_window = [doc.to_dict() for doc in legacy.collection('contents').where('scraped_at', '>=', since).stream()]
+        assert summary(window) == summary(legacy_window)
+        _, per_window = load_recent_contents(db, windows_hours=[hours], now=now)
+        assert summary(per_window) == summary(window)
+
+def test_view_series_come_with_the_manifest(stores):
+    current, _ = stores
+    _, items = load_recent_contents(current, now=NOWS[26])
+    a4 = next(item for item in items if item['original_id'] == 'a4')
+    assert a4['view_series']['v'] == [1000 * day for day in range(10)]
@@ -0,0 +1,98 @@
+import pytest
+
+import utils.db
+import run_crawler
+from testing.fakes import FakeFirestore, FakeYouTubeAPI, FakeTranslateClient
+from crawler.sources.youtube import YouTubeCrawler
+from crawler.request_policy import DeadlineExceeded
+from services.translation_service import TranslationService, TranslationCache
+from utils.metrics import metrics
+
+CHANNELS = 10
+
+@pytest.fixture
+def harness(monkeypatch):
+    """Incremental crawls of 10 fake channels (one upload a day each) into a fake Firestore."""
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    db = FakeFirestore()
+    youtube = FakeYouTubeAPI(channels=CHANNELS, backlog=5, english_ratio=0)
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(run_crawler, '_translation_service', TranslationService(
+        client=FakeTranslateClient(), cache=TranslationCache(':memory:')
+    ))
+    monkeypatch.setattr(run_crawler, 'CRAWLER_INCREMENTAL', True)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_RSS_PREFILTER', False)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_SCHEDULE', False)
+
+    faults = {}
+
+    def get(crawler, endpoint, params, etag=None):
+        if endpoint in faults:
+            raise faults[endpoint]
+        return youtube.get(endpoint, params, etag)
+
+    monkeypatch.setattr(YouTubeCrawler, '_get', get)
+
+    class Harness:
+        def crawl(self):
+            run_crawler.run_crawlers(youtube.sources(['정치']))
+
+        def content_count(self):
+            return sum(1 for path in db.docs if path.startswith('contents/'))
+
+    h = Harness()
+    h.db, h.youtube, h.faults = db, youtube, faults
+    return h
+
+@pytest.mark.parametrize('fault', [
+    RuntimeError("500 Server Error"),
+    DeadlineExceeded("crawl deadline reached"),
+])
+def test_failed_details_do_not_advance_watermarks(harness, fault):
+    harness.crawl()
+    assert harness.content_count() == 5 * CHANNELS
+
+    # Day 2: playlistItems answers, videos.list fails
+    harness.youtube.advance_day()
+    harness.faults['videos'] = fault
+    harness.crawl()
+    assert harness.content_count() == 5 * CHANNELS
+
+    # A healthy rerun the same day still picks up the new uploads
+    del harness.faults['videos']
+    harness.crawl()
+    assert harness.content_count() == 6 * CHANNELS
+
+def test_failed_persist_does_not_advance_watermarks(harness, monkeypatch):
+    harness.crawl()
+    watermarks = harness.db.docs['crawler_state/youtube_watermarks']
+
+    harness.youtube.advance_day()
+    save_contents = run_crawler.save_contents
+
+    def failing_save(*args):
+        raise RuntimeError("commit failed")
+
+    monkeypatch.setattr(run_crawler, 'save_contents', failing_save)
+    with pytest.raises(RuntimeError):
+        harness.crawl()
+    assert harness.db.docs['crawler_state/youtube_watermarks'] == watermarks
+
+    monkeypatch.setattr(run_crawler, 'save_contents', save_contents)
+    harness.crawl()
+    assert harness.content_count() == 6 * CHANNELS
+
+def test_unchanged_day_uses_stored_etags(harness):
+    harness.crawl()
+    harness.youtube.calls.clear()
+    harness.crawl()
+    # Every playlist answers 304 and nothing new needs details
+    assert harness.youtube.calls['videos'] == 0
+    assert harness.youtube.calls['playlistItems'] == CHANNELS
+    assert harness.content_count() == 5 * CHANNELS
+
+def test_title_translation_is_timed(harness):
+    metrics.reset()
+    harness.crawl()
+    timing = metrics.histograms[('translate_titles', ())]
+    assert timing.count == 1 and timing.sum > 0
@@ -0,0 +1,94 @@
+import multiprocessing
+
+import pytest
+from Crypto.Cipher import AES
+
+from services import crypto_service
+from services.crypto_service import KEY_BYTES, decrypt_email, decrypt_emails, encrypt_email
+
+IV_HEX = '000102030405060708090a0b0c0d0e0f'
+# Produced by web/lib/crypto.ts (Node createCipheriv('aes-256-cbc')) with the default key and IV_HEX
+NODE_VECTORS = {
+    'reader@example.com':
+        f'{IV_HEX}:ca43ed7e3ba28566a232f39ff61490067e47686ba264ba1cef3a517db5c34f50',
+    '독자.한글@example.co.kr':
+        f'{IV_HEX}:68c231ed2085a68d25247d870969b9ebd78efd70dc838653f12b10fb147d0362',
+    'exactly16bytes!!':
+        f'{IV_HEX}:135605fa1ae132cf2186fdfaf6e1d8cf839bbab44e24baa91ebf3caa4f8c3c39',
+}
+
+def unpadded(plaintext):
+    """A well-formed ciphertext whose last plaintext byte is not valid PKCS#7 padding."""
+    return f"{IV_HEX}:{AES.new(KEY_BYTES, AES.MODE_CBC, iv=bytes.fromhex(IV_HEX)).encrypt(plaintext).hex()}"
+
+@pytest.fixture(autouse=True)
+def _requires_default_key():
+    if KEY_BYTES != b'12345678901234567890123456789012':
+        pytest.skip("vectors are for the default ENCRYPTION_KEY")
+
+def test_round_trip_matches_decrypt_email():
+    emails = [f"subscriber{i}@example.com" for i in range(200)] + ['독자@example.kr', 'x' * 16, 'y' * 33]
+    encrypted = [encrypt_email(e) for e in emails]
+    errors = []
+    assert list(decrypt_emails(encrypted, errors=errors, chunk_size=7)) == emails
+    assert [decrypt_email(e) for e in encrypted] == emails
+    assert errors == []
+
+def test_node_vectors():
+    assert list(decrypt_emails(NODE_VECTORS.values())) == list(NODE_VECTORS)
+    assert [decrypt_email(v) for v in NODE_VECTORS.values()] == list(NODE_VECTORS)
+
+def test_fields_after_the_ciphertext_are_ignored_like_crypto_ts():
+    # crypto.ts rejoins the parts after the IV, but Node's hex decoding stops at the ':'
+    value = NODE_VECTORS['reader@example.com'] + ':ffff'
+    assert list(decrypt_emails([value])) == ['reader@example.com']
+    assert decrypt_email(value) == 'reader@example.com'
+
+def test_values_without_separator_pass_through():
+    assert list(decrypt_emails(['plain@example.com', '', None])) == ['plain@example.com', '', None]
+
+@pytest.mark.parametrize('value', [
+    pytest.param(unpadded(b'reader@example\x00\x00'), id='bad-padding'),
+    pytest.param(f"{IV_HEX[:16]}:{NODE_VECTORS['reader@example.com'].split(':')[1]}", id='short-iv'),
+    pytest.param(NODE_VECTORS['reader@example.com'][:-2], id='ciphertext-not-block-multiple'),
+    pytest.param(f"{IV_HEX}:", id='empty-ciphertext'),
+    pytest.param(f"{IV_HEX}:zz", id='not-hex'),
+])
+def test_invalid_values_yield_none_and_are_recorded(value):
+    good = encrypt_email('reader@example.com')
+    errors = []
+    assert list(decrypt_emails([good, value, good], errors=errors)) == ['reader@example.com', None, 'reader@example.com']
+    assert [index for index, _ in errors] == [1]
+    assert errors[0][1]
+    # decrypt_email fails on the same values (and falls back to the input)
+    assert decrypt_email(value) == value
+
+@pytest.fixture
+def pools(monkeypatch):
+    """Counts the process pools decrypt_emails starts, on a machine that reports 2 CPUs."""
+    created = []
+    real_pool = multiprocessing.Pool
+
+    def pool(processes):
+        created.append(processes)
+        return real_pool(processes)
+
+    monkeypatch.setattr(crypto_service.os, 'cpu_count', lambda: 2)
+    monkeypatch.setattr(crypto_service.multiprocessing, 'Pool', pool)
+    return created
+
+def test_switches_to_process_pool_at_threshold(pools):
+    emails = [f"subscriber{i}@example.com" for i in range(40)]
+    encrypted = [encrypt_email(e) for e in emails]
+    encrypted[25] = unpadded(b'\x00' * 16)
+
+    errors = []
+    results = list(decrypt_emails(iter(encrypted), errors=errors, chunk_size=6, parallel_threshold=40))
+    assert pools == [2]
+    assert results == emails[:25] + [None] + emails[26:]
+    assert [index for index, _ in errors] == [25]
+
+def test_stays_in_process_below_threshold(pools):
+    encrypted = [encrypt_email(f"subscriber{i}@example.com") for i in range(39)]
+    assert len(list(decrypt_emails(iter(encrypted), chunk_size=6, parallel_threshold=40))) == 39
+    assert pools == []
@@ -0,0 +1,235 @@
+import datetime
+import smtplib
+
+import pytest
+
+import utils.db
+import run_newsletter
+from newsletter.delivery_journal import DeliveryJournal
+from services.crypto_service import encrypt_email
+from services.email_service import EmailService, make_sid
+from services.smtp_delivery import DeliveryAborted
+from testing.fakes import FakeFirestore, RecordingSMTP
+from utils import metrics as metrics_module
+
+SUBSCRIBERS = 40
+ADDRESSES = [f"reader{i}@example.com" for i in range(SUBSCRIBERS)]
+
+class CommitCountingFirestore(FakeFirestore):
+    """FakeFirestore whose batch commits can be made to fail."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail_commits = False
+
+    def batch(self):
+        batch = super().batch()
+        commit = batch.commit
+
+        def checked_commit():
+            if self.fail_commits:
+                raise RuntimeError("503 Service Unavailable")
+            commit()
+
+        batch.commit = checked_commit
+        return batch
+
+def deliveries(db, mail_id='mail-1'):
+    prefix = f"mail_history/{mail_id}/deliveries/"
+    return {path[len(prefix):]: doc['status'] for path, doc in db.docs.items() if path.startswith(prefix)}
+
+# ── DeliveryJournal ──
+
+def test_results_are_written_in_checkpoints():
+    db = CommitCountingFirestore()
+    journal = DeliveryJournal(db, 'mail-1', checkpoint_size=4, checkpoint_seconds=3600)
+    for address in ADDRESSES[:10]:
+        journal.record(address)
+    # Two full checkpoints; the last two results wait for the next one
+    assert db.commits == 2
+    assert len(deliveries(db)) == 8
+
+    journal.flush()
+    assert db.commits == 3
+    assert deliveries(db) == {make_sid(address): 'sent' for address in ADDRESSES[:10]}
+
+def test_failed_checkpoint_is_retried_by_the_next_one():
+    db = CommitCountingFirestore()
+    journal = DeliveryJournal(db, 'mail-1', checkpoint_size=3, checkpoint_seconds=3600)
+    db.fail_commits = True
+    for address in ADDRESSES[:3]:
+        journal.record(address)
+    assert deliveries(db) == {}
+
+    # The buffer is kept, so the next result is written together with it
+    db.fail_commits = False
+    journal.record(ADDRESSES[3])
+    assert deliveries(db) == {make_sid(address): 'sent' for address in ADDRESSES[:4]}
+
+def test_resume_skips_sent_recipients_and_retries_failed_ones():
+    db = FakeFirestore()
+    first = DeliveryJournal(db, 'mail-1')
+    first.record(ADDRESSES[0])
+    first.record(ADDRESSES[1], error=smtplib.SMTPDataError(451, b"try again"))
+    first.flush()
+    # Entries are keyed by SID; no plaintext address is stored
+    assert deliveries(db) == {make_sid(ADDRESSES[0]): 'sent', make_sid(ADDRESSES[1]): 'failed'}
+    assert not any(ADDRESSES[0] in str(doc) for doc in db.docs.values())
+
+    resumed = DeliveryJournal(db, 'mail-1')
+    resumed.load()
+    assert [a for a in ADDRESSES[:3] if resumed.should_send(a)] == ADDRESSES[1:3]
+    assert resumed.counts() == (1, 1)
+    # A retried recipient replaces its failed result instead of adding to it
+    resumed.record(ADDRESSES[1])
+    resumed.record(ADDRESSES[2])
+    assert resumed.counts() == (3, 0)
+
+def test_shards_load_only_their_own_recipients():
+    db = FakeFirestore()
+    for shard, addresses in [(0, ADDRESSES[:3]), (1, ADDRESSES[3:5])]:
+        journal = DeliveryJournal(db, 'mail-1', shard=shard)
+        for address in addresses:
+            journal.record(address)
+        journal.flush()
+
+    resumed = DeliveryJournal(db, 'mail-1', shard=1)
+    assert set(resumed.load()) == {make_sid(address) for address in ADDRESSES[3:5]}
+    assert resumed.counts() == (2, 0)
+
+@pytest.mark.parametrize('sent, failed, status', [
+    (5, 0, 'success'),
+    (3, 2, 'partial'),
+    (3, 0, 'partial'),
+    (0, 5, 'error'),
+])
+def test_finalize_status(sent, failed, status):
+    db = FakeFirestore()
+    db.collection('mail_history').document('mail-1').set({'status': 'sending'})
+    journal = DeliveryJournal(db, 'mail-1')
+    for address in ADDRESSES[:sent]:
+        journal.record(address)
+    for address in ADDRESSES[sent:sent + failed]:
+        journal.record(address, error="550 No such user")
+
+    assert journal.finalize(5) == status
+    history = db.docs['mail_history/mail-1']
+    assert (history['status'], history['success_count'], history['fail_count'], history['recipient_count']) == (
+        status, sent, failed, 5
+    )
+
+# ── run_newsletter_job: abort and resume ──
+
+class FlakySMTP(RecordingSMTP):
+    """
+    RecordingSMTP that accepts `accept` messages (None: all of them), then
+    fails every DATA command. Addresses in `refuse` are rejected outright.
+    """
+
+    accept = None
+    refuse = ()
+
+    def sendmail(self, from_addr, to_addr, message):
+        if to_addr in FlakySMTP.refuse:
+            raise smtplib.SMTPRecipientsRefused({to_addr: (550, b"No such user")})
+        with RecordingSMTP._lock:
+            if FlakySMTP.accept is not None:
+                if FlakySMTP.accept <= 0:
+                    raise smtplib.SMTPDataError(451, b"Temporary server failure")
+                FlakySMTP.accept -= 1
+        return super().sendmail(from_addr, to_addr, message)
+
+@pytest.fixture
+def newsletter(monkeypatch, tmp_path):
+    """A fake Firestore seeded with stories and SUBSCRIBERS production subscribers, sending through FlakySMTP."""
+    db = FakeFirestore()
+    now = datetime.datetime.now()
+    for i in range(30):
+        db.collection('contents').document(f"youtube_v{i}").set({
+            'source_type': 'youtube', 'original_id': f"v{i}", 'title': f"제목 {i}",
+            'url': f"https://www.youtube.com/watch?v=v{i}", 'view_count': 1000 * i,
+            'opinion_leader': f"channel{i % 6}", 'category': ['정치', '경제', 'IT'][i % 3],
+            'scraped_at': now - datetime.timedelta(hours=i % 20),
+        })
+    for i, address in enumerate(ADDRESSES):
+        db.collection('subscribers').document(f"sub{i:06d}").set(
+            {'email': encrypt_email(address), 'status': 'active', 'is_test': False}
+        )
+
+    for name in ['CLOUD_RUN_TASK_COUNT', 'CLOUD_RUN_TASK_INDEX', 'NEWSLETTER_RUN_ID', 'CLOUD_RUN_EXECUTION']:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('NEWSLETTER_PERSONALIZE', '0')
+    monkeypatch.setenv('NEWSLETTER_SEED', 'journal-test')
+    monkeypatch.setenv('JOURNAL_CHECKPOINT_SIZE', '5')
+    monkeypatch.setenv('JOURNAL_CHECKPOINT_SECONDS', '3600')
+    monkeypatch.setenv('EMAIL_USER', 'sender@example.com')
+    monkeypatch.setenv('EMAIL_PASSWORD', 'app-password')
+    monkeypatch.setenv('EMAIL_STARTTLS', '0')
+    monkeypatch.setenv('EMAIL_RATE_PER_SECOND', '0')
+    monkeypatch.setenv('EMAIL_WORKERS', '1')
+    monkeypatch.setenv('EMAIL_RETRIES', '0')
+    monkeypatch.setenv('EMAIL_MAX_CONSECUTIVE_FAILURES', '3')
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(metrics_module, 'METRICS_DIR', str(tmp_path / 'metrics'))
+
+    create_engine = EmailService.create_delivery_engine
+
+    def create_flaky_engine(self):
+        engine = create_engine(self)
+        engine.smtp_factory = FlakySMTP
+        return engine
+
+    monkeypatch.setattr(EmailService, 'create_delivery_engine', create_flaky_engine)
+    monkeypatch.setattr(RecordingSMTP, 'delivered', [])
+    monkeypatch.setattr(FlakySMTP, 'accept', None)
+    monkeypatch.setattr(FlakySMTP, 'refuse', ())
+    return db
+
+def mail_history(db):
+    (mail_id,) = [path.split('/')[1] for path in db.docs if path.count('/') == 1 and path.startswith('mail_history/')]
+    return mail_id, db.docs[f"mail_history/{mail_id}"]
+
+def test_aborted_send_resumes_without_duplicates(newsletter, monkeypatch):
+    db = newsletter
+    monkeypatch.setattr(FlakySMTP, 'accept', 12)
+    with pytest.raises(DeliveryAborted):
+        run_newsletter.run_newsletter_job(is_production=True)
+
+    mail_id, history = mail_history(db)
+    assert history['status'] == 'error'
+    assert 'consecutive delivery failures' in history['error']
+    # Everything sent before the abort was journaled, not just the full checkpoints
+    first_run = list(RecordingSMTP.delivered)
+    assert len(first_run) == 12
+    journaled = deliveries(db, mail_id)
+    assert {sid for sid, status in journaled.items() if status == 'sent'} == {make_sid(a) for a in first_run}
+    assert list(journaled.values()).count('failed') == 3
+
+    monkeypatch.setattr(FlakySMTP, 'accept', None)
+    run_newsletter.run_newsletter_job(is_production=True, resume_mail_id=mail_id)
+
+    assert sorted(RecordingSMTP.delivered) == sorted(ADDRESSES)
+    _, history = mail_history(db)
+    assert (history['status'], history['recipient_count'], history['success_count'], history['fail_count']) == (
+        'success', SUBSCRIBERS, SUBSCRIBERS, 0
+    )
+    assert deliveries(db, mail_id) == {make_sid(address): 'sent' for address in ADDRESSES}
+
+def test_partial_send_is_completed_by_a_resume(newsletter, monkeypatch):
+    db = newsletter
+    refused = ADDRESSES[5:7]
+    monkeypatch.setattr(FlakySMTP, 'refuse', tuple(refused))
+    run_newsletter.run_newsletter_job(is_production=True)
+
+    mail_id, history = mail_history(db)
+    assert (history['status'], history['success_count'], history['fail_count']) == (
+        'partial', SUBSCRIBERS - 2, 2
+    )
+
+    # Once the addresses are accepted again, only they are sent
+    monkeypatch.setattr(FlakySMTP, 'refuse', ())
+    RecordingSMTP.delivered.clear()
+    run_newsletter.run_newsletter_job(is_production=True, resume_mail_id=mail_id)
+    assert sorted(RecordingSMTP.delivered) == sorted(refused)
+    _, history = mail_history(db)
+    assert (history['status'], history['success_count'], history['fail_count']) == ('success', SUBSCRIBERS, 0)
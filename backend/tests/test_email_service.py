@@ -0,0 +1,52 @@
+import datetime
+import types
+
+import pytest
+
+from services import email_service
+from services.email_service import EmailService, make_sid
+
+class FrozenDatetime(datetime.datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2026, 10, 18, 6, 30, tzinfo=tz)
+
+def story(n, category, view_count):
+    return {
+        'title': f"기자회견 <속보> & 분석 {n}",
+        'url': f"https://www.youtube.com/watch?v=video{n}&t=30s",
+        'thumbnail': f"https://i.ytimg.com/vi/video{n}/hqdefault.jpg",
+        'opinion_leader': f"채널 {n}",
+        'category': category,
+        'view_count': view_count,
+    }
+
+CONTENTS = {
+    'top_stories': [story(1, '정치', 120345), story(2, '경제', None)],
+    'category_stories': {
+        '정치': [story(3, '정치', 987), story(4, '정치', 0)],
+        '경제': [story(5, '경제', 5000000)],
+    },
+}
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setattr(email_service, 'JINJA_CACHE_DIR', str(tmp_path))
+    # Both renders must see the same issue date
+    monkeypatch.setattr(email_service, 'datetime', types.SimpleNamespace(datetime=FrozenDatetime))
+    return EmailService()
+
+@pytest.mark.parametrize('sid', [make_sid('Reader@Example.com'), None, ''], ids=['md5', 'none', 'empty'])
+@pytest.mark.parametrize('mail_id', ['run-20261018', None])
+def test_compiled_issue_matches_full_render(service, sid, mail_id):
+    issue = service.compile_issue(CONTENTS, mail_id=mail_id)
+    expected = service.render_template(CONTENTS, mail_id=mail_id, sid=sid)
+    assert issue.render(sid).encode('utf-8') == expected.encode('utf-8')
+
+def test_compiled_issue_splices_every_recipient(service):
+    issue = service.compile_issue(CONTENTS, mail_id='run-20261018')
+    for address in ['a@example.com', 'b@example.com']:
+        sid = make_sid(address)
+        html = issue.render(sid)
+        assert f"sid={sid}" in html
+        assert html == service.render_template(CONTENTS, mail_id='run-20261018', sid=sid)
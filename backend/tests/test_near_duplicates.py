@@ -0,0 +1,65 @@
+import itertools
+import json
+from pathlib import Path
+
+import pytest
+
+from newsletter.near_duplicates import cluster_near_duplicates
+from newsletter.selector import MAJOR_CATEGORIES, StorySelector
+from utils.fingerprint import NearDuplicateIndex, fingerprint
+
+FIXTURE = Path(__file__).parent / 'fixtures' / 'korean_headlines.json'
+MIN_PRECISION = 0.95
+MIN_RECALL = 0.7
+
+@pytest.fixture(scope='module')
+def headlines():
+    """Korean headlines labelled by story: several rewrites per story, plus singles sharing their keywords."""
+    return json.loads(FIXTURE.read_text(encoding='utf-8'))['headlines']
+
+def pairwise_scores(headlines, clusters):
+    tp = fp = fn = 0
+    merged, missed = [], []
+    for i, j in itertools.combinations(range(len(headlines)), 2):
+        same_story = headlines[i]['story'] == headlines[j]['story']
+        same_cluster = clusters[i] == clusters[j]
+        if same_story and same_cluster:
+            tp += 1
+        elif same_cluster:
+            fp += 1
+            merged.append((headlines[i]['title'], headlines[j]['title']))
+        elif same_story:
+            fn += 1
+            missed.append((headlines[i]['title'], headlines[j]['title']))
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / (tp + fn) if tp + fn else 1.0
+    return precision, recall, merged, missed
+
+def test_clusters_match_labelled_stories(headlines):
+    index = NearDuplicateIndex()
+    for headline in headlines:
+        index.add(fingerprint(headline['title']))
+    precision, recall, merged, missed = pairwise_scores(headlines, index.clusters())
+    assert precision >= MIN_PRECISION, f"precision {precision:.2f}, merged: {merged}"
+    assert recall >= MIN_RECALL, f"recall {recall:.2f}, missed: {missed}"
+
+def test_selector_picks_one_headline_per_cluster(headlines):
+    # Every headline in one category from its own channel: only the clusters keep rewrites apart
+    items = [
+        {'source_type': 'youtube', 'original_id': str(i), 'opinion_leader': f"channel-{i}",
+         'category': MAJOR_CATEGORIES[0], 'view_count': 1000 - i, 'title': h['title'], 'story': h['story']}
+        for i, h in enumerate(headlines)
+    ]
+    assert cluster_near_duplicates(items) > 0
+    selector = StorySelector(categories=MAJOR_CATEGORIES[:1], highlights=1, per_category=len(items))
+    picked = selector.select(items, seed=0)
+    chosen = picked['top_stories'] + [item for items in picked['category_stories'].values() for item in items]
+    clusters = [item['story_cluster'] for item in chosen]
+    assert len(clusters) == len(set(clusters))
+    assert all('fingerprint' not in item for item in items)
+
+def test_short_titles_are_never_grouped():
+    assert fingerprint('제목 1') is None
+    items = [{'title': '제목 1'}, {'title': '제목 2'}, {'title': '제목 3'}]
+    assert cluster_near_duplicates(items) == 0
+    assert [item['story_cluster'] for item in items] == [0, 1, 2]
@@ -0,0 +1,157 @@
+"""
+The crawler's request policy (crawler/request_policy.py) end to end:
+YouTubeCrawler.fetch_latest_videos_bulk() against FakeYouTubeServer, a real
+HTTP server on 127.0.0.1 that injects latency, hangs and error responses.
+Breaker edge cases are driven directly with a fake clock.
+"""
+import time
+
+import pytest
+import requests
+
+from testing.fakes import FakeYouTubeAPI, FakeYouTubeServer
+from crawler.request_policy import CircuitOpen, RequestPolicy
+from crawler.sources.youtube import YouTubeCrawler
+from utils.metrics import metrics
+
+CHANNELS = 12
+LIMIT = 3
+FULL = CHANNELS * LIMIT
+
+@pytest.fixture(scope='module')
+def api():
+    return FakeYouTubeAPI(channels=CHANNELS, backlog=10)
+
+@pytest.fixture
+def server(api, monkeypatch):
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    server = FakeYouTubeServer(api).start()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def sources(api):
+    return api.sources(['정치', '경제', '사회', 'IT'])
+
+def make_crawler(server, workers=4, **policy):
+    crawler = YouTubeCrawler(pool_size=workers, request_policy=RequestPolicy(**policy))
+    crawler.BASE_URL = server.url
+    return crawler
+
+def crawl(server, sources, workers=4, **policy):
+    """Runs one bulk crawl with a fresh crawler; returns (videos, crawler, seconds, requests)."""
+    server.requests = 0
+    metrics.reset()
+    crawler = make_crawler(server, workers, **{'base_delay': 0.05, **policy})
+    start = time.perf_counter()
+    try:
+        videos = crawler.fetch_latest_videos_bulk(sources, limit=LIMIT, workers=workers)
+    finally:
+        crawler.close()
+    return videos, crawler, time.perf_counter() - start, server.requests
+
+def test_healthy_api_needs_no_retries(server, sources):
+    videos, crawler, _, _ = crawl(server, sources)
+    assert len(videos) == FULL
+    assert metrics.total('youtube_api_retries') == 0
+    assert not crawler.skipped_urls
+
+def test_transient_5xx_is_retried(server, sources):
+    server.queue(*[FakeYouTubeServer.error(503)] * 5)
+    videos, _, _, _ = crawl(server, sources)
+    assert len(videos) == FULL
+    assert metrics.total('youtube_api_retries') >= 5
+
+def test_429_honours_retry_after(server, sources):
+    server.queue(FakeYouTubeServer.error(429, retry_after=1))
+    videos, _, elapsed, _ = crawl(server, sources, workers=1)
+    assert len(videos) == FULL
+    assert elapsed >= 1.0
+
+def test_rate_limit_403_is_retried(server, sources):
+    server.queue(*[FakeYouTubeServer.error(403, 'rateLimitExceeded')] * 2)
+    videos, _, _, _ = crawl(server, sources)
+    assert len(videos) == FULL
+    assert metrics.total('youtube_api_retries') >= 2
+
+def test_quota_403_skips_the_remaining_channels(server, sources):
+    server.always = FakeYouTubeServer.error(403, 'quotaExceeded')
+    videos, crawler, _, requests = crawl(server, sources, workers=1)
+    assert requests == 1
+    assert videos == []
+    assert len(crawler.skipped_urls) == CHANNELS
+
+def test_breaker_opens_when_the_api_hangs(server, sources):
+    server.always = {'hang': 3}
+    _, crawler, elapsed, _ = crawl(server, sources, call_timeout=0.2, max_attempts=3,
+                                   breaker_threshold=4, breaker_cooldown=60)
+    assert metrics.total('youtube_api_circuit_opened') == 1
+    assert elapsed < 3
+    assert len(crawler.skipped_urls) >= CHANNELS - 4
+
+def test_breaker_closes_after_the_cooldown(server, sources):
+    metrics.reset()
+    crawler = make_crawler(server, workers=1, call_timeout=0.2, max_attempts=1,
+                           breaker_threshold=2, breaker_cooldown=0.5)
+    try:
+        server.always = {'hang': 3}
+        crawler.fetch_latest_videos_bulk(sources[:4], limit=LIMIT)
+        assert metrics.total('youtube_api_circuit_opened') == 1
+        server.reset()
+        time.sleep(0.6)
+        crawler.skipped_urls.clear()
+        videos = crawler.fetch_latest_videos_bulk(sources[4:], limit=LIMIT)
+    finally:
+        crawler.close()
+    assert len(videos) == (CHANNELS - 4) * LIMIT
+    assert not crawler.skipped_urls
+
+def test_deadline_stops_a_slow_crawl(server, sources):
+    server.delay = 0.15
+    videos, crawler, elapsed, _ = crawl(server, sources, workers=1, deadline=3, call_timeout=0.5)
+    fetched = {video['opinion_leader'] for video in videos}
+    assert elapsed < 3
+    assert crawler.skipped_urls
+    assert fetched
+    # Channels are either fetched (with details) or reported for the next run
+    assert len(fetched) + len(crawler.skipped_urls) >= CHANNELS - 1
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class FakeResponse:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+def test_probe_that_raises_does_not_keep_the_breaker_open():
+    clock = FakeClock()
+    policy = RequestPolicy(call_timeout=1, min_timeout=0, max_attempts=1, breaker_threshold=2,
+                           breaker_cooldown=10, clock=clock, sleep=lambda _: None)
+
+    def hang(timeout):
+        raise requests.Timeout("read timed out")
+
+    def broken_body(timeout):
+        raise requests.exceptions.ChunkedEncodingError("connection broken: invalid chunk length")
+
+    for _ in range(2):
+        with pytest.raises(requests.Timeout):
+            policy.send(hang)
+    with pytest.raises(CircuitOpen):
+        policy.send(lambda timeout: FakeResponse())
+
+    # Half-open probe fails with a non-network error: it surfaces as is and reopens the breaker
+    clock.now = 11
+    with pytest.raises(requests.exceptions.ChunkedEncodingError):
+        policy.send(broken_body)
+    with pytest.raises(CircuitOpen):
+        policy.send(lambda timeout: FakeResponse())
+
+    # After the next cooldown a new probe goes through and closes it
+    clock.now = 22
+    assert policy.send(lambda timeout: FakeResponse()).status_code == 200
+    assert policy.send(lambda timeout: FakeResponse()).status_code == 200
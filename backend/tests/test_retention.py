@@ -0,0 +1,58 @@
+import datetime
+
+import pytest
+
+import run_retention
+import utils.db
+from testing.fakes import FakeFirestore
+from utils import metrics as metrics_module
+from utils.content_manifest import MANIFEST_COLLECTION, merge_manifest
+
+NOW = datetime.datetime.now(datetime.timezone.utc)
+
+def days_ago(days):
+    return NOW - datetime.timedelta(days=days)
+
+@pytest.fixture
+def db(monkeypatch, tmp_path):
+    db = FakeFirestore()
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(run_retention, 'ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setattr(run_retention, 'ARCHIVE_BUCKET', None)
+    monkeypatch.setattr(metrics_module, 'METRICS_DIR', str(tmp_path / 'metrics'))
+    return db
+
+def add_content(db, doc_id, scraped_days_ago):
+    db.collection('contents').document(doc_id).set({
+        'source_type': 'youtube', 'original_id': doc_id, 'title': doc_id,
+        'opinion_leader': 'channel', 'scraped_at': days_ago(scraped_days_ago),
+    })
+
+def test_items_seen_within_the_retention_window_stay_hot(db):
+    add_content(db, 'seen_45_days_ago', 120)
+    add_content(db, 'seen_95_days_ago', 120)
+    add_content(db, 'seen_today', 120)
+    add_content(db, 'new', 10)
+
+    # Daily crawls: one item drops out of the channel 95 days ago, one 45 days ago
+    manifest = None
+    for day in range(120, -1, -1):
+        seen = ['seen_today']
+        if day >= 95:
+            seen.append('seen_95_days_ago')
+        if day >= 45:
+            seen.append('seen_45_days_ago')
+        manifest = merge_manifest(manifest, 'youtube', 'channel', '정치', seen, days_ago(day),
+                                  views={doc_id: 100 for doc_id in seen})
+    db.collection(MANIFEST_COLLECTION).document('youtube_channel').set(manifest)
+    # View series are only kept for the reader window
+    assert set(manifest['series']) == {'seen_today'}
+
+    assert run_retention.run_retention(retention_days=90) == 1
+    remaining = {path.split('/', 1)[1] for path in db.docs if path.startswith('contents/')}
+    assert remaining == {'seen_45_days_ago', 'seen_today', 'new'}
+    assert run_retention.lookup('seen_95_days_ago')
+
+def test_retention_longer_than_manifests_is_refused(db):
+    with pytest.raises(ValueError):
+        run_retention.run_retention(retention_days=120)
@@ -0,0 +1,127 @@
+import datetime
+
+import pytest
+
+import run_crawler
+from testing.fakes import FakeFirestore, FakeTranslateClient
+from services.translation_service import TranslationService, TranslationCache
+from utils.content_manifest import MANIFEST_COLLECTION, MANIFEST_RETENTION_DAYS, manifest_id, recent_entries
+
+START = datetime.datetime(2026, 3, 2, 6, 0)
+
+class RecordingFirestore(FakeFirestore):
+    """FakeFirestore that remembers which documents were written."""
+
+    def __init__(self):
+        super().__init__()
+        self.written = []
+
+    def put(self, path, data):
+        self.written.append(path)
+        super().put(path, data)
+
+    def content_writes(self):
+        return sorted(path.split('/', 1)[1] for path in self.written if path.startswith('contents/'))
+
+@pytest.fixture(autouse=True)
+def translation(monkeypatch):
+    monkeypatch.setattr(run_crawler, '_translation_service', TranslationService(
+        client=FakeTranslateClient(), cache=TranslationCache(':memory:')
+    ))
+
+def video(video_id, channel='channel-a', views=1000, **fields):
+    return {
+        'source_type': 'youtube', 'original_id': video_id, 'title': f"Title {video_id}",
+        'opinion_leader': channel, 'category': '경제', 'description': f"About {video_id}",
+        'thumbnail': f"https://i.ytimg.com/{video_id}.jpg", 'published_at': '2026-03-01T00:00:00Z',
+        'url': f"https://www.youtube.com/watch?v={video_id}", 'view_count': views, **fields,
+    }
+
+def manifest(db, channel='channel-a'):
+    return db.docs[f"{MANIFEST_COLLECTION}/{manifest_id('youtube', channel)}"]
+
+def test_unchanged_items_are_not_rewritten_but_stay_in_the_manifest():
+    db = RecordingFirestore()
+    assert run_crawler.save_contents(db, [video('a'), video('b'), video('c'), video('d')], START) == 4
+    stored = dict(db.docs)
+
+    db.written.clear()
+    later = START + datetime.timedelta(hours=24)
+    crawl = [
+        video('a'),                                   # unchanged
+        video('b', views=1040),                       # +4%: below the 5% rule
+        video('c', views=2000),                       # significant view change
+        video('d', description='Edited description'), # digest change
+    ]
+    assert run_crawler.save_contents(db, crawl, later) == 0
+
+    assert db.content_writes() == ['youtube_c', 'youtube_d']
+    for doc_id in ['youtube_a', 'youtube_b']:
+        assert db.docs[f"contents/{doc_id}"] == stored[f"contents/{doc_id}"]
+    # scraped_at stays "first seen", the manifest records the last sighting
+    assert db.docs['contents/youtube_c']['scraped_at'] == START
+    assert manifest(db)['items'] == {doc_id: later for doc_id in ['youtube_a', 'youtube_b', 'youtube_c', 'youtube_d']}
+    assert manifest(db)['crawled_at'] == later
+
+def test_docs_without_digest_are_not_rewritten():
+    db = RecordingFirestore()
+    run_crawler.save_contents(db, [video('a')], START)
+    legacy = dict(db.docs['contents/youtube_a'])
+    del legacy['content_digest']
+    db.docs['contents/youtube_a'] = legacy
+
+    db.written.clear()
+    run_crawler.save_contents(db, [video('a')], START + datetime.timedelta(days=1))
+    assert db.content_writes() == []
+
+def test_manifest_entries_past_the_retention_are_pruned():
+    db = RecordingFirestore()
+    run_crawler.save_contents(db, [video('old'), video('kept'), video('current')], START)
+    run_crawler.save_contents(db, [video('kept'), video('current')], START + datetime.timedelta(days=10))
+
+    now = START + datetime.timedelta(days=MANIFEST_RETENTION_DAYS + 5)
+    run_crawler.save_contents(db, [video('current')], now)
+    # 'old' was last seen RETENTION + 5 days ago, 'kept' RETENTION - 5 days ago
+    assert manifest(db)['items'] == {
+        'youtube_kept': START + datetime.timedelta(days=10),
+        'youtube_current': now,
+    }
+    # Pruning only touches the manifest; the content doc is run_retention's business
+    assert 'contents/youtube_old' in db.docs
+
+def test_recent_entries_without_manifests_is_none():
+    db = FakeFirestore()
+    db.collection('contents').document('youtube_a').set({**video('a'), 'scraped_at': START})
+    assert recent_entries(db, START - datetime.timedelta(days=1)) is None
+
+    run_crawler.save_contents(db, [video('a')], START)
+    assert recent_entries(db, START + datetime.timedelta(days=1)) == []
+
+def test_recent_entries_match_the_scraped_at_query():
+    """Manifests answer "seen since" like the old per-crawl scraped_at bumps did."""
+    db = RecordingFirestore()
+    legacy = FakeFirestore()
+    channels = {'channel-a': ['a1', 'a2', 'a3'], 'channel-b': ['b1', 'b2'], 'channel-c': ['c1']}
+    # Ten daily crawls; every channel drops its oldest video at some point, channel-c stops being crawled
+    for day in range(10):
+        now = START + datetime.timedelta(days=day)
+        crawl = []
+        for channel, ids in channels.items():
+            if channel == 'channel-c' and day > 3:
+                continue
+            crawl += [video(i, channel=channel, views=1000 + day) for i in ids[day // 4:]]
+        run_crawler.save_contents(db, crawl, now)
+        for item in crawl:
+            legacy.collection('contents').document(f"youtube_{item['original_id']}").set(
+                {**item, 'scraped_at': now}, merge=True
+            )
+
+    for days in [1, 2, 3, 5, 7, 11]:
+        since = START + datetime.timedelta(days=10 - days)
+        expected = {
+            (snapshot.id, snapshot.get('scraped_at'))
+            for snapshot in legacy.collection('contents').where('scraped_at', '>=', since).stream()
+        }
+        entries = recent_entries(db, since)
+        assert {(doc_id, seen_at.replace(tzinfo=None)) for seen_at, doc_id, _ in entries} == expected
+        assert [seen_at for seen_at, _, _ in entries] == sorted((seen_at for seen_at, _, _ in entries), reverse=True)
@@ -0,0 +1,218 @@
+import datetime
+import hashlib
+
+import pytest
+
+import utils.db
+import run_crawler
+from crawler.scheduler import CrawlScheduler
+from crawler.sources.youtube import YouTubeCrawler
+from services.translation_service import TranslationService, TranslationCache
+from testing.fakes import FakeFirestore, FakeYouTubeAPI, FakeTranslateClient
+from utils import metrics as metrics_module
+
+NOW = datetime.datetime(2026, 3, 16, 12, tzinfo=datetime.timezone.utc).timestamp()
+HOUR = 3600
+DAY = 86400
+
+class MemoryStore:
+    def __init__(self, state=None):
+        self.state = state or {}
+
+    def load(self):
+        return dict(self.state)
+
+    def save(self, state):
+        self.state = state
+
+def uploads(per_day, days=14, now=NOW):
+    """Publish times (newest first) of a channel uploading `per_day` videos a day for `days` days."""
+    count = int(per_day * days)
+    return [
+        datetime.datetime.fromtimestamp(now - (i + 0.5) * DAY / per_day, datetime.timezone.utc).isoformat()
+        for i in range(count)
+    ]
+
+def source(name):
+    return {'name': name, 'url': f"https://www.youtube.com/@{name}", 'category': '경제'}
+
+def polled(scheduler, sources, hours_ago):
+    scheduler.now -= hours_ago * HOUR
+    scheduler.mark_polled(sources)
+    scheduler.now += hours_ago * HOUR
+
+def test_interval_follows_the_observed_upload_rate():
+    scheduler = CrawlScheduler(runs_per_day=4, max_interval_hours=168, now=NOW)
+    daily = scheduler.upload_rate(uploads(1))
+    assert daily == pytest.approx(1, rel=0.1)
+    assert scheduler.interval_for(daily) == pytest.approx(DAY, rel=0.1)
+    # Busy channels are polled every run, quiet ones at most every max_interval_hours
+    assert scheduler.interval_for(scheduler.upload_rate(uploads(12))) == DAY / 4
+    assert scheduler.interval_for(scheduler.upload_rate(uploads(1 / 7, days=56))) == pytest.approx(7 * DAY, rel=0.15)
+    assert scheduler.interval_for(scheduler.upload_rate(uploads(1 / 30, days=90))) == 168 * HOUR
+    # Little history: pulled towards the weekly prior
+    assert scheduler.upload_rate([]) == pytest.approx(1 / 7)
+    # Fetch enough for what was uploaded since the last poll, within [min_limit, max_limit]
+    assert scheduler.limit_for(1, DAY) == 3
+    assert scheduler.limit_for(3, 2 * DAY) == 10
+    assert scheduler.limit_for(50, 2 * DAY) == 25
+
+def test_plan_polls_channels_when_due():
+    daily, weekly, new = source('daily'), source('weekly'), source('new')
+    history = {daily['url']: uploads(1), weekly['url']: uploads(1 / 7, days=56)}
+    scheduler = CrawlScheduler(runs_per_day=4, now=NOW)
+    polled(scheduler, [daily, weekly], hours_ago=25)
+
+    planned = scheduler.plan([daily, weekly, new], lambda url: history.get(url, []))
+    assert [s['name'] for s in planned] == ['new', 'daily']
+    assert planned[0]['limit'] == CrawlScheduler.BOOTSTRAP_LIMIT
+    assert planned[1]['limit'] == 3
+
+    # Four days later the weekly channel is still not due; eight days later it is
+    scheduler.mark_polled(planned)
+    scheduler.now += 4 * DAY
+    assert 'weekly' not in [s['name'] for s in scheduler.plan([weekly], lambda url: history[url])]
+    scheduler.now += 4 * DAY
+    assert [s['name'] for s in scheduler.plan([weekly], lambda url: history[url])] == ['weekly']
+
+def test_plan_stays_within_the_run_budget():
+    channels = [source(f"channel{i}") for i in range(30)]
+    history = {s['url']: uploads(1) for s in channels}
+    # 40 units a day over 4 runs: 10 units for this run, a poll costs ~1.06
+    scheduler = CrawlScheduler(daily_quota=40, runs_per_day=4, now=NOW)
+    # Due by 25h..28h, none overdue by a full run (6h) past its ~24h interval
+    for i, s in enumerate(channels):
+        polled(scheduler, [s], hours_ago=25 + i * 0.1)
+
+    planned = scheduler.plan(channels, lambda url: history[url])
+    assert sum(scheduler.cost(s['limit']) for s in planned) <= 10
+    assert len(planned) == 9
+    # Most overdue first
+    assert [s['name'] for s in planned] == [f"channel{i}" for i in range(29, 20, -1)]
+
+    # What was spent earlier today comes out of the budget
+    scheduler.record_usage(35)
+    assert sum(scheduler.cost(s['limit']) for s in scheduler.plan(channels, lambda url: history[url])) <= 5
+
+def test_overdue_channels_are_polled_over_budget():
+    channels = [source(f"channel{i}") for i in range(5)]
+    history = {s['url']: uploads(1) for s in channels}
+    scheduler = CrawlScheduler(daily_quota=0, runs_per_day=4, now=NOW)
+    polled(scheduler, channels, hours_ago=31)
+    assert len(scheduler.plan(channels, lambda url: history[url])) == 5
+
+def test_usage_and_state_are_saved():
+    store = MemoryStore()
+    scheduler = CrawlScheduler(store, now=NOW)
+    scheduler.mark_polled([source('a'), source('gone')])
+    scheduler.record_usage(12)
+    scheduler.record_usage(3)
+    scheduler.save([source('a')])
+    assert store.state == {
+        'channels': {source('a')['url']: {'last_polled_at': NOW}},
+        'usage': {'date': '2026-03-16', 'units': 15},
+    }
+
+    # The next day starts from zero
+    tomorrow = CrawlScheduler(store, now=NOW + DAY)
+    assert tomorrow.used_today() == 0
+    tomorrow.record_usage(4)
+    assert tomorrow._usage == {'date': '2026-03-17', 'units': 4}
+
+# ── run_crawlers() with CRAWLER_SCHEDULE=1 ──
+
+@pytest.fixture
+def scheduled(monkeypatch, tmp_path):
+    """Scheduled crawls (4 runs a day) of fake channels uploading 3/day, 1/day and 1/week."""
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    db = FakeFirestore()
+    youtube = FakeYouTubeAPI(channels=12, backlog=15, uploads_per_day=[3, 1, 1 / 7], english_ratio=0, start=NOW)
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(metrics_module, 'METRICS_DIR', str(tmp_path / 'metrics'))
+    monkeypatch.setattr(run_crawler, '_translation_service', TranslationService(
+        client=FakeTranslateClient(), cache=TranslationCache(':memory:')
+    ))
+    monkeypatch.setattr(run_crawler, 'CRAWLER_INCREMENTAL', True)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_RSS_PREFILTER', False)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_SCHEDULE', True)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_RUNS_PER_DAY', 4)
+    monkeypatch.setattr(run_crawler, 'CRAWLER_DAILY_QUOTA', 2000)
+    plans = []
+
+    class RecordingScheduler(CrawlScheduler):
+        """Runs on the fake API's clock and records the URLs each run planned."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, now=youtube.now, **kwargs)
+
+        def plan(self, sources, history_for):
+            planned = super().plan(sources, history_for)
+            plans.append({source['url'] for source in planned})
+            return planned
+
+    monkeypatch.setattr(run_crawler, 'CrawlScheduler', RecordingScheduler)
+
+    faults = {}
+
+    def get(crawler, endpoint, params, etag=None):
+        if params.get('playlistId') in faults or endpoint in faults:
+            raise RuntimeError("500 Server Error")
+        return youtube.get(endpoint, params, etag)
+
+    monkeypatch.setattr(YouTubeCrawler, '_get', get)
+
+    class Scheduled:
+        sources = youtube.sources(['경제'])
+
+        def crawl(self):
+            run_crawler.run_crawlers(self.sources)
+            youtube.advance(24 / 4)
+
+        def last_polled(self, index):
+            state = db.docs['crawler_state/crawl_schedule']
+            return state['entries']['channels'][self.sources[index]['url']]['last_polled_at']
+
+        def video_id(self, index, n):
+            return hashlib.md5(f"{youtube.uploads_id(index)}/{n}".encode()).hexdigest()[:11]
+
+    s = Scheduled()
+    s.db, s.youtube, s.faults, s.plans = db, youtube, faults, plans
+    return s
+
+@pytest.mark.parametrize('fault', ['playlistItems', 'videos'])
+def test_failed_channel_is_retried_on_the_next_plan(scheduled, fault):
+    daily = scheduled.sources[1]['url']
+    scheduled.crawl()
+    first_poll = scheduled.last_polled(1)
+
+    # The daily uploader (channel 1) fails the next time it is due
+    scheduled.faults[scheduled.youtube.uploads_id(1) if fault == 'playlistItems' else 'videos'] = True
+    scheduled.crawl()
+    while daily not in scheduled.plans[-1]:
+        scheduled.crawl()
+    assert scheduled.last_polled(1) == first_poll
+
+    # The next run (6 hours later) polls it again instead of waiting a full interval
+    scheduled.faults.clear()
+    scheduled.crawl()
+    assert daily in scheduled.plans[-1]
+    assert scheduled.last_polled(1) > first_poll
+    first_upload = scheduled.youtube.backlog
+    assert f"contents/youtube_{scheduled.video_id(1, first_upload)}" in scheduled.db.docs
+
+def test_two_weeks_of_scheduled_crawls(scheduled):
+    """Quota drops well below polling every channel every run, and no upload is missed."""
+    youtube = scheduled.youtube
+    runs = 14 * 4
+    for _ in range(runs):
+        scheduled.crawl()
+
+    # An unscheduled run costs at least one playlistItems call per channel
+    assert youtube.quota_units() < runs * youtube.channels / 3
+
+    # Every upload published before the channel's last poll was stored
+    for index in range(youtube.channels):
+        rate = youtube._rates[youtube.uploads_id(index)]
+        days_at_poll = (scheduled.last_polled(index) - youtube.start) / DAY
+        for n in range(youtube.backlog, youtube.backlog + int(rate * days_at_poll)):
+            assert f"contents/youtube_{scheduled.video_id(index, n)}" in scheduled.db.docs, (index, n)
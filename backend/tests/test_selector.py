@@ -0,0 +1,38 @@
+import random
+
+import pytest
+
+from testing.selection import ids, legacy_select, make_contents
+from newsletter.selector import StorySelector
+
+@pytest.mark.parametrize('case', range(300))
+def test_matches_legacy_selection(case):
+    rng = random.Random(case)
+    contents = make_contents(rng.choice([0, 5, 40, 200, 1000]), rng, channels=rng.choice([3, 8, 40, 200]))
+    expected = legacy_select(contents, random.Random(case))
+    assert ids(StorySelector().select(contents, seed=case)) == ids(expected)
+
+def selected(selection):
+    return selection['top_stories'] + [item for items in selection['category_stories'].values() for item in items]
+
+def test_one_story_per_channel_and_cluster():
+    rng = random.Random(7)
+    contents = make_contents(500, rng, channels=60)
+    for item in contents:
+        item['story_cluster'] = f"cluster{rng.randrange(20)}" if rng.random() < 0.5 else None
+    items = selected(StorySelector().select(contents, seed=7))
+    assert len({item['opinion_leader'] for item in items}) == len(items)
+    clusters = [item['story_cluster'] for item in items if item['story_cluster'] is not None]
+    assert len(set(clusters)) == len(clusters)
+
+def test_preferences_reorder_categories_and_channels():
+    contents = make_contents(400, random.Random(3), channels=40)
+    selector = StorySelector()
+    order = selector.category_order(seed=3)
+    preferred_category = order[-1]
+    preferred_channel = next(item['opinion_leader'] for item in contents if item['category'] == order[0])
+    selection = selector.select(contents, category_order=order,
+                                preferred_categories=[preferred_category], preferred_channels=[preferred_channel])
+    assert list(selection['category_stories'])[0] == preferred_category
+    assert selection['top_stories'][0]['category'] == preferred_category
+    assert preferred_channel in {item['opinion_leader'] for item in selected(selection)}
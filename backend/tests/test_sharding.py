@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from testing.fakes import FakeFirestore
+from newsletter.sharding import ITEMS_PER_CHUNK, ShardSpec, claim_or_load_issue
+
+MAIL_HISTORY = {'status': 'sending', 'type': 'production'}
+
+def issue(label, size=ITEMS_PER_CHUNK + 50, date='2026-03-16'):
+    return [{'original_id': f"{label}{i}"} for i in range(size)], ['정치', '경제'], date
+
+def claim(db, index, prepare, **options):
+    options = {'timeout': 10, 'poll_interval': 0.01, 'lease_seconds': 5, **options}
+    return claim_or_load_issue(db, ShardSpec(index, 2, 'test'), prepare, MAIL_HISTORY, **options)
+
+def run_shards(*tasks):
+    """Runs each (db, index, prepare, options) claim on its own thread; returns results or exceptions."""
+    results = [None] * len(tasks)
+
+    def run(n, task):
+        db, index, prepare, options = task
+        try:
+            results[n] = claim(db, index, prepare, **options)
+        except Exception as e:
+            results[n] = e
+
+    threads = [threading.Thread(target=run, args=(n, task)) for n, task in enumerate(tasks)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    return results
+
+def test_one_coordinator_prepares_for_everyone():
+    db = FakeFirestore()
+    calls = []
+
+    def prepare():
+        calls.append(1)
+        time.sleep(0.05)
+        return issue('a')
+
+    first, second = run_shards((db, 0, prepare, {}), (db, 1, prepare, {}))
+    assert len(calls) == 1
+    assert first == second == issue('a')
+    assert db.docs['mail_history/run-test']['status'] == 'sending'
+
+def test_failed_coordinator_is_taken_over():
+    db = FakeFirestore()
+
+    def failing_prepare():
+        time.sleep(0.05)
+        raise RuntimeError("Firestore unavailable")
+
+    def prepare():
+        return issue('b')
+
+    failed, loaded = run_shards((db, 0, failing_prepare, {}), (db, 1, prepare, {}))
+    assert isinstance(failed, RuntimeError)
+    assert loaded == issue('b')
+    # The retried task loads the replacement's issue without preparing again
+    assert claim(db, 0, failing_prepare) == issue('b')
+
+def test_expired_lease_of_a_dead_coordinator_is_taken_over():
+    db = FakeFirestore()
+    db.collection('newsletter_issues').document('run-test').collection('leases').document('0000').create(
+        {'owner': 0, 'expires_at': time.time() + 0.2}
+    )
+    start = time.monotonic()
+    assert claim(db, 1, lambda: issue('c')) == issue('c')
+    assert time.monotonic() - start >= 0.15
+    assert db.docs['newsletter_issues/run-test/leases/0001']['owner'] == 1
+
+def test_unexpired_lease_is_waited_for():
+    db = FakeFirestore()
+    db.collection('newsletter_issues').document('run-test').collection('leases').document('0000').create(
+        {'owner': 0, 'expires_at': time.time() + 60}
+    )
+    with pytest.raises(TimeoutError):
+        claim(db, 1, lambda: issue('d'), timeout=0.1)
+
+def test_slow_coordinator_loses_to_its_replacement():
+    db = FakeFirestore()
+
+    def slow_prepare():
+        time.sleep(0.3)
+        return issue('slow', size=10, date='2026-03-15')
+
+    def prepare():
+        time.sleep(0.1)
+        return issue('fast')
+
+    def replacement():
+        time.sleep(0.05)
+        return claim(db, 1, prepare)
+
+    results = [None, None]
+    threads = [
+        threading.Thread(target=lambda: results.__setitem__(0, claim(db, 0, slow_prepare, lease_seconds=0.05))),
+        threading.Thread(target=lambda: results.__setitem__(1, replacement())),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=30)
+    # Both shards send the issue (and date) that was published first, with no chunks of the other mixed in
+    assert results[0] == results[1] == issue('fast')
+    assert not any(path.startswith('newsletter_issues/run-test/chunks/0000-') for path in db.docs)
+
+def test_empty_issue_skips_the_send():
+    db = FakeFirestore()
+    assert claim(db, 0, lambda: None) is None
+    assert claim(db, 1, lambda: issue('e')) is None
+    assert db.docs['mail_history/run-test']['status'] == 'skipped'
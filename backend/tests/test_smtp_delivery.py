@@ -0,0 +1,143 @@
+import socket
+import threading
+
+import pytest
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+from services.smtp_delivery import DeliveryAborted, SMTPDeliveryEngine
+
+USER, PASSWORD = 'sender@example.com', 'app-password'
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class Mailbox:
+    """aiosmtpd handler: keeps delivered messages, refuses 'bad' recipients, can fail every DATA."""
+
+    def __init__(self):
+        self.messages = []
+        self.data_reply = None
+        self.logins = 0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('bad'):
+            return '550 5.1.1 No such user'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.data_reply:
+            return self.data_reply
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode()))
+        return '250 Message accepted'
+
+    def authenticate(self, server, session, envelope, mechanism, auth_data):
+        self.logins += 1
+        ok = auth_data.login == USER.encode() and auth_data.password == PASSWORD.encode()
+        return AuthResult(success=ok, handled=False)
+
+@pytest.fixture
+def smtp_server():
+    mailbox = Mailbox()
+    controller = Controller(
+        mailbox, hostname='127.0.0.1', port=free_port(),
+        authenticator=mailbox.authenticate, auth_require_tls=False,
+    )
+    controller.start()
+    mailbox.port = controller.port
+    yield mailbox
+    controller.stop()
+
+def engine_for(port, password=PASSWORD, **options):
+    options = {'workers': 3, 'max_per_connection': 4, 'retries': 2, 'retry_backoff': 0.01, **options}
+    return SMTPDeliveryEngine('127.0.0.1', port, user=USER, password=password, starttls=False, timeout=5, **options)
+
+def deliver(engine, recipients, **kwargs):
+    """Runs deliver() on a thread so a deadlocked pool fails the test instead of hanging it."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome['report'] = engine.deliver(recipients, lambda r: f"Subject: hi\n\nHello {r}", **kwargs)
+        except Exception as e:
+            outcome['error'] = e
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout=30)
+    assert not thread.is_alive(), "deliver() did not return"
+    return outcome
+
+class Recipients:
+    """A lazily consumed recipient list that counts how far the producer got."""
+
+    def __init__(self, count, prefix='reader'):
+        self.count = count
+        self.prefix = prefix
+        self.consumed = 0
+
+    def __iter__(self):
+        for i in range(self.count):
+            self.consumed += 1
+            yield f"{self.prefix}{i}@example.com"
+
+def test_delivers_every_recipient(smtp_server):
+    results = []
+    outcome = deliver(engine_for(smtp_server.port), Recipients(10), on_result=lambda r, e: results.append((r, e)))
+    report = outcome['report']
+    assert report.sent_count == 10 and report.failed_count == 0
+    assert sorted(to for to, _ in smtp_server.messages) == sorted(f"reader{i}@example.com" for i in range(10))
+    assert len(results) == 10 and all(error is None for _, error in results)
+    # 3 workers, 4 messages per connection: at most 3 + 2 extra connections
+    assert smtp_server.logins <= 5
+
+def test_refused_recipients_fail_alone(smtp_server):
+    recipients = [f"bad{i}@example.com" for i in range(5)] + ['reader@example.com']
+    report = deliver(engine_for(smtp_server.port, max_consecutive_failures=3), recipients)['report']
+    assert report.sent_count == 1
+    assert set(report.failed) == set(recipients[:5])
+
+def test_rejected_login_stops_the_pool(smtp_server):
+    recipients = Recipients(1000)
+    results = []
+    outcome = deliver(engine_for(smtp_server.port, password='wrong'), recipients,
+                      on_result=lambda r, e: results.append(r))
+    error = outcome['error']
+    assert isinstance(error, DeliveryAborted)
+    assert 'login rejected' in str(error)
+    # One login per worker (smtplib tries PLAIN then LOGIN), no per-recipient retries, nobody recorded
+    assert smtp_server.logins <= 3 * 2
+    assert error.report.total == 0 and results == []
+    assert recipients.consumed < 1000
+
+def test_unreachable_server_stops_the_pool():
+    recipients = Recipients(1000)
+    error = deliver(engine_for(free_port()), recipients)['error']
+    assert isinstance(error, DeliveryAborted)
+    assert 'Cannot connect' in str(error)
+    assert error.report.total == 0
+    assert recipients.consumed < 1000
+
+def test_consecutive_failures_trip_the_breaker(smtp_server):
+    smtp_server.data_reply = '451 4.3.0 Try again later'
+    recipients = Recipients(1000)
+    error = deliver(engine_for(smtp_server.port, retries=0, max_consecutive_failures=5), recipients)['error']
+    assert isinstance(error, DeliveryAborted)
+    assert 'consecutive' in str(error)
+    assert 5 <= error.report.failed_count < 5 + 3
+    assert recipients.consumed < 1000
+
+def test_failing_result_callback_is_surfaced(smtp_server):
+    recipients = Recipients(1000)
+
+    def on_result(recipient, error):
+        raise RuntimeError("journal write failed")
+
+    error = deliver(engine_for(smtp_server.port, workers=1), recipients, on_result=on_result)['error']
+    assert isinstance(error, DeliveryAborted)
+    assert 'journal write failed' in str(error)
+    assert len(smtp_server.messages) == 1
+    assert recipients.consumed < 1000
@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+import utils.db
+import run_newsletter
+from newsletter import snapshots
+from newsletter.snapshots import SNAPSHOTS_COLLECTION, issue_date, load_snapshot, snapshot_id
+from services.crypto_service import encrypt_email
+from testing.fakes import FakeFirestore
+from utils import metrics as metrics_module
+
+KST = snapshots.KST
+
+def test_issue_date_is_the_kst_day():
+    # 15:30 UTC is already the next day in Seoul
+    assert issue_date(datetime.datetime(2026, 3, 16, 15, 30, tzinfo=datetime.timezone.utc)) == '2026-03-17'
+    assert issue_date(datetime.datetime(2026, 3, 16, 14, 59, tzinfo=datetime.timezone.utc)) == '2026-03-16'
+
+@pytest.fixture
+def job(monkeypatch, tmp_path):
+    """
+    A simulated (no EMAIL_* credentials) newsletter send against a fake
+    Firestore, on a KST clock that is set to just before midnight and moves
+    past it as soon as the issue has been prepared.
+    """
+    db = FakeFirestore()
+    now = datetime.datetime.now()
+    for i in range(30):
+        db.collection('contents').document(f"youtube_v{i}").set({
+            'source_type': 'youtube', 'original_id': f"v{i}", 'title': f"제목 {i}",
+            'url': f"https://www.youtube.com/watch?v=v{i}", 'view_count': 1000 * i,
+            'opinion_leader': f"channel{i % 6}", 'category': ['정치', '경제', 'IT'][i % 3],
+            'scraped_at': now - datetime.timedelta(hours=i % 20),
+        })
+    for i in range(10):
+        db.collection('subscribers').document(f"sub{i:06d}").set(
+            {'email': encrypt_email(f"reader{i}@example.com"), 'status': 'active', 'is_test': False}
+        )
+
+    for name in ['CLOUD_RUN_TASK_COUNT', 'CLOUD_RUN_TASK_INDEX', 'NEWSLETTER_RUN_ID', 'CLOUD_RUN_EXECUTION',
+                 'EMAIL_USER', 'EMAIL_PASSWORD']:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv('NEWSLETTER_PERSONALIZE', '0')
+    monkeypatch.setenv('NEWSLETTER_SEED', 'snapshot-test')
+    monkeypatch.setattr(utils.db, '_db_client', db)
+    monkeypatch.setattr(metrics_module, 'METRICS_DIR', str(tmp_path / 'metrics'))
+
+    clock = {'now': datetime.datetime(2026, 3, 16, 23, 59, 30, tzinfo=KST)}
+    dated = lambda now=None: issue_date(now or clock['now'])
+    monkeypatch.setattr(run_newsletter, 'issue_date', dated)
+    monkeypatch.setattr(snapshots, 'issue_date', dated)
+
+    prepare_issue = run_newsletter.prepare_issue
+
+    def prepare_before_midnight(*args):
+        prepared = prepare_issue(*args)
+        clock['now'] += datetime.timedelta(minutes=1)
+        return prepared
+
+    monkeypatch.setattr(run_newsletter, 'prepare_issue', prepare_before_midnight)
+
+    def run(**options):
+        run_newsletter.run_newsletter_job(is_production=True, **options)
+
+    run.db, run.clock = db, clock
+    return run
+
+def stored_snapshots(db):
+    return {path.split('/', 1)[1]: data for path, data in db.docs.items() if path.startswith(f"{SNAPSHOTS_COLLECTION}/")}
+
+def test_snapshot_keeps_the_date_the_issue_was_prepared(job):
+    job()
+    (doc_id, snapshot), = stored_snapshots(job.db).items()
+    assert snapshot['date'] == '2026-03-16'
+    assert doc_id == snapshot_id('2026-03-16', snapshot['mail_id'])
+
+    # A resume the next day sends the stored issue and files nothing new
+    job.clock['now'] += datetime.timedelta(days=1)
+    job(resume_mail_id=snapshot['mail_id'])
+    assert list(stored_snapshots(job.db)) == [doc_id]
+    assert load_snapshot(job.db, snapshot['mail_id'])['date'] == '2026-03-16'
+
+def test_shards_date_the_snapshot_by_the_published_issue(job, monkeypatch):
+    monkeypatch.setenv('CLOUD_RUN_TASK_COUNT', '2')
+    monkeypatch.setenv('NEWSLETTER_RUN_ID', 'midnight')
+    monkeypatch.setenv('CLOUD_RUN_TASK_INDEX', '0')
+    job()
+    # The coordinator stopped after publishing the issue, before its snapshot was stored
+    for doc_id in stored_snapshots(job.db):
+        del job.db.docs[f"{SNAPSHOTS_COLLECTION}/{doc_id}"]
+
+    # The other shard starts after midnight and stores the snapshot under the issue's date
+    monkeypatch.setenv('CLOUD_RUN_TASK_INDEX', '1')
+    job()
+    assert list(stored_snapshots(job.db)) == [snapshot_id('2026-03-16', 'run-midnight')]
+    assert job.db.docs['newsletter_issues/run-midnight']['date'] == '2026-03-16'
@@ -0,0 +1,50 @@
+import pytest
+
+from testing.fakes import FakeFirestore
+from newsletter.delivery_journal import DeliveryJournal
+from newsletter.subscribers import RecipientStream
+from services.crypto_service import encrypt_email
+from services.email_service import make_sid
+
+@pytest.fixture
+def db():
+    db = FakeFirestore()
+    subscribers = {
+        'sub-prod': {'email': 'prod@example.com', 'status': 'active', 'is_test': False},
+        'sub-legacy': {'email': 'legacy@example.com', 'status': 'active'},
+        'sub-legacy-null': {'email': 'null@example.com', 'status': 'active', 'is_test': None},
+        'sub-test': {'email': 'tester@example.com', 'status': 'active', 'is_test': True},
+        'sub-inactive': {'email': 'gone@example.com', 'status': 'inactive', 'is_test': False},
+        'sub-duplicate': {'email': 'PROD@example.com'.lower(), 'status': 'active', 'is_test': False},
+    }
+    for doc_id, data in subscribers.items():
+        db.collection('subscribers').document(doc_id).set({**data, 'email': encrypt_email(data['email'])})
+    return db
+
+@pytest.mark.parametrize('page_size', [1, 2, 1000])
+def test_production_includes_docs_without_is_test(db, page_size):
+    stream = RecipientStream(db, is_production=True, page_size=page_size)
+    assert sorted(stream) == ['legacy@example.com', 'null@example.com', 'prod@example.com']
+    assert stream.count == 3 and stream.duplicates == 1
+
+@pytest.mark.parametrize('page_size', [1, 1000])
+def test_test_group_is_only_flagged_subscribers(db, page_size):
+    assert list(RecipientStream(db, is_production=False, page_size=page_size)) == ['tester@example.com']
+
+def test_journal_counts_without_storing_new_results():
+    db = FakeFirestore()
+    first = DeliveryJournal(db, 'mail1', checkpoint_size=1)
+    for address in ['a@example.com', 'b@example.com', 'c@example.com']:
+        first.record(address, None if address != 'b@example.com' else RuntimeError("451"))
+    assert first.counts() == (2, 1)
+    assert first.statuses == {}
+
+    # Resume: 'b' failed before and is retried, the others are skipped
+    resumed = DeliveryJournal(db, 'mail1')
+    assert resumed.load() == {make_sid('a@example.com'): 'sent', make_sid('b@example.com'): 'failed',
+                              make_sid('c@example.com'): 'sent'}
+    assert [r for r in ['a@example.com', 'b@example.com', 'c@example.com'] if resumed.should_send(r)] == ['b@example.com']
+    resumed.record('b@example.com')
+    resumed.record('d@example.com')
+    assert resumed.counts() == (4, 0)
+    assert len(resumed.statuses) == 3
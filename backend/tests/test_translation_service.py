@@ -0,0 +1,93 @@
+import pytest
+
+from testing.fakes import FakeTranslateClient
+from services import translation_service
+from services.translation_service import TranslationCache, TranslationService
+
+class FailingClient:
+    def __init__(self):
+        self.calls = 0
+
+    def translate(self, values, target_language='ko'):
+        self.calls += 1
+        raise RuntimeError("quota exceeded")
+
+class Clock:
+    """Stands in for the time module so last_used values are strictly ordered."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1
+        return self.now
+
+@pytest.fixture
+def cache():
+    cache = TranslationCache(':memory:', max_entries=3)
+    yield cache
+    cache.close()
+
+def test_cache_hits_skip_the_api(cache):
+    client = FakeTranslateClient()
+    service = TranslationService(client=client, cache=cache)
+
+    first = service.translate_many(['Hello world', '안녕하세요', 'Hello world', 'Breaking news'])
+    assert first == ['[ko] Hello world', '안녕하세요', '[ko] Hello world', '[ko] Breaking news']
+    assert client.calls == 1
+    assert client.characters == len('Hello world') + len('Breaking news')
+
+    # Same texts again (and via a new service sharing the cache): no API call
+    assert service.translate_many(['Breaking news', 'Hello world']) == ['[ko] Breaking news', '[ko] Hello world']
+    assert TranslationService(client=client, cache=cache).translate('Hello world') == '[ko] Hello world'
+    assert client.calls == 1
+
+    # Only the uncached text is sent
+    service.translate_many(['Hello world', 'New title'])
+    assert client.calls == 2
+    assert client.characters == len('Hello world') + len('Breaking news') + len('New title')
+
+def test_korean_and_empty_texts_are_never_sent(cache):
+    client = FakeTranslateClient()
+    service = TranslationService(client=client, cache=cache)
+    assert service.translate_many(['', '대통령 기자회견', None]) == ['', '대통령 기자회견', None]
+    assert client.calls == 0
+
+def test_lru_eviction_at_size_cap(cache, monkeypatch):
+    monkeypatch.setattr(translation_service, 'time', Clock())
+    cache.put_many({'a': 'A', 'b': 'B', 'c': 'C'}, 'ko')
+    # Touch 'a' so 'b' becomes the least recently used
+    assert cache.get_many(['a'], 'ko') == {'a': 'A'}
+
+    cache.put_many({'d': 'D'}, 'ko')
+    assert cache.get_many(['a', 'b', 'c', 'd'], 'ko') == {'a': 'A', 'c': 'C', 'd': 'D'}
+
+    cache.put_many({'e': 'E', 'f': 'F'}, 'ko')
+    remaining = cache.get_many(['a', 'c', 'd', 'e', 'f'], 'ko')
+    assert len(remaining) == 3
+    assert {'e', 'f'} <= set(remaining)
+
+def test_cache_is_keyed_by_target_language(cache):
+    cache.put_many({'Hello': '안녕'}, 'ko')
+    assert cache.get_many(['Hello'], 'ja') == {}
+    assert cache.get_many(['Hello'], 'ko') == {'Hello': '안녕'}
+
+def test_failure_returns_original_text_without_caching(cache):
+    failing = FailingClient()
+    service = TranslationService(client=failing, cache=cache)
+    assert service.translate_many(['Hello world', '속보']) == ['Hello world', '속보']
+    assert failing.calls == 1
+    assert cache.get_many(['Hello world'], 'ko') == {}
+
+    # The next run retries the text and caches it once the API answers
+    client = FakeTranslateClient()
+    assert TranslationService(client=client, cache=cache).translate('Hello world') == '[ko] Hello world'
+    assert client.calls == 1
+    assert cache.get_many(['Hello world'], 'ko') == {'Hello world': '[ko] Hello world'}
+
+def test_large_batches_are_split_per_request(cache):
+    client = FakeTranslateClient()
+    service = TranslationService(client=client, cache=TranslationCache(':memory:', max_entries=1000))
+    texts = [f"title {i}" for i in range(translation_service.MAX_SEGMENTS_PER_REQUEST + 1)]
+    assert service.translate_many(texts) == [f"[ko] {t}" for t in texts]
+    assert client.calls == 2
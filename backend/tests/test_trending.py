@@ -0,0 +1,86 @@
+import datetime
+import math
+
+import pytest
+
+from newsletter import trending
+from newsletter.selector import StorySelector
+from newsletter.trending import annotate_trending, trend_score, trending_scores, velocity_and_acceleration
+
+NOW = datetime.datetime(2026, 3, 16, 12, tzinfo=datetime.timezone.utc).timestamp()
+HOUR = 3600
+
+def iso(hours_ago):
+    return datetime.datetime.fromtimestamp(NOW - hours_ago * HOUR, datetime.timezone.utc).isoformat()
+
+def item(name, hours_ago=(), views=(), published_hours_ago=None, view_count=None):
+    """An item crawled `hours_ago` (oldest first) with `views` at each crawl."""
+    result = {
+        'source_type': 'youtube', 'original_id': name, 'opinion_leader': f"channel-{name}", 'category': '경제',
+        'published_at': iso(published_hours_ago) if published_hours_ago is not None else None,
+        'view_count': view_count if view_count is not None else (views[-1] if views else None),
+    }
+    if hours_ago:
+        result['view_series'] = {'t': [NOW - h * HOUR for h in hours_ago], 'v': list(views)}
+    return result
+
+def cases():
+    """{name: (item, expected score)}, scores worked out by hand from log1p(velocity) + 0.5 * clamp(acceleration, -1, 1)."""
+    return {
+        # 100 views/h over both days: no acceleration
+        'steady': (item('steady', [48, 24, 0], [0, 2400, 4800]), math.log(101)),
+        # 10/h, then 100/h: acceleration (100 - 10) / 11 clamps to 1
+        'rising': (item('rising', [48, 24, 0], [0, 240, 2640]), math.log(101) + 0.5),
+        # 100/h, then 10/h: acceleration (10 - 100) / 101
+        'fading': (item('fading', [48, 24, 0], [0, 2400, 2640]), math.log(11) + 0.5 * -90 / 101),
+        # Counts going down (YouTube removing spam views) are no velocity, not negative velocity
+        'decreasing': (item('decreasing', [48, 24, 0], [5000, 4000, 3000]), 0.0),
+        # One snapshot 10h ago of a video published 20h ago: 50/h since publication, up from nothing
+        'single': (item('single', [10], [500], published_hours_ago=20), math.log(51) + 0.5),
+        # Never snapshotted: view_count over the 4 hours since publication
+        'fresh': (item('fresh', published_hours_ago=4, view_count=400), math.log(101) + 0.5),
+        # Nothing to go on
+        'unknown': (item('unknown', view_count=900), 0.0),
+    }
+
+def test_hand_computed_scores():
+    items, scores = zip(*cases().values())
+    assert trending_scores(items, now=NOW) == pytest.approx(scores)
+
+def test_single_data_point_without_publish_time_has_no_velocity():
+    velocity, acceleration = velocity_and_acceleration([item('single', [10], [500])], now=NOW)
+    assert (velocity, acceleration) == ([0.0], [0.0])
+
+def test_intervals_shorter_than_an_hour_count_as_an_hour():
+    # 100 views 6 minutes apart is 100/h, not 1000/h
+    velocity, _ = velocity_and_acceleration([item('quick', [24.1, 0.1, 0], [0, 2400, 2500])], now=NOW)
+    assert velocity == pytest.approx([100])
+
+def test_acceleration_is_clamped_at_both_bounds(monkeypatch):
+    # With non-negative velocities acceleration stays above -1 (a full stop is -prev / (prev + 1))
+    _, stopped = velocity_and_acceleration([item('stopped', [48, 24, 0], [0, 24_000_000, 24_000_000])], now=NOW)
+    assert -1 < stopped[0] < -0.999
+
+    monkeypatch.setattr(trending, 'velocity_and_acceleration', lambda items, now: ([0.0] * 4, [-3.0, -1.0, 0.2, 7.0]))
+    assert trending_scores([{}] * 4) == pytest.approx([-0.5, -0.5, 0.1, 0.5])
+
+def ranking(items):
+    """Items of one category in the order StorySelector picks them."""
+    selection = StorySelector(categories=['경제'], highlights=1, per_category=len(items), score=trend_score).select(
+        annotate_trending(items, now=NOW)
+    )
+    return [i['original_id'] for i in selection['top_stories'] + selection['category_stories']['경제']]
+
+def test_ranking_and_ties():
+    # 'rising' and 'fresh' tie (as do 'decreasing' and 'unknown'): ties keep the input order
+    forward = [case for case, _ in cases().values()]
+    assert ranking(forward) == ['rising', 'fresh', 'steady', 'single', 'fading', 'decreasing', 'unknown']
+    backward = [case for case, _ in cases().values()][::-1]
+    assert ranking(backward) == ['fresh', 'rising', 'steady', 'single', 'fading', 'unknown', 'decreasing']
+
+def test_annotate_drops_the_series():
+    fading, score = cases()['fading']
+    annotated = annotate_trending([fading], now=NOW)[0]
+    assert 'view_series' not in annotated
+    assert annotated['trend_score'] == round(score, 6)
+    assert trend_score({'original_id': 'never-scored'}) == -1
@@ -0,0 +1,83 @@
+import hashlib
+
+import pytest
+
+from crawler.sources.youtube import YouTubeCrawler
+from testing.fakes import FakeYouTubeAPI
+
+CHANNELS = 12
+LIMIT = 10
+
+@pytest.fixture
+def youtube(monkeypatch):
+    """FakeYouTubeAPI behind YouTubeCrawler._get; `requested` holds the ids of each videos.list call."""
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    youtube = FakeYouTubeAPI(channels=CHANNELS, backlog=LIMIT, english_ratio=0)
+    youtube.requested = []
+    youtube.missing = set()
+
+    def get(crawler, endpoint, params, etag=None):
+        data = youtube.get(endpoint, params, etag)
+        if endpoint == 'videos':
+            youtube.requested.append(params['id'].split(','))
+            # Deleted or private videos are left out of the response
+            data['items'] = [item for item in data['items'] if item['id'] not in youtube.missing]
+        return data
+
+    monkeypatch.setattr(YouTubeCrawler, '_get', get)
+    return youtube
+
+def video_ids(youtube, index, count=LIMIT):
+    """The newest `count` video ids of channel `index`, newest first."""
+    uploads_id = youtube.uploads_id(index)
+    total = youtube.upload_count(uploads_id)
+    return [hashlib.md5(f"{uploads_id}/{n}".encode()).hexdigest()[:11] for n in range(total - 1, total - 1 - count, -1)]
+
+def sources(youtube):
+    return youtube.sources(['정치', '경제', 'IT'])
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_details_are_fetched_in_chunks_of_50_and_mapped_back(youtube, workers):
+    videos = YouTubeCrawler().fetch_latest_videos_bulk(sources(youtube), limit=LIMIT, workers=workers)
+
+    # 120 ids in ⌈120 / 50⌉ videos.list calls instead of one per channel
+    assert youtube.calls['videos'] == 3
+    assert sorted(len(ids) for ids in youtube.requested) == [20, 50, 50]
+    assert sorted(i for ids in youtube.requested for i in ids) == sorted(
+        i for index in range(CHANNELS) for i in video_ids(youtube, index)
+    )
+    assert youtube.calls['channels'] == youtube.calls['playlistItems'] == CHANNELS
+
+    # In source order, newest first within each channel, with the channel's name and category
+    expected = [
+        (i, source['name'], source['category'])
+        for index, source in enumerate(sources(youtube)) for i in video_ids(youtube, index)
+    ]
+    assert [(v['original_id'], v['opinion_leader'], v['category']) for v in videos] == expected
+
+def test_ids_missing_from_the_response_are_skipped(youtube):
+    crawler = YouTubeCrawler()
+    youtube.missing = {video_ids(youtube, 0)[0], video_ids(youtube, 7)[3], video_ids(youtube, 7)[4]}
+    videos = crawler.fetch_latest_videos_bulk(sources(youtube), limit=LIMIT)
+
+    assert len(videos) == CHANNELS * LIMIT - 3
+    assert not youtube.missing & {v['original_id'] for v in videos}
+    channel7 = [v['original_id'] for v in videos if v['opinion_leader'] == 'Channel 7']
+    assert channel7 == [i for i in video_ids(youtube, 7) if i not in youtube.missing]
+    # An absent video is not a failed request
+    assert crawler.failed_urls == set()
+
+def test_a_video_listed_by_two_channels_is_fetched_once(youtube):
+    duplicate = dict(sources(youtube)[2], name='Channel 2 mirror', category='문화')
+    videos = YouTubeCrawler().fetch_latest_videos_bulk(sources(youtube)[:3] + [duplicate], limit=LIMIT)
+
+    assert youtube.requested == [[i for index in range(3) for i in video_ids(youtube, index)]]
+    # Credited to the first source that listed it
+    assert [v['opinion_leader'] for v in videos].count('Channel 2') == LIMIT
+    assert 'Channel 2 mirror' not in {v['opinion_leader'] for v in videos}
+
+def test_channel_limit_overrides_the_default(youtube):
+    picked = [dict(source, limit=index + 1) for index, source in enumerate(sources(youtube)[:4])]
+    videos = YouTubeCrawler().fetch_latest_videos_bulk(picked, limit=LIMIT)
+    assert [v['original_id'] for v in videos] == [i for index in range(4) for i in video_ids(youtube, index, index + 1)]
+    assert youtube.calls['videos'] == 1
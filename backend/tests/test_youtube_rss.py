@@ -0,0 +1,141 @@
+import io
+import time
+from pathlib import Path
+
+import pytest
+import requests
+
+from crawler.sources.youtube import YouTubeCrawler
+from crawler.sources.youtube_rss import YouTubeRSSFeed
+
+FEED = (Path(__file__).parent / 'fixtures' / 'youtube_feed.xml').read_bytes()
+FEED_IDS = [
+    'dQ7nK1xR2aM', 'Zp3LqW8vT0c', 'h5GfR2yN9sE', 'Lm0XcV4bQ1w', 'tY6uI8oP2aS',
+    'Qw3Er5Ty7Ui', 'aS9dF1gH3jK', 'zX5cV7bN9mQ', 'pL2kJ4hG6fD', 'mN8bV0cX2zA',
+    'rT4yU6iO8pE', 'wQ1eR3tY5uI', 'gH7jK9lZ1xC', 'vB3nM5qW7eR', 'kL9zX1cV3bN',
+]
+CHANNEL_ID = 'UCq9nVHcVtRkaQ3S0xEtxQoA'
+UPLOADS_ID = 'UU' + CHANNEL_ID[2:]
+CHANNEL_URL = 'https://www.youtube.com/@economy'
+
+class FakeResponse:
+    def __init__(self, body, status_code=200):
+        self.raw = io.BytesIO(body)
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+class FakeSession:
+    """Answers every feed request with `body` (or raises `error`)."""
+
+    def __init__(self, body=FEED, status_code=200, error=None):
+        self.body = body
+        self.status_code = status_code
+        self.error = error
+        self.requests = []
+        self.responses = []
+
+    def get(self, url, params=None, timeout=None, stream=False):
+        self.requests.append(params)
+        if self.error:
+            raise self.error
+        resp = FakeResponse(self.body, self.status_code)
+        self.responses.append(resp)
+        return resp
+
+class WatermarkStore:
+    def __init__(self, entries):
+        self.entries = entries
+
+    def load(self):
+        return dict(self.entries)
+
+    def save(self, entries):
+        self.entries = entries
+
+def test_parse_video_ids_in_feed_order():
+    assert YouTubeRSSFeed.parse_video_ids(io.BytesIO(FEED)) == FEED_IDS
+
+def test_fetch_video_ids_reads_the_channel_feed():
+    session = FakeSession()
+    assert YouTubeRSSFeed(session).fetch_video_ids(CHANNEL_ID) == FEED_IDS
+    assert session.requests == [{'channel_id': CHANNEL_ID}]
+    assert session.responses[0].closed
+
+@pytest.mark.parametrize('session', [
+    FakeSession(body=FEED[:len(FEED) // 2]),
+    FakeSession(body=b'<html><body>Sorry, something went wrong.</body>'),
+    FakeSession(status_code=404),
+    FakeSession(error=requests.ConnectionError("connection reset")),
+], ids=['truncated', 'malformed', 'not-found', 'network-error'])
+def test_unusable_feed_returns_none(session):
+    assert YouTubeRSSFeed(session).fetch_video_ids(CHANNEL_ID) is None
+    assert all(resp.closed for resp in session.responses)
+
+def test_uploads_playlist_maps_to_channel_id():
+    assert YouTubeRSSFeed.channel_id_for(UPLOADS_ID) == CHANNEL_ID
+    assert YouTubeRSSFeed.channel_id_for('PLabcdef') is None
+
+@pytest.fixture
+def crawler(monkeypatch):
+    """A crawler that has already seen the five newest videos of the channel."""
+    monkeypatch.setenv('YOUTUBE_API_KEY', 'test')
+    calls = []
+
+    def get(crawler, endpoint, params, etag=None):
+        calls.append(endpoint)
+        assert endpoint == 'playlistItems'
+        ids = crawler.uploads[:int(params['maxResults'])]
+        return {'etag': f'"{ids[0]}"', 'items': [{'contentDetails': {'videoId': i}} for i in ids]}
+
+    monkeypatch.setattr(YouTubeCrawler, '_get', get)
+    store = WatermarkStore({UPLOADS_ID: {
+        'recent_ids': FEED_IDS[:5], 'etag': f'"{FEED_IDS[0]}"', 'views_refreshed_at': time.time(),
+    }})
+    crawler = YouTubeCrawler(watermark_store=store, rss_prefilter=True)
+    crawler._channel_cache[CHANNEL_URL] = UPLOADS_ID
+    crawler._rss_feed = YouTubeRSSFeed(FakeSession())
+    crawler.uploads = FEED_IDS
+    crawler.calls = calls
+    yield crawler
+    crawler.close()
+
+def test_prefilter_skips_channels_with_nothing_new(crawler):
+    assert crawler._get_channel_video_ids(CHANNEL_URL, 5, incremental=True) == []
+    assert crawler.calls == []
+
+def test_new_feed_entries_go_to_playlist_items(crawler):
+    new_ids = ['nEwV1de0aaa', 'nEwV1de0bbb']
+    crawler.uploads = new_ids + FEED_IDS
+    crawler._rss_feed = YouTubeRSSFeed(FakeSession(body=FEED.replace(
+        b'<entry>', f'<entry><yt:videoId>{new_ids[0]}</yt:videoId></entry><entry><yt:videoId>{new_ids[1]}</yt:videoId></entry><entry>'.encode(), 1
+    )))
+    assert crawler._get_channel_video_ids(CHANNEL_URL, 5, incremental=True) == new_ids
+    assert crawler.calls == ['playlistItems']
+
+EMPTY_FEED = FEED[:FEED.index(b'<entry>')] + b'</feed>'
+
+def test_empty_feed_parses_to_no_ids():
+    assert YouTubeRSSFeed(FakeSession(body=EMPTY_FEED)).fetch_video_ids(CHANNEL_ID) == []
+
+@pytest.mark.parametrize('session', [
+    FakeSession(body=FEED[:len(FEED) // 2]),
+    FakeSession(status_code=404),
+    FakeSession(body=EMPTY_FEED),
+], ids=['truncated', 'not-found', 'empty'])
+def test_unusable_feed_falls_back_to_playlist_items(crawler, session):
+    crawler.uploads = ['nEwV1de0aaa'] + FEED_IDS
+    crawler._rss_feed = YouTubeRSSFeed(session)
+    assert crawler._get_channel_video_ids(CHANNEL_URL, 5, incremental=True) == ['nEwV1de0aaa']
+    assert crawler.calls == ['playlistItems']
+
+def test_due_view_refresh_bypasses_the_feed(crawler):
+    crawler._watermarks[UPLOADS_ID]['views_refreshed_at'] = 0
+    session = FakeSession()
+    crawler._rss_feed = YouTubeRSSFeed(session)
+    assert crawler._get_channel_video_ids(CHANNEL_URL, 5, incremental=True) == FEED_IDS[:5]
+    assert session.requests == []
+    assert crawler.calls == ['playlistItems']
@@ -0,0 +1,119 @@
+import hashlib
+import datetime
+
+# One document per channel: when it was last crawled and when each of its
+# content docs was last seen. Readers resolve "recent" content through it,
+# so the crawler no longer rewrites unchanged content docs just to bump
+# their scraped_at.
+#
+#   channel_manifests/{source_type}_{sha1(opinion_leader)[:16]}
+#     { source_type, opinion_leader, category, crawled_at,
+#       items: {content_doc_id: last_seen_at},
+#       series: {content_doc_id: {'t': [epoch seconds], 'v': [view counts]}} }
+#
+# `series` is a capped, append-only view-count history per item (parallel
+# arrays, since Firestore has no nested arrays), appended on every crawl that
+# saw the item. Readers get it with the manifest, at no extra read per item.
+MANIFEST_COLLECTION = 'channel_manifests'
+# Entries not seen for this long are dropped. run_retention archives content
+# "not seen for RETENTION_DAYS" from these entries, so this must stay >= that
+# (it refuses to run otherwise).
+MANIFEST_RETENTION_DAYS = 90
+# View-count series are only kept for items seen within the widest reader window
+SERIES_RETENTION_DAYS = 30
+# Snapshots kept per item, and the minimum spacing between them (a closer
+# crawl overwrites the latest point instead of appending)
+SERIES_LENGTH = 16
+SERIES_MIN_SPACING_SECONDS = 3600
+
+# Content fields whose change is worth a rewrite. title is excluded (it is
+# stored translated and never re-translated); view_count has its own 5% rule.
+DIGEST_FIELDS = ['category', 'description', 'thumbnail', 'published_at', 'opinion_leader', 'url']
+
+def manifest_id(source_type, opinion_leader):
+    digest = hashlib.sha1((opinion_leader or '').encode('utf-8')).hexdigest()[:16]
+    return f"{source_type}_{digest}"
+
+def content_digest(item):
+    """Stable short hash of the DIGEST_FIELDS of a content item."""
+    raw = '\x1f'.join(str(item.get(field) or '') for field in DIGEST_FIELDS)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+def as_utc(value):
+    # Firestore returns aware UTC timestamps; the crawler writes naive ones (stored as UTC)
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=datetime.timezone.utc)
+    return value
+
+def append_point(series, timestamp, views, cap=SERIES_LENGTH, min_spacing=SERIES_MIN_SPACING_SECONDS):
+    """Returns `series` ({'t': [...], 'v': [...]}) with (timestamp, views) appended, capped to the newest `cap`."""
+    times = list((series or {}).get('t') or [])
+    values = list((series or {}).get('v') or [])
+    if times and timestamp - times[-1] < min_spacing:
+        times[-1], values[-1] = timestamp, views
+    else:
+        times.append(timestamp)
+        values.append(views)
+    return {'t': times[-cap:], 'v': values[-cap:]}
+
+def merge_manifest(existing, source_type, opinion_leader, category, doc_ids, now,
+                   retention_days=MANIFEST_RETENTION_DAYS, views=None):
+    """
+    Returns the channel's manifest after a crawl that saw `doc_ids` at `now`:
+    those entries are stamped `now`, entries older than the retention are dropped.
+    `views` ({doc_id: view_count}) adds a snapshot to each item's series; series
+    of items not seen for SERIES_RETENTION_DAYS are dropped.
+    """
+    cutoff = as_utc(now) - datetime.timedelta(days=retention_days)
+    series_cutoff = as_utc(now) - datetime.timedelta(days=min(retention_days, SERIES_RETENTION_DAYS))
+    items = {
+        doc_id: seen_at
+        for doc_id, seen_at in ((existing or {}).get('items') or {}).items()
+        if as_utc(seen_at) is not None and as_utc(seen_at) >= cutoff
+    }
+    for doc_id in doc_ids:
+        items[doc_id] = now
+
+    series = {
+        doc_id: values
+        for doc_id, values in ((existing or {}).get('series') or {}).items()
+        if doc_id in items and as_utc(items[doc_id]) >= series_cutoff
+    }
+    timestamp = int(as_utc(now).timestamp())
+    for doc_id, view_count in (views or {}).items():
+        if view_count is not None and doc_id in items:
+            series[doc_id] = append_point(series.get(doc_id), timestamp, int(view_count))
+    return {
+        'source_type': source_type,
+        'opinion_leader': opinion_leader,
+        'category': category,
+        'crawled_at': now,
+        'items': items,
+        'series': series,
+    }
+
+def recent_entries(db, since, limit=None):
+    """
+    (last_seen_at, content_doc_id, view_series) triples seen at or after
+    `since`, newest first, read from the manifests of channels crawled since
+    then (one query). view_series is None for items without snapshots.
+    Returns None when there are no manifests at all (pre-manifest data).
+    """
+    since = as_utc(since)
+    manifests = list(db.collection(MANIFEST_COLLECTION).where('crawled_at', '>=', since).stream())
+    if not manifests:
+        if next(iter(db.collection(MANIFEST_COLLECTION).limit(1).stream()), None) is None:
+            return None
+        return []
+    entries = []
+    for snapshot in manifests:
+        manifest = snapshot.to_dict() or {}
+        series = manifest.get('series') or {}
+        for doc_id, seen_at in (manifest.get('items') or {}).items():
+            seen_at = as_utc(seen_at)
+            if seen_at is not None and seen_at >= since:
+                entries.append((seen_at, doc_id, series.get(doc_id)))
+    entries.sort(key=lambda entry: (entry[0], entry[1]), reverse=True)
+    return entries[:limit] if limit else entries
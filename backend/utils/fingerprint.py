@@ -0,0 +1,131 @@
+import re
+import random
+import hashlib
+import operator
+
+# MinHash signatures of title + description shingles, for near-duplicate
+# story detection. A signature is NUM_PERM 32-bit minima stored as one hex
+# string (512 chars) on each content doc as `fingerprint`.
+NUM_PERM = 64
+# LSH banding: BANDS x ROWS == NUM_PERM. Two items become candidates when all
+# rows of any band match; with 32 x 2 that is likely from Jaccard ~0.2 up.
+BANDS = 32
+ROWS = 2
+# Estimated Jaccard at which candidates count as the same story. Rewrites of
+# one headline score 0.3-0.7 on bigrams; unrelated headlines that share a name
+# (한국은행 ..., 엔비디아 ...) mostly stay below 0.25.
+# Checked by tests/test_near_duplicates.py.
+SIMILARITY_THRESHOLD = 0.3
+# Buckets larger than this are skipped (a shingle everyone shares, not a story)
+MAX_BUCKET_SIZE = 50
+# Only the start of the description: the rest is mostly channel boilerplate
+DESCRIPTION_CHARS = 60
+# Texts with fewer shingles get no signature: one shared word would make
+# two of them "similar" (e.g. '제목 1' and '제목 2')
+MIN_SHINGLES = 4
+
+_MERSENNE = (1 << 61) - 1
+# Fixed seed: signatures written by the crawler must match those computed later
+_rng = random.Random(0x5eed)
+_PERMUTATIONS = [(_rng.randrange(1, _MERSENNE), _rng.randrange(0, _MERSENNE)) for _ in range(NUM_PERM)]
+
+_TAGS = re.compile(r'\[[^\]]*\]|【[^】]*】|<[^>]*>|#\S+|https?://\S+')
+_NON_WORD = re.compile(r'[^0-9a-z가-힣]+')
+# Headline decorations that say nothing about the story
+STOPWORDS = {'속보', '단독', '영상', '라이브', '풀영상', '풀버전', '자막', 'live', 'shorts', 'full', 'ep'}
+
+def shingles(text):
+    """
+    Character bigrams of each word (words of one or two characters as-is)
+    after dropping [tags], #hashtags, URLs and punctuation. Bigrams keep
+    Korean words matching across particles (대통령이 / 대통령은).
+    """
+    words = _NON_WORD.sub(' ', _TAGS.sub(' ', (text or '').lower())).split()
+    result = set()
+    for word in words:
+        if word in STOPWORDS:
+            continue
+        if len(word) <= 2:
+            result.add(word)
+        else:
+            result.update(word[i:i + 2] for i in range(len(word) - 1))
+    return result
+
+def _base_hash(shingle):
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def minhash(shingle_set):
+    """NUM_PERM minima of (a*h + b) mod p over the shingles, truncated to 32 bits."""
+    hashes = [_base_hash(s) for s in shingle_set]
+    return [min(((a * h + b) % _MERSENNE) & 0xffffffff for h in hashes) for a, b in _PERMUTATIONS]
+
+def fingerprint(title, description=None):
+    """Hex MinHash signature of a story, or None when there is too little text to compare."""
+    shingle_set = shingles(title) | shingles((description or '')[:DESCRIPTION_CHARS])
+    if len(shingle_set) < MIN_SHINGLES:
+        return None
+    return ''.join(f'{value:08x}' for value in minhash(shingle_set))
+
+def decode(signature):
+    if not signature or len(signature) != NUM_PERM * 8:
+        return None
+    return [int(signature[i:i + 8], 16) for i in range(0, len(signature), 8)]
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two decoded signatures."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+class NearDuplicateIndex:
+    """
+    LSH index over MinHash signatures. add() every item, then clusters()
+    groups near-duplicates with union-find over the candidate pairs that share
+    a band and pass SIMILARITY_THRESHOLD. Cost is linear in the number of
+    items plus candidate pairs, instead of comparing every pair.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, bands=BANDS, rows=ROWS, max_bucket_size=MAX_BUCKET_SIZE):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.max_bucket_size = max_bucket_size
+        self._signatures = []
+        self._buckets = {}
+
+    def add(self, signature):
+        """Adds a hex signature; returns its position (the id used by clusters())."""
+        position = len(self._signatures)
+        decoded = decode(signature)
+        self._signatures.append(decoded)
+        if decoded is not None:
+            # Band keys are slices of the hex string itself (8 hex chars per row)
+            width = self.rows * 8
+            for band in range(self.bands):
+                self._buckets.setdefault((band, signature[band * width:(band + 1) * width]), []).append(position)
+        return position
+
+    def candidate_pairs(self):
+        pairs = set()
+        for members in self._buckets.values():
+            if len(members) < 2 or len(members) > self.max_bucket_size:
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+        return pairs
+
+    def clusters(self):
+        """Cluster id per added position: the smallest position in its near-duplicate group."""
+        parent = list(range(len(self._signatures)))
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for first, second in self.candidate_pairs():
+            root_a, root_b = find(first), find(second)
+            # Already grouped through another pair: no need to compare signatures
+            if root_a != root_b and similarity(self._signatures[first], self._signatures[second]) >= self.threshold:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+        return [find(position) for position in range(len(self._signatures))]
@@ -0,0 +1,188 @@
+import os
+import json
+import time
+import bisect
+import datetime
+import threading
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Where run summaries are written ('' disables the files; the JSON line is always logged)
+METRICS_DIR = os.getenv('METRICS_DIR', os.path.join(BASE_DIR, '.cache', 'metrics'))
+METRICS_PROMETHEUS = os.getenv('METRICS_PROMETHEUS', '0') == '1'
+METRIC_PREFIX = 'opinionnewsletter_'
+
+# Latency buckets in seconds (upper bounds), Prometheus-style
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+class Histogram:
+    """Cumulative latency histogram over fixed BUCKETS, plus sum/count/max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (max for the overflow bucket)."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(BUCKETS[i], self.max) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'sum_s': round(self.sum, 4),
+            'avg_ms': round(self.sum * 1000 / self.count, 2) if self.count else 0,
+            'p50_ms': round(self.quantile(0.5) * 1000, 2),
+            'p95_ms': round(self.quantile(0.95) * 1000, 2),
+            'max_ms': round(self.max * 1000, 2),
+        }
+
+class Metrics:
+    """
+    Process-wide counters and latency histograms, keyed by name + labels.
+
+    `span(name, **labels)` times a block into the `name` histogram and
+    counts failures in `name_errors`; `inc(name, n, **labels)` bumps a
+    counter. Safe to use from worker threads. `write_summary(job)` logs the
+    run summary as one JSON line and writes it (and optionally Prometheus
+    text) under METRICS_DIR.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def total(self, name):
+        """Sum of a counter across all label sets."""
+        with self._lock:
+            return sum(value for (counter, _), value in self.counters.items() if counter == name)
+
+    @contextmanager
+    def span(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def summary(self, job=None):
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        return {
+            'job': job,
+            'started_at': datetime.datetime.fromtimestamp(self.started_at).isoformat(),
+            'wall_s': round(time.time() - self.started_at, 3),
+            'counters': [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for (name, key), value in counters
+            ],
+            'timings': [
+                {'name': name, 'labels': dict(key), **histogram.summary()}
+                for (name, key), histogram in histograms
+            ],
+        }
+
+    def to_prometheus(self, job=None):
+        job_label = (('job', job),) if job else ()
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items())
+        lines = []
+        typed = set()
+        for (name, key), value in counters:
+            metric = f"{METRIC_PREFIX}{name}_total"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_format_labels(key, job_label)} {value}")
+        for (name, key), histogram in histograms:
+            metric = f"{METRIC_PREFIX}{name}_seconds"
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, n in zip(BUCKETS + ('+Inf',), histogram.counts):
+                cumulative += n
+                lines.append(f"{metric}_bucket{_format_labels(key, job_label + (('le', bound),))} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(key, job_label)} {histogram.sum:.6f}")
+            lines.append(f"{metric}_count{_format_labels(key, job_label)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self, summary):
+        print(f"📈 Run metrics ({summary['wall_s']}s):")
+        for timing in summary['timings']:
+            labels = ','.join(f"{k}={v}" for k, v in timing['labels'].items())
+            print(f"   ⏱  {timing['name']}{f'[{labels}]' if labels else ''}: {timing['count']} call(s), "
+                  f"avg {timing['avg_ms']}ms, p95 {timing['p95_ms']}ms, total {timing['sum_s']}s")
+        for counter in summary['counters']:
+            labels = ','.join(f"{k}={v}" for k, v in counter['labels'].items())
+            print(f"   #  {counter['name']}{f'[{labels}]' if labels else ''}: {counter['value']}")
+
+    def write_summary(self, job):
+        """Prints and persists the run summary; returns it as a dict."""
+        summary = self.summary(job)
+        self.print_summary(summary)
+        # Single-line JSON so Cloud Logging ingests it as a structured entry
+        print(json.dumps({'message': f'{job} run metrics', 'metrics': summary}, ensure_ascii=False))
+
+        if METRICS_DIR:
+            try:
+                os.makedirs(METRICS_DIR, exist_ok=True)
+                stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+                with open(os.path.join(METRICS_DIR, f"{job}-{stamp}.json"), 'w') as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
+                if METRICS_PROMETHEUS:
+                    with open(os.path.join(METRICS_DIR, f"{job}.prom"), 'w') as f:
+                        f.write(self.to_prometheus(job))
+            except OSError as e:
+                print(f"⚠️ Could not write metrics to {METRICS_DIR}: {e}")
+        return summary
+
+metrics = Metrics()
@@ -0,0 +1,26 @@
+class StateDoc:
+    """
+    Small piece of job state kept in a single Firestore document.
+    Cloud Run jobs start from a fresh process every run, so anything worth
+    remembering between runs (caches, watermarks) is loaded once at start
+    and written back once at the end.
+    """
+
+    COLLECTION = 'crawler_state'
+
+    def __init__(self, db, name, collection=COLLECTION):
+        self.doc_ref = db.collection(collection).document(name)
+
+    def load(self):
+        try:
+            snapshot = self.doc_ref.get()
+            return (snapshot.to_dict() or {}).get('entries', {}) if snapshot.exists else {}
+        except Exception as e:
+            print(f"⚠️ Failed to load state {self.doc_ref.id}: {e}")
+            return {}
+
+    def save(self, entries):
+        try:
+            self.doc_ref.set({'entries': entries})
+        except Exception as e:
+            print(f"⚠️ Failed to save state {self.doc_ref.id}: {e}")
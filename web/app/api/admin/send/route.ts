@@ -1,6 +1,7 @@
 import { NextResponse } from 'next/server';
 import { cookies } from 'next/headers';
 import { db } from '@/lib/firebase';
+import { getRecentContents } from '@/lib/recentContents';
 import { decryptEmail } from '@/lib/crypto';
 import nodemailer from 'nodemailer';
 import fs from 'fs';
@@ -32,14 +33,8 @@ export async function POST(request: Request) {
 
         // 2. Fetch Content (최대 30개, 7일 이내 데이터)
         const sevenDaysAgo = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000);
-        const contentSnapshot = await db.collection('contents')
-            .where('scraped_at', '>=', sevenDaysAgo)
-            .orderBy('scraped_at', 'desc')
-            .limit(30)
-            .get();
-
         type ContentItem = { view_count?: number; opinion_leader?: string; title?: string; url?: string; [key: string]: unknown; };
-        const contents = contentSnapshot.docs.map(d => d.data()) as ContentItem[];
+        const contents = await getRecentContents(sevenDaysAgo, 30) as ContentItem[];
 
         // 3. Determine Recipients (Array of objects now)
         interface Recipient {
@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { db } from '../../../lib/firebase';
+import { getRecentContents } from '../../../lib/recentContents';
 
 export async function GET() {
     try {
@@ -8,21 +8,21 @@ export async function GET() {
         type ContentItem = { id: string; view_count: number; opinion_leader?: string; [key: string]: unknown; };
         let contentsList: ContentItem[] = [];
 
+        // 가장 넓은 구간을 한 번만 조회하고 (최신순), 좁은 구간부터 잘라서 사용
+        const widest = new Date(Date.now() - thresholds[thresholds.length - 1] * 60 * 60 * 1000);
+        const recent = await getRecentContents(widest);
+
         for (const hours of thresholds) {
-            const threshold = new Date();
-            threshold.setHours(threshold.getHours() - hours);
-
-            const snapshot = await db.collection('contents')
-                .where('scraped_at', '>=', threshold)
-                .get();
-
-            contentsList = snapshot.docs.map(doc => ({
-                id: doc.id,
-                ...doc.data(),
-                scraped_at: doc.data().scraped_at?.toDate().toISOString(),
-                published_at: doc.data().published_at,
-                view_count: doc.data().view_count || 0
-            }));
+            const threshold = new Date(Date.now() - hours * 60 * 60 * 1000);
+
+            contentsList = recent
+                .filter(item => item.scraped_at >= threshold)
+                .map(item => ({
+                    ...item,
+                    scraped_at: item.scraped_at.toISOString(),
+                    published_at: item.published_at,
+                    view_count: item.view_count || 0
+                }));
 
             if (contentsList.length > 0) break;
         }
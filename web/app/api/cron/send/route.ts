@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
 import { db } from '@/lib/firebase';
+import { getRecentContents } from '@/lib/recentContents';
 import { decryptEmail } from '@/lib/crypto';
 import nodemailer from 'nodemailer';
 import fs from 'fs';
@@ -44,14 +45,8 @@ export async function POST(request: Request) {
 
         // 3. 콘텐츠 가져오기 (7일 이내, 최대 30개)
         const sevenDaysAgo = new Date(Date.now() - 7 * 24 * 60 * 60 * 1000);
-        const contentSnapshot = await db.collection('contents')
-            .where('scraped_at', '>=', sevenDaysAgo)
-            .orderBy('scraped_at', 'desc')
-            .limit(30)
-            .get();
-
         type ContentItem = { view_count?: number; opinion_leader?: string; title?: string; url?: string; category?: string; [key: string]: unknown; };
-        const contents = contentSnapshot.docs.map(d => d.data()) as ContentItem[];
+        const contents = await getRecentContents(sevenDaysAgo, 30) as ContentItem[];
 
         if (contents.length === 0) {
             // 콘텐츠 0건도 mail_history에 기록 (장애 추적용)
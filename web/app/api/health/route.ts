@@ -1,5 +1,6 @@
 import { NextResponse } from 'next/server';
 import { db } from '@/lib/firebase';
+import { getLastCrawledAt } from '@/lib/recentContents';
 import fs from 'fs';
 import path from 'path';
 
@@ -69,16 +70,12 @@ export async function GET() {
 
     // 5. 콘텐츠 freshness 체크 (크롤러 장애 조기 감지)
     try {
-        const latestContent = await db.collection('contents')
-            .orderBy('scraped_at', 'desc')
-            .limit(1)
-            .get();
+        // 크롤러는 변경 없는 콘텐츠를 다시 쓰지 않으므로 채널 매니페스트의 crawled_at 기준
+        const scrapedAt = await getLastCrawledAt();
 
-        if (latestContent.empty) {
+        if (!scrapedAt) {
             checks['Content Freshness'] = { status: 'warning', message: '콘텐츠 없음 — 크롤러 미실행' };
         } else {
-            const latestData = latestContent.docs[0].data();
-            const scrapedAt = latestData.scraped_at?.toDate?.() ?? new Date(latestData.scraped_at);
             const hoursAgo = (Date.now() - scrapedAt.getTime()) / (1000 * 60 * 60);
 
             if (hoursAgo > 48) {
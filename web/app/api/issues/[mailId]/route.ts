@@ -0,0 +1,90 @@
+import { NextResponse, NextRequest } from 'next/server';
+import { db } from '@/lib/firebase';
+
+// 발송 시 백엔드가 남기는 이슈 스냅샷 (backend/newsletter/snapshots.py)
+//   newsletter_snapshots/{YYYY-MM-DD}_{mailId}: { version, mail_id, date, selection, html_parts, content_hash, ... }
+// html_parts를 sid로 이어 붙이면 수신자가 받은 메일과 같은 HTML이 됩니다.
+const SNAPSHOTS_COLLECTION = 'newsletter_snapshots';
+const SNAPSHOT_VERSION = 1;
+
+// 웹에서 보기는 열람/클릭 추적을 하지 않습니다 (email_pv, open_count, click_count가 부풀지 않도록)
+const TRACKING_PIXEL = /<img\b[^>]*\/api\/track\/open\?[^>]*>/g;
+const CLICK_LINK = /href="[^"]*\/api\/track\/click\?([^"]*)"/g;
+// 메일 HTML에는 스크립트가 필요 없습니다 (템플릿의 분석 스크립트와 제목에 섞여 들어온 태그도 막습니다)
+const CONTENT_SECURITY_POLICY = [
+    "default-src 'none'",
+    'img-src https: http: data:',
+    "style-src 'unsafe-inline'",
+    "base-uri 'none'",
+    "form-action 'none'",
+    "frame-ancestors 'none'",
+].join('; ');
+
+function escapeAttribute(value: string): string {
+    return value.replace(/&/g, '&amp;').replace(/"/g, '&quot;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+}
+
+/** 클릭 추적 링크를 원래 URL로 바꿉니다 (http/https만 허용). */
+function untrackedLink(_match: string, query: string): string {
+    const url = new URLSearchParams(query.replace(/&amp;/g, '&')).get('url');
+    let parsed: URL;
+    try {
+        parsed = new URL(url ?? '');
+    } catch {
+        return 'href="#"';
+    }
+    if (parsed.protocol !== 'http:' && parsed.protocol !== 'https:') {
+        return 'href="#"';
+    }
+    return `href="${escapeAttribute(parsed.href)}"`;
+}
+
+/** 수신자와 무관한 브라우저용 HTML: sid 없이 이어 붙이고 추적 픽셀과 클릭 리다이렉트를 뺍니다. */
+function browserView(htmlParts: string[]): string {
+    return htmlParts.join('').replace(TRACKING_PIXEL, '').replace(CLICK_LINK, untrackedLink);
+}
+
+/**
+ * 웹에서 보기: 발송된 뉴스레터를 스냅샷 한 번의 조회로 보여줍니다.
+ * 모든 방문자에게 같은 HTML을 반환하므로 ?sid= 는 받지 않습니다. ?format=json 이면 선정된 콘텐츠를 반환합니다.
+ */
+export async function GET(
+    request: NextRequest,
+    { params }: { params: Promise<{ mailId: string }> }
+) {
+    try {
+        const { mailId } = await params;
+        if (!mailId) {
+            return NextResponse.json({ error: 'Missing mail ID' }, { status: 400 });
+        }
+
+        const snapshot = await db.collection(SNAPSHOTS_COLLECTION).where('mail_id', '==', mailId).limit(1).get();
+        const data = snapshot.empty ? null : snapshot.docs[0].data();
+        if (!data || data.version !== SNAPSHOT_VERSION) {
+            return NextResponse.json({ error: 'Issue not found' }, { status: 404 });
+        }
+
+        const { searchParams } = new URL(request.url);
+        if (searchParams.get('format') === 'json') {
+            return NextResponse.json({
+                mail_id: data.mail_id,
+                date: data.date,
+                selection: data.selection,
+                item_count: data.item_count,
+                content_hash: data.content_hash,
+            });
+        }
+
+        return new NextResponse(browserView(data.html_parts as string[]), {
+            headers: {
+                'Content-Type': 'text/html; charset=utf-8',
+                'Content-Security-Policy': CONTENT_SECURITY_POLICY,
+                // 스냅샷은 한 번 쓰이면 바뀌지 않고, 응답에 수신자별 값이 없습니다
+                'Cache-Control': 'public, max-age=3600',
+            },
+        });
+    } catch (error) {
+        console.error("Error loading issue snapshot");
+        return NextResponse.json({ error: 'Internal Server Error' }, { status: 500 });
+    }
+}
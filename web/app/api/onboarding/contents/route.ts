@@ -1,5 +1,5 @@
 import { NextResponse } from 'next/server';
-import { db } from '../../../../lib/firebase';
+import { getRecentContents } from '../../../../lib/recentContents';
 
 const FALLBACK_CHANNELS: { opinion_leader: string; category: string }[] = [
     { opinion_leader: "김현정의 뉴스쇼", category: "정치" },
@@ -50,26 +50,20 @@ export async function GET() {
         const lookbackDate = new Date();
         lookbackDate.setHours(lookbackDate.getHours() - 72);
 
-        const snapshot = await db.collection('contents')
-            .where('scraped_at', '>=', lookbackDate)
-            .orderBy('scraped_at', 'desc')
-            .limit(200) // Fetch enough to deduplicate
-            .get();
+        const recent = await getRecentContents(lookbackDate, 200); // Fetch enough to deduplicate
 
         const processedChannels = new Set();
         type ContentData = { id: string; opinion_leader?: string; scraped_at?: string; [key: string]: unknown; };
         const uniqueContents: ContentData[] = [];
 
-        snapshot.docs.forEach(doc => {
-            const data = doc.data();
+        recent.forEach(data => {
             const channel = data.opinion_leader;
 
             if (channel && !processedChannels.has(channel)) {
                 processedChannels.add(channel);
                 uniqueContents.push({
-                    id: doc.id,
                     ...data,
-                    scraped_at: data.scraped_at?.toDate().toISOString(),
+                    scraped_at: data.scraped_at.toISOString(),
                 });
             }
         });
@@ -80,13 +74,8 @@ export async function GET() {
             try {
                 const lookback30 = new Date();
                 lookback30.setDate(lookback30.getDate() - 30);
-                const thumbnailSnap = await db.collection('contents')
-                    .where('scraped_at', '>=', lookback30)
-                    .orderBy('scraped_at', 'desc')
-                    .limit(500)
-                    .get();
-                thumbnailSnap.docs.forEach(doc => {
-                    const d = doc.data();
+                const thumbnailContents = await getRecentContents(lookback30, 500);
+                thumbnailContents.forEach(d => {
                     if (d.opinion_leader && d.thumbnail && !channelThumbnails.has(d.opinion_leader)) {
                         channelThumbnails.set(d.opinion_leader, d.thumbnail);
                     }
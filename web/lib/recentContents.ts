@@ -0,0 +1,74 @@
+import { db } from '@/lib/firebase';
+import type { DocumentData, Timestamp } from 'firebase-admin/firestore';
+
+// 크롤러가 채널별로 남기는 매니페스트 (backend/utils/content_manifest.py)
+//   channel_manifests/{id}: { opinion_leader, category, crawled_at, items: { contentDocId: lastSeenAt } }
+// 크롤러는 변경 없는 콘텐츠 문서를 다시 쓰지 않으므로 "최근 콘텐츠"는 매니페스트로 찾습니다.
+const MANIFEST_COLLECTION = 'channel_manifests';
+const GET_ALL_CHUNK = 300;
+
+export type RecentContent = DocumentData & { id: string; scraped_at: Date };
+
+const toDate = (value: Timestamp | Date | string | undefined): Date | null => {
+    if (!value) return null;
+    if (value instanceof Date) return value;
+    if (typeof value === 'string') return new Date(value);
+    return value.toDate();
+};
+
+/**
+ * since 이후 크롤러가 확인한 콘텐츠를 최신순으로 반환합니다.
+ * scraped_at은 마지막으로 확인된 시각입니다.
+ * 매니페스트가 아직 없으면(도입 전 데이터) 기존 scraped_at 쿼리로 대체합니다.
+ */
+export async function getRecentContents(since: Date, limit?: number): Promise<RecentContent[]> {
+    const manifests = await db.collection(MANIFEST_COLLECTION).where('crawled_at', '>=', since).get();
+
+    if (manifests.empty) {
+        const anyManifest = await db.collection(MANIFEST_COLLECTION).limit(1).get();
+        if (anyManifest.empty) {
+            let query = db.collection('contents').where('scraped_at', '>=', since).orderBy('scraped_at', 'desc');
+            if (limit) query = query.limit(limit);
+            const snapshot = await query.get();
+            return snapshot.docs.map(doc => ({
+                id: doc.id,
+                ...doc.data(),
+                scraped_at: toDate(doc.data().scraped_at) ?? since,
+            }));
+        }
+        return [];
+    }
+
+    const entries: { id: string; seenAt: Date }[] = [];
+    manifests.docs.forEach(doc => {
+        const items = (doc.data().items ?? {}) as Record<string, Timestamp>;
+        for (const [id, value] of Object.entries(items)) {
+            const seenAt = toDate(value);
+            if (seenAt && seenAt >= since) entries.push({ id, seenAt });
+        }
+    });
+    entries.sort((a, b) => b.seenAt.getTime() - a.seenAt.getTime());
+    const picked = limit ? entries.slice(0, limit) : entries;
+
+    const contents: RecentContent[] = [];
+    for (let i = 0; i < picked.length; i += GET_ALL_CHUNK) {
+        const chunk = picked.slice(i, i + GET_ALL_CHUNK);
+        const snapshots = await db.getAll(...chunk.map(entry => db.collection('contents').doc(entry.id)));
+        snapshots.forEach((snapshot, j) => {
+            if (snapshot.exists) {
+                contents.push({ id: snapshot.id, ...snapshot.data(), scraped_at: chunk[j].seenAt });
+            }
+        });
+    }
+    return contents;
+}
+
+/** 마지막 크롤링 시각 (매니페스트 기준, 없으면 가장 최근 콘텐츠의 scraped_at). */
+export async function getLastCrawledAt(): Promise<Date | null> {
+    const latestManifest = await db.collection(MANIFEST_COLLECTION).orderBy('crawled_at', 'desc').limit(1).get();
+    if (!latestManifest.empty) {
+        return toDate(latestManifest.docs[0].data().crawled_at);
+    }
+    const latestContent = await db.collection('contents').orderBy('scraped_at', 'desc').limit(1).get();
+    return latestContent.empty ? null : toDate(latestContent.docs[0].data().scraped_at);
+}